@@ -0,0 +1,86 @@
+"""
+Benchmark for Analyst near-duplicate collapsing over a synthetic corpus.
+
+Generates stories of random vocabulary, plus syndicated copies with a small
+fraction of words changed and a different boilerplate header, then times
+NearDuplicateIndex-based deduplication at increasing corpus sizes and checks
+the collapse against the known ground truth.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_dedup.py --sizes 500 1000 2000 4000
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+from typing import List, Tuple
+
+from researcher.analyst import Analyst
+from researcher.models import ResearchFinding
+
+VOCABULARY = [f"word{i}" for i in range(5000)]
+
+
+def make_corpus(num_findings: int, dup_fraction: float, edit_rate: float, seed: int) -> Tuple[List[ResearchFinding], List[int]]:
+    """Builds findings and a parallel list of story ids (copies share an id)."""
+    rng = random.Random(seed)
+    findings: List[ResearchFinding] = []
+    story_ids: List[int] = []
+    num_stories = max(1, int(num_findings * (1 - dup_fraction)))
+    stories = [[rng.choice(VOCABULARY) for _ in range(rng.randint(300, 1200))] for _ in range(num_stories)]
+
+    for index in range(num_findings):
+        story = index if index < num_stories else rng.randrange(num_stories)
+        words = list(stories[story])
+        if index >= num_stories:
+            for position in rng.sample(range(len(words)), int(len(words) * edit_rate)):
+                words[position] = rng.choice(VOCABULARY)
+        header = f"Mirror {index} | Syndicated news network"
+        findings.append(ResearchFinding(
+            source_url=f"https://site{index % 97}.example/story/{index}",
+            content=f"{header}\n\n{' '.join(words)}",
+            relevance_score=rng.uniform(0.6, 0.9),
+            key_fact=f"Story {story}",
+        ))
+        story_ids.append(story)
+    return findings, story_ids
+
+
+def run(num_findings: int, dup_fraction: float, edit_rate: float, seed: int) -> None:
+    findings, story_ids = make_corpus(num_findings, dup_fraction, edit_rate, seed)
+    expected = len(set(story_ids))
+    story_of = {id(finding): story for finding, story in zip(findings, story_ids)}
+
+    analyst = Analyst()
+    analyst.scores = lambda batch: [finding.relevance_score for finding in batch]  # isolate dedup from scoring
+    started_at = time.perf_counter()
+    kept = analyst.analyze(findings)
+    elapsed = time.perf_counter() - started_at
+
+    kept_stories = [story_of[id(finding)] for finding in kept]
+    false_merges = expected - len(set(kept_stories))
+    missed = len(kept_stories) - len(set(kept_stories))
+    print(
+        f"{num_findings:>6} findings | {elapsed:7.3f}s | {num_findings / elapsed:8.0f} findings/s | "
+        f"kept {len(kept):>5} (expected {expected:>5}) | missed dups {missed:>4} | false merges {false_merges:>4}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate collapsing.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000, 4000])
+    parser.add_argument("--dup-fraction", type=float, default=0.3, help="Share of findings that are copies.")
+    parser.add_argument("--edit-rate", type=float, default=0.05, help="Share of words changed in each copy.")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        # The Analyst narrates every decision; keep the benchmark output readable.
+        with contextlib.redirect_stdout(io.StringIO()) as buffer:
+            run(size, args.dup_fraction, args.edit_rate, args.seed)
+        print(buffer.getvalue().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+Offline end-to-end benchmark of the full research pipeline.
+
+Runs ResearchSession (the code path behind main.py) against local stand-ins:
+- search: StaticSearchProvider with a configurable latency, whose results
+  point at the local corpus server;
+- web: a threaded HTTP server generating pages of varied size and latency,
+  with a share of failure modes (404, 500, dropped connections, slow
+  responses, binary bodies, pages over the download cap);
+- Gemini: a fake async client with configurable latency and injected 429s,
+  returning a plan of the requested size and a streamed report.
+
+For each plan size it reports throughput, per-stage latency percentiles
+(from each run's trace.json) and peak Python heap (tracemalloc).
+
+Authenticated (deep-scout) tasks are off by default because they need
+Playwright's Chromium; enable them with --deep-tasks where it is installed.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_e2e.py --plan-sizes 2 4 8 --repeat 3
+"""
+import argparse
+import asyncio
+import contextlib
+import glob
+import io
+import json
+import os
+import random
+import re
+import resource
+import socket
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List
+
+from google.genai import errors
+
+from researcher.cli import build_parser
+from researcher.runner import ResearchSession
+from researcher.search import StaticSearchProvider
+from researcher.utils import percentile
+
+WORDS = [f"term{i}" for i in range(2000)]
+STAGES = ["generate_plan", "scout.task", "search", "fetch", "extract", "analyst.accept", "analyze", "synthesis", "synthesis.map", "synthesis.reduce", "llm.call", "llm.attempt"]
+FAILURE_MODES = ["404", "500", "reset", "slow", "binary", "oversized"]
+
+
+def slug_words(path: str) -> List[str]:
+    """The query words encoded in a corpus URL path (/<query-slug>/<n>)."""
+    return [w for w in path.strip("/").split("/")[0].split("-") if w]
+
+
+def make_handler(seed: int, failure_rate: float, max_latency: float) -> type:
+    """Builds a request handler serving a deterministic synthetic corpus."""
+
+    class CorpusHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str = "text/html; charset=utf-8") -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            rng = random.Random(f"{seed}:{self.path}")
+            time.sleep(rng.uniform(0, max_latency))
+            mode = rng.choice(FAILURE_MODES) if rng.random() < failure_rate else "ok"
+            if mode == "404":
+                return self._send(404, b"<html><body><p>Not found</p></body></html>")
+            if mode == "500":
+                return self._send(500, b"<html><body><p>Internal error</p></body></html>")
+            if mode == "reset":
+                self.close_connection = True
+                self.connection.shutdown(socket.SHUT_RDWR)
+                return
+            if mode == "binary":
+                return self._send(200, bytes(rng.getrandbits(8) for _ in range(200_000)), "image/jpeg")
+            if mode == "slow":
+                time.sleep(1.0)
+
+            topic_words = slug_words(self.path) or ["topic"]
+            paragraphs = []
+            count = 400 if mode == "oversized" else int(rng.lognormvariate(2.3, 0.7)) + 2
+            for _ in range(count):
+                words = rng.choices(WORDS, k=rng.randint(30, 90)) + rng.choices(topic_words, k=rng.randint(2, 8))
+                rng.shuffle(words)
+                paragraphs.append(" ".join(words).capitalize() + ".")
+            if mode == "oversized":
+                paragraphs *= 40
+            nav = "".join(f'<li><a href="/nav/{i}">Section {i}</a></li>' for i in range(10))
+            body = "".join(f"<p>{p}</p>" for p in paragraphs)
+            html = (
+                f"<!DOCTYPE html><html><head><title>{' '.join(topic_words)} report {self.path}</title></head>"
+                f"<body><nav><ul>{nav}</ul></nav><article><h1>{' '.join(topic_words)}</h1>{body}</article>"
+                f"<footer><p>Copyright example.</p></footer></body></html>"
+            )
+            self._send(200, html.encode("utf-8"))
+
+    return CorpusHandler
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    """Drops the tracebacks socketserver prints for deliberately reset connections."""
+
+    daemon_threads = True
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        pass
+
+
+class CorpusServer:
+    """Runs the synthetic corpus on a local port in a background thread."""
+
+    def __init__(self, seed: int, failure_rate: float, max_latency: float):
+        self.server = QuietHTTPServer(("127.0.0.1", 0), make_handler(seed, failure_rate, max_latency))
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self) -> "CorpusServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeModels:
+    """Stand-in for `client.aio.models` with latency and injected 429s."""
+
+    def __init__(self, plan_size: int, queries_per_task: int, deep_tasks: int, latency: float, throttle_rate: float, seed: int):
+        self.plan_size = plan_size
+        self.queries_per_task = queries_per_task
+        self.deep_tasks = deep_tasks
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.throttled = 0
+
+    async def _admit(self) -> None:
+        self.calls += 1
+        await asyncio.sleep(self.rng.uniform(0.5, 1.5) * self.latency)
+        if self.rng.random() < self.throttle_rate:
+            self.throttled += 1
+            raise errors.APIError(429, {"error": {"code": 429, "message": "Resource exhausted (injected)", "status": "RESOURCE_EXHAUSTED"}})
+
+    def _plan(self, prompt: str) -> str:
+        topic = re.search(r"break down the topic '(.*?)' into", prompt, re.S)
+        topic_text = topic.group(1) if topic else "benchmark topic"
+        tasks = []
+        for i in range(self.plan_size):
+            aspect = " ".join(self.rng.sample(WORDS, 2))
+            tasks.append({
+                "id": f"task_{i + 1}",
+                "description": f"Research {aspect} for {topic_text}",
+                "queries": [f"{aspect} {' '.join(self.rng.sample(WORDS, 2))}" for _ in range(self.queries_per_task)],
+                "source_type": "authenticated" if i < self.deep_tasks else "open_web",
+            })
+        questions = [f"What about {' '.join(self.rng.sample(WORDS, 3))}?" for _ in range(3)]
+        return json.dumps({"topic": topic_text, "key_questions": questions, "estimated_tokens": 0, "sub_tasks": tasks})
+
+    @staticmethod
+    def _usage(prompt: str, text: str) -> SimpleNamespace:
+        return SimpleNamespace(prompt_token_count=len(prompt) // 4, candidates_token_count=len(text) // 4, thoughts_token_count=None)
+
+    def _report(self) -> str:
+        sections = [f"## Section {i}\n\n" + " ".join(self.rng.choices(WORDS, k=120)) for i in range(6)]
+        return "# Benchmark Report\n\n" + "\n\n".join(sections)
+
+    async def generate_content(self, model: str, contents: str, config: Any = None) -> SimpleNamespace:
+        await self._admit()
+        text = self._plan(contents) if "Research Orchestrator" in contents else self._report()
+        return SimpleNamespace(text=text, usage_metadata=self._usage(contents, text))
+
+    async def generate_content_stream(self, model: str, contents: str, config: Any = None) -> AsyncIterator[SimpleNamespace]:
+        await self._admit()
+        text = self._report()
+        pieces = [text[i:i + 200] for i in range(0, len(text), 200)]
+
+        async def chunks() -> AsyncIterator[SimpleNamespace]:
+            for index, piece in enumerate(pieces):
+                await asyncio.sleep(self.latency / 20)
+                last = index == len(pieces) - 1
+                yield SimpleNamespace(text=piece, usage_metadata=self._usage(contents, text) if last else None)
+
+        return chunks()
+
+
+def fake_genai_client(models: FakeModels) -> SimpleNamespace:
+    async def aclose() -> None:
+        pass
+
+    return SimpleNamespace(aio=SimpleNamespace(models=models, aclose=aclose))
+
+
+async def run_size(args: argparse.Namespace, plan_size: int, server_url: str, work_dir: str) -> Dict[str, Any]:
+    """Runs `args.repeat` topics with plans of `plan_size` sub-tasks and summarises them."""
+    run_args = build_parser().parse_args([
+        "--cache-dir", os.path.join(work_dir, "cache"),
+        "--no-cache", "--no-llm-cache", "--no-history",
+        "--open-limit", str(args.open_limit),
+        "--extract-workers", str(args.extract_workers),
+        "--mode", args.mode,
+        "--synthesis-mode", args.synthesis_mode,
+        "--llm-rpm", "100000", "--llm-tpm", "1000000000",
+    ])
+    runs_root = os.path.join(work_dir, "runs")
+    models = FakeModels(plan_size, args.queries, args.deep_tasks, args.llm_latency, args.throttle_rate, args.seed + plan_size)
+    search = StaticSearchProvider(base_url=server_url, latency=lambda query: random.uniform(0, args.search_latency))
+
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    runs = []
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        session = ResearchSession(
+            run_args,
+            runs_root=runs_root,
+            search_provider=search,
+            genai_client=fake_genai_client(models),
+            # Reports stay in the scratch run directories; the tracked final_report.md is left alone.
+            latest_path=None,
+        )
+        try:
+            for i in range(args.repeat):
+                runs.append(await session.run_topic(f"benchmark topic {plan_size} {i}", mirror_report=False))
+        finally:
+            await session.close()
+    wall = time.perf_counter() - started_at
+    _, peak_heap = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    durations: Dict[str, List[float]] = {}
+    for run in runs:
+        with open(os.path.join(runs_root, run.run_id, "trace.json"), "r", encoding="utf-8") as f:
+            for s in json.load(f)["spans"]:
+                durations.setdefault(s["name"], []).append(s["duration"])
+    fetches = len(durations.get("fetch", []))
+    return {
+        "plan_size": plan_size,
+        "topics": len(runs),
+        "wall_s": round(wall, 3),
+        "topic_s_p50": round(percentile([r.seconds for r in runs], 50), 3),
+        "topics_per_min": round(len(runs) / wall * 60, 2),
+        "fetches_per_s": round(fetches / wall, 2),
+        "fetches": fetches,
+        "gold_findings": sum(r.gold_count for r in runs),
+        "llm_calls": models.calls,
+        "llm_429s": models.throttled,
+        "peak_heap_mb": round(peak_heap / 1e6, 1),
+        "stages": {
+            name: {
+                "count": len(durations[name]),
+                "p50_s": round(percentile(durations[name], 50), 4),
+                "p95_s": round(percentile(durations[name], 95), 4),
+            }
+            for name in STAGES if name in durations
+        },
+    }
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    print(
+        f"plan {result['plan_size']:>3} tasks | {result['topics']} topics in {result['wall_s']:.1f}s "
+        f"({result['topics_per_min']:.1f}/min, topic p50 {result['topic_s_p50']:.2f}s) | "
+        f"{result['fetches']} fetches ({result['fetches_per_s']:.1f}/s) | {result['gold_findings']} gold | "
+        f"{result['llm_calls']} LLM calls, {result['llm_429s']} 429s | heap peak {result['peak_heap_mb']:.1f} MB"
+    )
+    for name, row in result["stages"].items():
+        print(f"    {name:>15}: n={row['count']:<5} p50 {row['p50_s'] * 1000:8.1f} ms   p95 {row['p95_s'] * 1000:8.1f} ms")
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    results = []
+    with CorpusServer(args.seed, args.failure_rate, args.page_latency) as server, tempfile.TemporaryDirectory() as work_dir:
+        print(f"Corpus server at {server.url} (failure rate {args.failure_rate:.0%})")
+        for plan_size in args.plan_sizes:
+            result = await run_size(args, plan_size, server.url, os.path.join(work_dir, f"plan_{plan_size}"))
+            print_result(result)
+            results.append(result)
+    print(f"Process peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the research pipeline.")
+    parser.add_argument("--plan-sizes", type=int, nargs="+", default=[2, 4, 8], help="Sub-tasks per plan.")
+    parser.add_argument("--repeat", type=int, default=3, help="Topics run per plan size.")
+    parser.add_argument("--queries", type=int, default=2, help="Queries per sub-task.")
+    parser.add_argument("--open-limit", type=int, default=3, help="Search results fetched per query.")
+    parser.add_argument("--deep-tasks", type=int, default=0, help="Authenticated sub-tasks per plan (needs Playwright's Chromium).")
+    parser.add_argument("--mode", choices=["stream", "batch"], default="stream")
+    parser.add_argument("--synthesis-mode", choices=["single", "map_reduce"], default="single")
+    parser.add_argument("--extract-workers", type=int, default=0)
+    parser.add_argument("--failure-rate", type=float, default=0.15, help="Share of pages that fail or misbehave.")
+    parser.add_argument("--page-latency", type=float, default=0.08, help="Maximum added page latency in seconds.")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="Maximum search latency in seconds.")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Mean fake Gemini latency in seconds.")
+    parser.add_argument("--throttle-rate", type=float, default=0.05, help="Share of Gemini calls answered with a 429.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=str, default=None, help="Write the results as JSON.")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
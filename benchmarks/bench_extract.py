@@ -0,0 +1,124 @@
+"""
+Benchmark for HTML main-content extractors over a fixed synthetic corpus.
+
+Builds pages in several common layouts (semantic <article>, content <div>,
+table layout, hint-free markup), each wrapping a known article in navigation,
+sidebars, related-link lists, cookie banners, scripts and footers. Every
+extractor is timed sequentially, the default one also through the
+ExtractionEngine process pool, and output quality is measured as word-level
+precision/recall against the known article text.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_extract.py --pages 400 --workers 4
+"""
+import argparse
+import asyncio
+import random
+import re
+import time
+from collections import Counter
+from typing import List, Tuple
+
+from researcher.extract import EXTRACTORS, ExtractionEngine, ReadabilityExtractor
+
+WORDS = [f"term{i}" for i in range(3000)]
+WORD_PATTERN = re.compile(r"\w+")
+
+NAV = "<nav><ul>" + "".join(f'<li><a href="/s{i}">Section {i}</a></li>' for i in range(12)) + "</ul></nav>"
+BANNER = '<div class="cookie-banner">We use cookies to improve your experience, analyse traffic and personalise ads. <a href="/privacy">Learn more</a></div>'
+SCRIPT = "<script>window.dataLayer = window.dataLayer || []; function gtag(){dataLayer.push(arguments);}</script>"
+FOOTER = "<footer><p>Copyright 2026 Example Media Group, all rights reserved, including the right to reproduce this footer.</p></footer>"
+
+
+def sentence(rng: random.Random) -> str:
+    words = rng.choices(WORDS, k=rng.randint(8, 24))
+    if rng.random() < 0.5:
+        words[rng.randrange(len(words))] += ","
+    return " ".join(words).capitalize() + "."
+
+
+def link_list(rng: random.Random, css: str, count: int) -> str:
+    items = "".join(f'<li><a href="/r{i}">{" ".join(rng.choices(WORDS, k=6))}</a></li>' for i in range(count))
+    return f'<div class="{css}"><ul>{items}</ul></div>'
+
+
+def make_page(rng: random.Random, layout: str) -> Tuple[str, str, str]:
+    """Returns (html, title, gold article text)."""
+    title = " ".join(rng.choices(WORDS, k=6))
+    paragraphs = [" ".join(sentence(rng) for _ in range(rng.randint(2, 6))) for _ in range(rng.randint(4, 14))]
+    body = "".join(f"<p>{p}</p>" for p in paragraphs)
+    sidebar = link_list(rng, "sidebar widget", 10)
+    related = link_list(rng, "related-stories", 8)
+    teaser = f'<div class="promo"><p>{sentence(rng)}</p></div>'
+
+    if layout == "article":
+        main = f"<article><h1>{title}</h1>{body}</article>{related}"
+    elif layout == "content_div":
+        main = f'<div id="main-content" class="post-body"><h1>{title}</h1>{body}</div>{related}'
+    elif layout == "table":
+        main = f"<table><tr><td>{sidebar}</td><td><h1>{title}</h1>{body}</td></tr></table>"
+        sidebar = ""
+    else:  # hint-free markup: only the paragraph structure gives the article away
+        main = f"<div><div><h1>{title}</h1>{body}</div></div><div>{related}</div>"
+
+    html = (
+        f"<!DOCTYPE html><html><head><title>{title} | Example News</title>{SCRIPT}</head>"
+        f"<body>{BANNER}<header>{NAV}</header>{teaser}<div class='layout'>{main}{sidebar}</div>{FOOTER}{SCRIPT}</body></html>"
+    )
+    return html, title, " ".join([title, *paragraphs])
+
+
+def make_corpus(num_pages: int, seed: int) -> List[Tuple[str, str, str]]:
+    rng = random.Random(seed)
+    layouts = ["article", "content_div", "table", "plain"]
+    return [make_page(rng, layouts[i % len(layouts)]) for i in range(num_pages)]
+
+
+def quality(extracted: str, gold: str) -> Tuple[float, float]:
+    """Word-multiset precision and recall of extracted text against the gold text."""
+    got = Counter(WORD_PATTERN.findall(extracted.lower()))
+    want = Counter(WORD_PATTERN.findall(gold.lower()))
+    overlap = sum((got & want).values())
+    return overlap / max(1, sum(got.values())), overlap / max(1, sum(want.values()))
+
+
+def run_sequential(name: str, corpus: List[Tuple[str, str, str]]) -> None:
+    extractor = EXTRACTORS[name]()
+    started_at = time.perf_counter()
+    pages = [extractor.extract(html) for html, _, _ in corpus]
+    elapsed = time.perf_counter() - started_at
+    scores = [quality(page.text, gold) for page, (_, _, gold) in zip(pages, corpus)]
+    precision = sum(p for p, _ in scores) / len(scores)
+    recall = sum(r for _, r in scores) / len(scores)
+    print(
+        f"{name:>18} | sequential | {len(corpus) / elapsed:8.0f} pages/s | "
+        f"precision {precision:.3f} | recall {recall:.3f}"
+    )
+
+
+async def run_pool(corpus: List[Tuple[str, str, str]], workers: int) -> None:
+    engine = ExtractionEngine(ReadabilityExtractor(), workers=workers)
+    await engine.extract(corpus[0][0])  # warm the worker processes up
+    started_at = time.perf_counter()
+    await asyncio.gather(*(engine.extract(html) for html, _, _ in corpus))
+    elapsed = time.perf_counter() - started_at
+    engine.close()
+    print(f"{engine.extractor.name:>18} | {workers} workers  | {len(corpus) / elapsed:8.0f} pages/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark HTML main-content extractors.")
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.pages, args.seed)
+    print(f"Corpus: {len(corpus)} pages, {sum(len(html) for html, _, _ in corpus) / 1e6:.1f} MB of HTML")
+    for name in EXTRACTORS:
+        run_sequential(name, corpus)
+    asyncio.run(run_pool(corpus, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark for holding findings in memory versus spilling them to a FindingsStore.
+
+Generates findings of deep-scout size one at a time (as scouts deliver them),
+keeps them either as in-memory ResearchFindings or as StoredFinding handles,
+then runs batch analysis and history-style hashing over all of them and
+context packing over the gold findings. Reports time, the peak Python heap
+(tracemalloc) of the gathering/analysis stage and of packing, and the heap
+still held afterwards, for increasing numbers of findings. Packing reads
+every gold finding in full, so its peak follows the gold set, not the run.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_findings.py --sizes 200 400 800
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+import tracemalloc
+from typing import List
+
+from researcher.analyst import Analyst
+from researcher.findings import Finding, FindingsStore
+from researcher.history import content_hash
+from researcher.models import ResearchFinding, ResearchPlan, ResearchTask
+from researcher.packer import ContextPacker
+
+VOCABULARY = [f"word{i}" for i in range(5000)]
+
+
+def make_plan(rng: random.Random) -> ResearchPlan:
+    tasks = [
+        ResearchTask(id=f"task_{i}", description=" ".join(rng.sample(VOCABULARY, 6)), queries=[" ".join(rng.sample(VOCABULARY, 4))])
+        for i in range(4)
+    ]
+    return ResearchPlan(topic="benchmark", sub_tasks=tasks, key_questions=[" ".join(rng.sample(VOCABULARY, 8)) for _ in range(3)])
+
+
+def make_finding(rng: random.Random, index: int, chars: int) -> ResearchFinding:
+    paragraphs = []
+    size = 0
+    while size < chars:
+        paragraph = " ".join(rng.choices(VOCABULARY, k=rng.randint(40, 120))) + "."
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return ResearchFinding(
+        source_url=f"https://site{index % 97}.example/article/{index}",
+        content="\n\n".join(paragraphs)[:chars],
+        relevance_score=0.8,
+        key_fact=f"Article {index}",
+        task_ids=[f"task_{index % 4}"],
+    )
+
+
+def run(num_findings: int, chars: int, max_gold: int, mode: str, seed: int) -> None:
+    rng = random.Random(seed)
+    plan = make_plan(rng)
+    store = FindingsStore(compress=mode == "spill+zlib") if mode != "memory" else None
+
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    findings: List[Finding] = []
+    for index in range(num_findings):
+        finding = make_finding(rng, index, chars)
+        findings.append(store.add(finding) if store else finding)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyst = Analyst(plan=plan, min_score=0.0)
+        gold = analyst.analyze(findings)
+        hashes = [content_hash(f.content) for f in findings]
+        _, analysis_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        packed = ContextPacker(plan, token_budget=100_000).pack(gold[:max_gold])
+    elapsed = time.perf_counter() - started_at
+    held, pack_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    on_disk = store.stats()["bytes_on_disk"] / 1e6 if store else 0.0
+    print(
+        f"{mode:>10} | n={num_findings:<5} | {elapsed:6.2f}s | heap peak: analysis {analysis_peak / 1e6:6.1f} MB, "
+        f"packing {pack_peak / 1e6:6.1f} MB | "
+        f"held {held / 1e6:7.1f} MB | on disk {on_disk:6.1f} MB | {len(gold)} gold, {len(hashes)} hashed, {packed.sources} packed"
+    )
+    if store:
+        store.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark in-memory versus spilled findings.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 400, 800], help="Numbers of findings.")
+    parser.add_argument("--chars", type=int, default=20_000, help="Content length per finding.")
+    parser.add_argument("--max-gold", type=int, default=100, help="Gold findings passed to the context packer.")
+    parser.add_argument("--modes", nargs="+", choices=["memory", "spill", "spill+zlib"], default=["memory", "spill", "spill+zlib"])
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        for mode in args.modes:
+            run(size, args.chars, args.max_gold, mode, args.seed)
+
+
+if __name__ == "__main__":
+    main()
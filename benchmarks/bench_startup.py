@@ -0,0 +1,106 @@
+"""
+Benchmark for CLI cold start: import and setup time in fresh interpreters.
+
+Each scenario runs in a new Python process, so nothing is shared between
+repeats except the OS file cache. Reported are the median and best wall
+time of the process and which heavy dependencies it ended up importing.
+
+Scenarios:
+    help           `researcher --help`
+    session-mock   ResearchSession set up without a Gemini key (mock plan/report)
+    session-key    ResearchSession set up with a Gemini key (loads google-genai)
+    eager          session-key with everything imported up front, as main.py
+                   did before the CLI was made lazy (deep scout, google-genai)
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_startup.py --repeat 5 --importtime
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+HEAVY = ["playwright", "google.genai", "numpy", "scipy", "requests", "lxml", "ddgs", "pydantic", "dotenv"]
+
+REPORT = f"""
+import sys
+print("LOADED=" + ",".join(m for m in {HEAVY!r} if m in sys.modules))
+"""
+
+SESSION = """
+import asyncio, tempfile
+from researcher.cli import build_parser
+from researcher.config import load_config
+from researcher.runner import ResearchSession
+load_config()
+cache_dir = tempfile.mkdtemp()
+args = build_parser().parse_args(["--cache-dir", cache_dir, "--no-cache", "--no-llm-cache", "--no-history", "--extract-workers", "0"])
+session = ResearchSession(args, runs_root=cache_dir)
+asyncio.run(session.close())
+"""
+
+SCENARIOS: Dict[str, Tuple[str, Dict[str, str]]] = {
+    "help": ("from researcher.cli import main\ntry:\n    main(['--help'])\nexcept SystemExit:\n    pass\n", {}),
+    "session-mock": (SESSION, {"GEMINI_API_KEY": ""}),
+    "session-key": (SESSION, {"GEMINI_API_KEY": "benchmark-placeholder-key"}),
+    "eager": ("import dotenv\ndotenv.load_dotenv()\nimport google.genai\nimport researcher.deep_scout\n" + SESSION, {"GEMINI_API_KEY": "benchmark-placeholder-key"}),
+}
+
+
+def run_once(code: str, env: Dict[str, str], extra_flags: List[str]) -> Tuple[float, str, str]:
+    started_at = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, *extra_flags, "-c", code + REPORT],
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - started_at, completed.stdout, completed.stderr
+
+
+def top_imports(stderr: str, count: int) -> List[Tuple[int, str]]:
+    """Parses `-X importtime` output into the slowest top-level imports (cumulative us)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented by two extra spaces per level.
+        if len(name) - len(name.lstrip()) == 1:
+            rows.append((int(cumulative), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:count]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark CLI cold start.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes per scenario.")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--importtime", action="store_true", help="Also list the slowest top-level imports of each scenario.")
+    args = parser.parse_args()
+
+    for name in args.scenarios:
+        code, env = SCENARIOS[name]
+        run_once(code, env, [])  # warm the OS file cache
+        timings = []
+        loaded = ""
+        for _ in range(args.repeat):
+            elapsed, stdout, _ = run_once(code, env, [])
+            timings.append(elapsed)
+            loaded = next((line[len("LOADED="):] for line in stdout.splitlines() if line.startswith("LOADED=")), "")
+        print(
+            f"{name:>13}: median {statistics.median(timings) * 1000:7.0f} ms, best {min(timings) * 1000:7.0f} ms "
+            f"| loaded: {loaded.replace(',', ', ') or 'none of the heavy dependencies'}"
+        )
+        if args.importtime:
+            _, _, stderr = run_once(code, env, ["-X", "importtime"])
+            for cumulative, module in top_imports(stderr, 6):
+                print(f"{'':>15}{cumulative / 1000:7.0f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
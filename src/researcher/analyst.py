@@ -1,18 +1,160 @@
 """
 Analyst Agent: The filter layer.
 """
-import random
-from typing import List
-from researcher.models import ResearchFinding
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from researcher.dedup import NearDuplicateIndex, merge_duplicate
+from researcher.findings import ContentView, Finding
+from researcher.models import ResearchPlan
+from researcher.relevance import RelevanceEngine
+from researcher.tracing import traced
+
+def _rank_key(finding: Finding) -> Tuple[float, str]:
+    """Best score first; equal scores fall back to the URL, so ties do not depend on arrival order."""
+    return (-finding.relevance_score, finding.source_url)
+
+
+def _outranks(finding: Finding, other: Finding) -> bool:
+    """True if `finding` should represent a duplicate group in place of `other`."""
+    return _rank_key(finding) < _rank_key(other)
+
 
 class Analyst:
     """Filters and assesses the quality of research findings."""
 
-    def __init__(self):
-        pass
+    def __init__(self, plan: Optional[ResearchPlan] = None, min_score: float = 0.3, dedup: bool = True):
+        """
+        Args:
+            plan: The research plan; its key questions and sub-tasks drive relevance scoring.
+                Without a plan, the Scouts' own scores are used.
+            min_score: Score a finding must exceed to be kept.
+            dedup: Collapse near-duplicate findings (syndicated or mirrored copies).
+        """
+        self.relevance = RelevanceEngine(plan) if plan is not None else None
+        self.min_score = min_score
+        self.dedup_index = NearDuplicateIndex() if dedup else None
+        self.duplicates_collapsed = 0
+        self._accepted: List[Finding] = []
+        self.findings_scored = 0
+        self.scoring_seconds = 0.0
+
+    def scores(self, findings: Sequence[Finding]) -> List[float]:
+        """Scores a batch of findings in one vectorised pass.
+
+        Args:
+            findings: Raw findings from Scouts.
+
+        Returns:
+            The final scores in the range 0.0 - 1.0, in input order.
+        """
+        started_at = time.perf_counter()
+        # Density: reward longer, meatier content, saturating at 5000 chars.
+        density = np.minimum(1.0, np.array([f.content_chars for f in findings], dtype=float) / 5000.0)
+        # Depth: an article URL rather than a bare domain.
+        depth = np.array([1.0 if len(f.source_url.split('/')) > 3 else 0.0 for f in findings])
+
+        if self.relevance is not None:
+            relevance, _ = self.relevance.relevance(
+                # Spilled content is read one finding at a time while the term matrix is built.
+                ContentView(findings),
+                [f.task_ids for f in findings],
+            )
+            final = 0.8 * relevance + 0.1 * density + 0.1 * depth
+        else:
+            base = np.array([f.relevance_score for f in findings], dtype=float)
+            final = base + 0.1 * density + 0.05 * depth
+
+        self.findings_scored += len(findings)
+        self.scoring_seconds += time.perf_counter() - started_at
+        clipped: List[float] = np.clip(final, 0.0, 1.0).tolist()
+        return clipped
+
+    def score(self, finding: Finding) -> float:
+        """Scores a single finding.
+
+        Args:
+            finding: A raw finding from a Scout.
+
+        Returns:
+            The final score in the range 0.0 - 1.0.
+        """
+        return self.scores([finding])[0]
+
+    def _passes(self, finding: Finding, final_score: float) -> bool:
+        """Records the score on a finding and applies the quality bar."""
+        # 1. Credibility Check (Mock)
+        is_reliable = True
+
+        finding.relevance_score = final_score
+        if final_score > self.min_score and is_reliable:
+            print(f"  - Keeping finding from {finding.source_url} (Score: {final_score:.2f})")
+            return True
+        print(f"  - Discarding dross from {finding.source_url} (Score: {final_score:.2f})")
+        return False
 
-    def analyze(self, findings: List[ResearchFinding]) -> List[ResearchFinding]:
+    @traced("analyst.accept")
+    def accept(self, finding: Finding) -> bool:
+        """Scores one finding and decides whether it is new 'Gold'.
+
+        Used directly by the streaming pipeline to assess findings on arrival.
+        A near-duplicate of an already accepted finding passes the bar but
+        is not new. Nothing is merged here: which copies end up together
+        would depend on arrival order, so `settle` collapses duplicates once
+        every finding is in.
+
+        Args:
+            finding: A raw finding from a Scout.
+
+        Returns:
+            True if the finding should be kept as a new result.
+        """
+        if not self._passes(finding, self.score(finding)):
+            return False
+        self._accepted.append(finding)
+        if self.dedup_index is None:
+            return True
+
+        signature = self.dedup_index.signature(finding.content)
+        representative = self.dedup_index.find(signature)
+        if representative is None:
+            self.dedup_index.add(finding, signature)
+            return True
+
+        print(f"  - {finding.source_url} looks like a copy of {representative.source_url}")
+        # Index the copy too, so copies of the copy still find the representative.
+        self.dedup_index.add(representative, signature)
+        return False
+
+    def settle(self) -> List[Finding]:
+        """Returns the final 'Gold' from every finding `accept` let through.
+
+        In stream mode a finding is scored on arrival, possibly before every
+        task that references it has claimed it. The accepted findings are
+        rescored for their final `task_ids` (without re-filtering) and their
+        near-duplicates collapsed best-first, exactly as `analyze` does, so
+        the result does not depend on arrival order.
+
+        Returns:
+            The deduplicated findings, best first.
+        """
+        findings, self._accepted = self._accepted, []
+        if findings and self.relevance is not None:
+            for finding, final_score in zip(findings, self.scores(findings)):
+                finding.relevance_score = final_score
+        findings.sort(key=_rank_key)
+        if self.dedup_index is None:
+            return findings
+        return self._collapse(findings, NearDuplicateIndex())
+
+    @traced("analyze")
+    def analyze(self, findings: List[Finding]) -> List[Finding]:
         """Filters findings to keep only the 'Gold'.
+
+        Near-duplicates are collapsed onto the best-scoring copy, whose
+        `alternate_urls` keep the other sources.
         
         Args:
             findings: Raw findings from Scouts.
@@ -21,39 +163,34 @@ class Analyst:
             A filtered list of high-value findings.
         """
         print(f"Analyst: Processing {len(findings)} findings...")
-        
-        high_value_findings = []
-        
-        for finding in findings:
-            # 1. Credibility Check (Mock)
-            is_reliable = True
-            
-            # Scoring Logic (Heuristic for PoC)
-            # 1. Base score from Scout (usually 0.9 if found)
-            base = finding.relevance_score
-            
-            # 2. Density Bonus: Reward longer, meatier content
-            # Cap at 5000 chars for max bonus of 0.1
-            density_bonus = min(0.1, len(finding.content) / 50000.0)
-            
-            # 3. Authenticated Source Bonus
-            # If the URL looks "deep" (not just a root domain), slight boost
-            depth_bonus = 0.05 if len(finding.source_url.split('/')) > 3 else 0.0
-            
-            # 4. Jitter (Optimization for Human Perception)
-            # Users trust variable scores more than identical 0.90s.
-            # Reflects the inherent uncertainty of automated grading.
-            jitter = random.uniform(-0.03, 0.03)
-            
-            final_score = base + density_bonus + depth_bonus + jitter
-            
-            # Clamp to 0.0 - 1.0
-            final_score = max(0.0, min(1.0, final_score))
-            
-            if final_score > 0.5 and is_reliable:
-                print(f"  - Keeping finding from {finding.source_url} (Score: {final_score:.2f})")
-                high_value_findings.append(finding)
-            else:
-                print(f"  - Discarding dross from {finding.source_url}")
-                
-        return high_value_findings
+        scores = self.scores(findings)
+        kept = [finding for finding, score in zip(findings, scores) if self._passes(finding, score)]
+        if self.dedup_index is None:
+            return kept
+        return self._collapse(kept, self.dedup_index)
+
+    def _collapse(self, findings: List[Finding], index: NearDuplicateIndex) -> List[Finding]:
+        """Folds near-duplicates into the best-scoring copy; returns the rest in input order."""
+        # Index best-first so the first copy seen of any story is its best one.
+        dropped = set()
+        for finding in sorted(findings, key=_rank_key):
+            signature = index.signature(finding.content)
+            representative = index.find(signature)
+            if representative is None:
+                index.add(finding, signature)
+                continue
+            print(f"  - Collapsing near-duplicate {finding.source_url} into {representative.source_url}")
+            index.add(representative, signature)
+            merge_duplicate(representative, finding)
+            dropped.add(id(finding))
+        self.duplicates_collapsed += len(dropped)
+        return [finding for finding in findings if id(finding) not in dropped]
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns scoring and dedup counters for the run metadata."""
+        return {
+            "findings_scored": self.findings_scored,
+            "scoring_seconds": round(self.scoring_seconds, 4),
+            "min_score": self.min_score,
+            "duplicates_collapsed": self.duplicates_collapsed,
+        }
@@ -0,0 +1,181 @@
+"""
+Browser Pool: one long-lived Chromium context with reusable tabs.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from playwright.async_api import BrowserContext, Page, Playwright, async_playwright
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+class BrowserPool:
+    """Hands out pages from a single persistent context for the whole run.
+
+    Chromium is launched lazily on first use against the snapshotted profile
+    and kept alive until `close()`. Pages are health-checked when acquired:
+    closed or unresponsive tabs are replaced, and the whole context is
+    relaunched if it has crashed.
+    """
+
+    def __init__(
+        self,
+        user_data_dir: str,
+        size: int = 2,
+        headless: bool = True,
+        user_agent: str = DEFAULT_USER_AGENT,
+        health_timeout: float = 2.0,
+        on_launch: Optional[Callable[[BrowserContext], Awaitable[None]]] = None,
+    ):
+        """
+        Args:
+            user_data_dir: Profile directory for the persistent context.
+            size: Number of tabs to keep open and hand out concurrently.
+            headless: Whether to run Chromium headless.
+            user_agent: User-Agent for every page.
+            health_timeout: Seconds a page has to answer a health probe.
+            on_launch: Hook run on every (re)launched context, e.g. to install request routing.
+        """
+        self.user_data_dir = user_data_dir
+        self.size = size
+        self.headless = headless
+        self.user_agent = user_agent
+        self.health_timeout = health_timeout
+        self.on_launch = on_launch
+
+        self._playwright: Optional[Playwright] = None
+        self._context: Optional[BrowserContext] = None
+        self._context_closed = False
+        self._pages: "asyncio.Queue[Page]" = asyncio.Queue()
+        self._lock = asyncio.Lock()
+
+        self.launches = 0
+        self.launch_seconds = 0.0
+        self.acquisitions = 0
+        self.recycled = 0
+
+    @property
+    def started(self) -> bool:
+        return self._context is not None and not self._context_closed
+
+    async def start(self) -> None:
+        """Launches the persistent context and opens the pool's tabs, if not already running.
+
+        Raises:
+            playwright.async_api.Error: If Chromium cannot be launched.
+        """
+        async with self._lock:
+            if self.started:
+                return
+            await self._shutdown()
+
+            started_at = time.perf_counter()
+            self._playwright = await async_playwright().start()
+            self._context = await self._playwright.chromium.launch_persistent_context(
+                user_data_dir=self.user_data_dir,
+                headless=self.headless,
+                user_agent=self.user_agent,
+            )
+            self._context_closed = False
+            self._context.on("close", lambda _: self._mark_closed())
+            if self.on_launch:
+                await self.on_launch(self._context)
+
+            pages: List[Page] = list(self._context.pages[: self.size])
+            while len(pages) < self.size:
+                pages.append(await self._context.new_page())
+            # Refill the existing queue so that tasks already waiting on it get the new tabs.
+            while not self._pages.empty():
+                self._pages.get_nowait()
+            for page in pages:
+                self._pages.put_nowait(page)
+
+            self.launches += 1
+            self.launch_seconds += time.perf_counter() - started_at
+            print(f"BrowserPool: Chromium ready with {self.size} tabs ({time.perf_counter() - started_at:.1f}s).")
+
+    def _mark_closed(self) -> None:
+        self._context_closed = True
+
+    async def _is_healthy(self, page: Page) -> bool:
+        """Probes a page with a trivial script."""
+        if page.is_closed():
+            return False
+        try:
+            await asyncio.wait_for(page.evaluate("1"), timeout=self.health_timeout)
+            return True
+        except Exception:
+            return False
+
+    async def _replace(self, page: Page) -> Page:
+        """Closes a broken page and opens a fresh one in the same context."""
+        self.recycled += 1
+        try:
+            if not page.is_closed():
+                await page.close()
+        except Exception:
+            pass
+        return await page.context.new_page()
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Borrows a healthy page for the duration of the `async with` block.
+
+        Yields:
+            A Playwright Page from the shared context.
+        """
+        await self.start()
+        page = await self._pages.get()
+        try:
+            if self._context_closed:
+                # The context crashed while we waited; relaunch and take a fresh tab.
+                await self.start()
+                page = await self._pages.get()
+            elif not await self._is_healthy(page):
+                page = await self._replace(page)
+            self.acquisitions += 1
+            yield page
+        finally:
+            # Tabs from a crashed (and since relaunched) context are simply dropped.
+            if page.context is self._context and not self._context_closed:
+                if page.is_closed():
+                    try:
+                        page = await self._replace(page)
+                    except Exception:
+                        pass
+                self._pages.put_nowait(page)
+
+    async def _shutdown(self) -> None:
+        """Closes the context and stops Playwright, ignoring errors from a dead browser."""
+        if self._context is not None:
+            try:
+                await self._context.close()
+            except Exception:
+                pass
+            self._context = None
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+    async def close(self) -> None:
+        """Shuts the pool down; safe to call more than once."""
+        async with self._lock:
+            await self._shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns launch and reuse counters for the run metadata."""
+        return {
+            "size": self.size,
+            "launches": self.launches,
+            "launch_seconds": round(self.launch_seconds, 2),
+            "acquisitions": self.acquisitions,
+            "recycled_pages": self.recycled,
+        }
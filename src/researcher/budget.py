@@ -0,0 +1,155 @@
+"""
+Run Budget: an overall time, download and Gemini-token bound for one research run.
+"""
+import asyncio
+import contextlib
+import contextvars
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+# Cumulative share of the time budget by the end of each stage. A stage that
+# finishes early leaves its unused time to the stages after it.
+STAGE_ENDS = {"plan": 0.10, "scouting": 0.70, "synthesis": 1.0}
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised when a call would take the run past one of its limits."""
+
+
+class RunBudget:
+    """Limits of one research run and what enforcing them cost.
+
+    The time budget is split into stage deadlines (see STAGE_ENDS): the
+    pipeline cancels outstanding scout tasks at the scouting deadline or
+    once `max_bytes` have been downloaded, and synthesis then runs on
+    whatever findings exist. Gemini calls that would exceed `max_llm_tokens`
+    are refused. Every limit reached and everything skipped is recorded for
+    the run metadata.
+
+    Like the tracer, the active budget lives in a context variable, so the
+    scouts and the shared Gemini client charge the run they are working for.
+    """
+
+    def __init__(self, time_budget: Optional[float] = None, max_bytes: Optional[int] = None, max_llm_tokens: Optional[int] = None):
+        """
+        Args:
+            time_budget: Seconds for the whole run.
+            max_bytes: Bytes of page content the scouts may download.
+            max_llm_tokens: Gemini tokens (prompt plus output) the run may use.
+        """
+        self.time_budget = time_budget
+        self.max_bytes = max_bytes
+        self.max_llm_tokens = max_llm_tokens
+        self.started_at = time.monotonic()
+        self.bytes_used = 0
+        self.llm_tokens_used = 0
+        self.limits_hit: Dict[str, str] = {}
+        self.skipped: List[Dict[str, str]] = []
+        self._downloads_exhausted = asyncio.Event()
+
+    @property
+    def bounds_scouting(self) -> bool:
+        """True if scouting can be cut short (by time or downloads)."""
+        return self.time_budget is not None or self.max_bytes is not None
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator["RunBudget"]:
+        """Makes this the current budget and starts its clock."""
+        self.started_at = time.monotonic()
+        token = _current_budget.set(self)
+        try:
+            yield self
+        finally:
+            _current_budget.reset(token)
+
+    def stage_deadline(self, stage: str) -> Optional[float]:
+        """Returns the `time.monotonic()` by which a stage must end, or None."""
+        if self.time_budget is None:
+            return None
+        return self.started_at + self.time_budget * STAGE_ENDS[stage]
+
+    def stage_remaining(self, stage: str) -> Optional[float]:
+        """Returns the seconds left for a stage (never negative), or None if unbounded."""
+        deadline = self.stage_deadline(stage)
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+    def hit(self, limit: str, detail: str) -> None:
+        """Records that a limit was reached (once per limit)."""
+        if limit in self.limits_hit:
+            return
+        self.limits_hit[limit] = detail
+        print(f"Budget [WARNING]: {detail}")
+
+    def skip(self, stage: str, item: str, limit: str) -> None:
+        """Records work that was cut or skipped because of a limit."""
+        self.skipped.append({"stage": stage, "item": item, "limit": limit})
+
+    def charge_bytes(self, count: int) -> None:
+        """Counts downloaded bytes; reaching `max_bytes` ends scouting."""
+        self.bytes_used += count
+        if self.max_bytes is not None and self.bytes_used >= self.max_bytes:
+            self.hit("max_bytes", f"{self.bytes_used} of {self.max_bytes} bytes downloaded; stopping scouting")
+            self._downloads_exhausted.set()
+
+    def charge_llm_tokens(self, count: int) -> None:
+        """Counts Gemini tokens reported by a response."""
+        self.llm_tokens_used += count
+
+    def llm_tokens_left(self) -> Optional[int]:
+        """Returns the Gemini tokens still available, or None if unbounded."""
+        if self.max_llm_tokens is None:
+            return None
+        return max(0, self.max_llm_tokens - self.llm_tokens_used)
+
+    def check_llm(self, prompt_tokens: int) -> None:
+        """Refuses a Gemini call whose prompt alone would exceed the token budget.
+
+        Raises:
+            BudgetExceededError: If the call does not fit.
+        """
+        left = self.llm_tokens_left()
+        if left is not None and prompt_tokens > left:
+            detail = f"Gemini call of ~{prompt_tokens} prompt tokens refused; {left} of {self.max_llm_tokens} tokens left"
+            self.hit("max_llm_tokens", detail)
+            raise BudgetExceededError(detail)
+
+    async def wait_scouting_limit(self) -> str:
+        """Waits until scouting must stop: its deadline passes or downloads run out.
+
+        Returns:
+            The limit that ended scouting: 'time_budget' or 'max_bytes'.
+        """
+        try:
+            await asyncio.wait_for(self._downloads_exhausted.wait(), self.stage_remaining("scouting"))
+            return "max_bytes"
+        except asyncio.TimeoutError:
+            self.hit("time_budget", f"scouting reached its deadline ({STAGE_ENDS['scouting']:.0%} of {self.time_budget:.0f}s)")
+            return "time_budget"
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the limits, usage and what was cut for the run metadata."""
+        return {
+            "time_budget_s": self.time_budget,
+            "elapsed_s": round(time.monotonic() - self.started_at, 3),
+            "max_bytes": self.max_bytes,
+            "bytes_used": self.bytes_used,
+            "max_llm_tokens": self.max_llm_tokens,
+            "llm_tokens_used": self.llm_tokens_used,
+            "limits_hit": self.limits_hit,
+            "skipped": self.skipped,
+        }
+
+
+_current_budget: contextvars.ContextVar[Optional[RunBudget]] = contextvars.ContextVar("budget", default=None)
+
+
+def current_budget() -> Optional[RunBudget]:
+    """Returns the budget of the run in progress, if any."""
+    return _current_budget.get()
+
+
+def clamp_timeout(seconds: float, stage: str) -> float:
+    """Shortens a per-operation timeout so it cannot outlast the stage's deadline."""
+    budget = current_budget()
+    remaining = budget.stage_remaining(stage) if budget else None
+    return seconds if remaining is None else max(0.0, min(seconds, remaining))
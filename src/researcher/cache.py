@@ -0,0 +1,318 @@
+"""
+Page Cache: a persistent, content-addressed store of fetched pages.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from researcher.urls import canonicalize_url
+
+
+@dataclass
+class CacheEntry:
+    """Metadata for one cached page; bodies live in content-addressed blobs."""
+    canonical_url: str
+    final_url: str
+    title: str
+    body_hash: str
+    text_hash: str
+    fetched_at: float
+    last_access: float
+    body_size: int
+    text_size: int
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    source_type: str = "open_web"
+
+    @property
+    def size(self) -> int:
+        """Bytes of both blobs (shared blobs are counted once by the cache itself)."""
+        return self.body_size + self.text_size
+
+
+class PageCache:
+    """On-disk page cache keyed on the canonical URL and source type.
+
+    Layout under `cache_dir`:
+        index.json          entries (canonical URL, source type, blob digests, validators)
+        blobs/<sha256>      raw bodies and extracted text, shared across URLs
+
+    Pages the authenticated browser captured are kept apart from anonymous
+    open-web fetches of the same URL: a paywall stub is never served to an
+    authenticated task, and logged-in content never to an open-web one.
+
+    Entries older than `ttl` are stale: they are still returned so callers can
+    revalidate with the stored ETag/Last-Modified validators. When the total
+    size of the referenced blobs exceeds `max_bytes`, least recently used
+    entries are evicted; a blob shared by several entries counts once and is
+    deleted with its last entry.
+
+    Blob reads and writes block, so scouts call `put` and `read_text` through
+    `asyncio.to_thread`; the index is guarded by a lock.
+    """
+
+    def __init__(self, cache_dir: str, ttl: float = 24 * 3600, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: Directory holding the index and blobs.
+            ttl: Seconds after which an entry must be revalidated.
+            max_bytes: Size cap for all blobs before LRU eviction starts.
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._blob_dir = os.path.join(cache_dir, "blobs")
+        self._index_path = os.path.join(cache_dir, "index.json")
+        os.makedirs(self._blob_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CacheEntry] = self._load_index()
+        # Entries referencing each blob, each blob's size, and the total of the referenced blobs.
+        self._blob_refs: Dict[str, int] = {}
+        self._blob_sizes: Dict[str, int] = {}
+        self._total_bytes = 0
+        for entry in self._entries.values():
+            self._ref(entry)
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+    def _load_index(self) -> Dict[str, CacheEntry]:
+        """Reads the index from disk, tolerating a missing or corrupt file."""
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            entries = [CacheEntry(**value) for value in raw]
+        except (OSError, ValueError, TypeError):
+            return {}
+        return {self._key(entry.canonical_url, entry.source_type): entry for entry in entries}
+
+    @staticmethod
+    def _key(canonical_url: str, source_type: str) -> str:
+        return f"{source_type} {canonical_url}"
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self._blob_dir, digest)
+
+    def _stage_blob(self, data: bytes) -> Tuple[str, Optional[str]]:
+        """Writes data to a temporary file next to the blobs, unless the blob already exists.
+
+        Returns:
+            The SHA-256 digest and the temporary path to publish (None if nothing was written).
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        if os.path.exists(self._blob_path(digest)):
+            return digest, None
+        fd, tmp_path = tempfile.mkstemp(dir=self._blob_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return digest, tmp_path
+
+    def _ref(self, entry: CacheEntry) -> None:
+        for digest, size in ((entry.body_hash, entry.body_size), (entry.text_hash, entry.text_size)):
+            if digest not in self._blob_refs:
+                self._blob_refs[digest] = 0
+                self._blob_sizes[digest] = size
+                self._total_bytes += size
+            self._blob_refs[digest] += 1
+
+    def _unref(self, entry: CacheEntry) -> List[str]:
+        """Drops an entry's blob references; returns the digests no entry uses any more."""
+        orphans = []
+        for digest in (entry.body_hash, entry.text_hash):
+            self._blob_refs[digest] -= 1
+            if self._blob_refs[digest] == 0:
+                del self._blob_refs[digest]
+                self._total_bytes -= self._blob_sizes.pop(digest)
+                orphans.append(digest)
+        return orphans
+
+    def _delete_blobs(self, digests: List[str]) -> None:
+        for digest in digests:
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+
+    def _read_blob(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Returns True if the entry is within its TTL."""
+        return time.time() - entry.fetched_at < self.ttl
+
+    def get(self, url: str, source_type: str = "open_web") -> Optional[CacheEntry]:
+        """Looks up a URL, counting the lookup as a hit, stale hit or miss.
+
+        Args:
+            url: Any spelling of the URL.
+            source_type: How the caller fetches pages ('open_web' or 'authenticated');
+                only a copy fetched the same way is returned.
+
+        Returns:
+            The entry (fresh or stale), or None if absent or its blobs are gone.
+        """
+        with self._lock:
+            entry = self._entries.get(self._key(canonicalize_url(url), source_type))
+            if entry is None or not os.path.exists(self._blob_path(entry.text_hash)):
+                self.misses += 1
+                return None
+            entry.last_access = time.time()
+            self._dirty = True
+            if self.is_fresh(entry):
+                self.hits += 1
+            else:
+                self.stale += 1
+            return entry
+
+    def read_text(self, entry: CacheEntry) -> str:
+        """Returns the extracted text stored for an entry."""
+        data = self._read_blob(entry.text_hash)
+        return data.decode("utf-8") if data is not None else ""
+
+    def read_body(self, entry: CacheEntry) -> bytes:
+        """Returns the raw body stored for an entry."""
+        return self._read_blob(entry.body_hash) or b""
+
+    def validators(self, entry: Optional[CacheEntry]) -> Dict[str, str]:
+        """Builds conditional request headers for revalidating a stale entry.
+
+        The validators belong to the entry's own source type, so an
+        anonymous fetch never revalidates a logged-in copy.
+
+        Args:
+            entry: The stale entry (from `get` with the caller's source type), or None.
+
+        Returns:
+            If-None-Match / If-Modified-Since headers (possibly empty).
+        """
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def mark_revalidated(self, entry: CacheEntry) -> None:
+        """Restarts an entry's TTL after a 304 Not Modified response."""
+        with self._lock:
+            entry.fetched_at = time.time()
+            self.revalidated += 1
+            self._dirty = True
+
+    def put(
+        self,
+        url: str,
+        body: bytes,
+        text: str,
+        title: str = "",
+        final_url: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        source_type: str = "open_web",
+    ) -> CacheEntry:
+        """Stores a freshly fetched page.
+
+        Writes the blobs, so it blocks; call it through `asyncio.to_thread`
+        from async code.
+
+        Args:
+            url: The requested URL (the cache key after canonicalisation).
+            body: Raw response body.
+            text: Extracted text used to build findings.
+            title: Page title.
+            final_url: URL after redirects, if different.
+            etag: ETag response header.
+            last_modified: Last-Modified response header.
+            source_type: How the page was fetched ('open_web' or 'authenticated').
+
+        Returns:
+            The new cache entry.
+        """
+        text_bytes = text.encode("utf-8")
+        # The bulk of the work (hashing and writing) happens before the lock is taken.
+        body_hash, body_tmp = self._stage_blob(body)
+        text_hash, text_tmp = self._stage_blob(text_bytes)
+        now = time.time()
+        entry = CacheEntry(
+            canonical_url=canonicalize_url(url),
+            final_url=final_url or url,
+            title=title,
+            body_hash=body_hash,
+            text_hash=text_hash,
+            fetched_at=now,
+            last_access=now,
+            body_size=len(body),
+            text_size=len(text_bytes),
+            etag=etag,
+            last_modified=last_modified,
+            source_type=source_type,
+        )
+        key = self._key(entry.canonical_url, source_type)
+        with self._lock:
+            # Published under the lock, so an eviction cannot delete a blob between its write and its reference.
+            for digest, tmp_path in ((body_hash, body_tmp), (text_hash, text_tmp)):
+                if tmp_path is not None:
+                    os.replace(tmp_path, self._blob_path(digest))
+            self._ref(entry)
+            replaced = self._entries.get(key)
+            self._entries[key] = entry
+            orphans = self._unref(replaced) if replaced is not None else []
+            orphans.extend(self._evict())
+            self._delete_blobs(orphans)
+            self._dirty = True
+        return entry
+
+    def _evict(self) -> List[str]:
+        """Drops least recently used entries until the cache fits its size cap.
+
+        Returns:
+            The digests of blobs no remaining entry references.
+        """
+        if self._total_bytes <= self.max_bytes:
+            return []
+        orphans: List[str] = []
+        for key, entry in sorted(self._entries.items(), key=lambda item: item[1].last_access):
+            if self._total_bytes <= self.max_bytes:
+                break
+            del self._entries[key]
+            orphans.extend(self._unref(entry))
+            self.evictions += 1
+        return orphans
+
+    def flush(self) -> None:
+        """Writes the index to disk atomically if it has changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = f"{self._index_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump([asdict(entry) for entry in self._entries.values()], f)
+            os.replace(tmp_path, self._index_path)
+            self._dirty = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters for the run metadata."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "revalidated": self.revalidated,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+        }
@@ -0,0 +1,239 @@
+"""
+Fast Capture: resource blocking, readiness detection and per-domain pacing
+for the authenticated browser.
+"""
+import asyncio
+import random
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import BrowserContext, Error as PlaywrightError, Page, Route
+
+from researcher.utils import percentile
+
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+
+# Ad, analytics and tag-manager hosts (matched on the domain suffix).
+TRACKER_DOMAINS = frozenset({
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "google-analytics.com",
+    "adservice.google.com",
+    "amazon-adsystem.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "scorecardresearch.com",
+    "chartbeat.com",
+    "chartbeat.net",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "taboola.com",
+    "outbrain.com",
+    "criteo.com",
+    "quantserve.com",
+    "newrelic.com",
+    "nr-data.net",
+    "adnxs.com",
+    "rubiconproject.com",
+    "pubmatic.com",
+    "optimizely.com",
+})
+
+# Blocked requests are never downloaded, so savings are estimated from typical sizes.
+ESTIMATED_BYTES_BY_TYPE = {
+    "image": 60_000,
+    "media": 500_000,
+    "font": 40_000,
+    "script": 30_000,
+}
+DEFAULT_ESTIMATED_BYTES = 10_000
+
+ARTICLE_SELECTOR = "article, main, [role='main'], [itemprop='articleBody']"
+
+
+def _host_matches(host: str, domains: Iterable[str]) -> bool:
+    """Returns True if the host is one of the domains or a subdomain of one."""
+    return any(host == domain or host.endswith(f".{domain}") for domain in domains)
+
+
+class ResourceBlocker:
+    """Aborts heavy and tracking requests at the browser-context level."""
+
+    def __init__(
+        self,
+        blocked_types: Iterable[str] = BLOCKED_RESOURCE_TYPES,
+        blocked_domains: Iterable[str] = TRACKER_DOMAINS,
+    ):
+        """
+        Args:
+            blocked_types: Playwright resource types to abort.
+            blocked_domains: Domains whose requests are always aborted.
+        """
+        self.blocked_types = frozenset(blocked_types)
+        self.blocked_domains = frozenset(blocked_domains)
+        self.blocked_requests = 0
+        self.allowed_requests = 0
+        self.bytes_saved_estimate = 0
+        self._saved_by_page: Dict[int, int] = {}
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """Decides whether a request should be aborted.
+
+        Args:
+            resource_type: Playwright resource type, e.g. 'image' or 'script'.
+            url: The request URL.
+
+        Returns:
+            True if the request is heavy or goes to a tracker.
+        """
+        if resource_type in self.blocked_types:
+            return True
+        host = (urlparse(url).hostname or "").lower()
+        return _host_matches(host, self.blocked_domains)
+
+    async def install(self, context: BrowserContext) -> None:
+        """Routes every request in the context through the blocker."""
+        await context.route("**/*", self._handle)
+
+    async def _handle(self, route: Route) -> None:
+        """Aborts or continues one intercepted request."""
+        request = route.request
+        if not self.should_block(request.resource_type, request.url):
+            self.allowed_requests += 1
+            await route.continue_()
+            return
+
+        saved = ESTIMATED_BYTES_BY_TYPE.get(request.resource_type, DEFAULT_ESTIMATED_BYTES)
+        self.blocked_requests += 1
+        self.bytes_saved_estimate += saved
+        try:
+            page_key = id(request.frame.page)
+            self._saved_by_page[page_key] = self._saved_by_page.get(page_key, 0) + saved
+        except Exception:
+            pass  # Service-worker requests have no page.
+        await route.abort()
+
+    def take_page_savings(self, page: Page) -> int:
+        """Returns and resets the estimated bytes saved on one page."""
+        return self._saved_by_page.pop(id(page), 0)
+
+
+async def wait_for_readiness(
+    page: Page,
+    max_wait: float = 8.0,
+    poll_interval: float = 0.25,
+    stable_polls: int = 2,
+    min_article_chars: int = 500,
+) -> float:
+    """Waits until the page's main text has settled.
+
+    Returns as soon as an article-like element holds `min_article_chars` of
+    text, or the body text length stops changing for `stable_polls` polls,
+    or `max_wait` elapses - whichever comes first. A probe that fails
+    because the page navigated away (a client-side redirect) is retried.
+
+    Args:
+        page: A page that has reached DOMContentLoaded.
+        max_wait: Upper bound on the wait in seconds.
+        poll_interval: Seconds between text-length probes.
+        stable_polls: Consecutive unchanged probes that count as settled.
+        min_article_chars: Article text length that counts as ready.
+
+    Returns:
+        Seconds spent waiting.
+    """
+    started_at = time.perf_counter()
+    last_length = -1
+    unchanged = 0
+    while time.perf_counter() - started_at < max_wait:
+        try:
+            body_length, article_length = await page.evaluate(
+                """(selector) => {
+                    const article = document.querySelector(selector);
+                    return [
+                        document.body ? document.body.innerText.length : 0,
+                        article ? article.innerText.length : 0,
+                    ];
+                }""",
+                ARTICLE_SELECTOR,
+            )
+        except PlaywrightError:
+            # A client-side redirect destroyed the execution context; probe the new document.
+            last_length = -1
+            unchanged = 0
+            await asyncio.sleep(poll_interval)
+            continue
+        if article_length >= min_article_chars:
+            break
+        if body_length > 0 and body_length == last_length:
+            unchanged += 1
+            if unchanged >= stable_polls:
+                break
+        else:
+            unchanged = 0
+        last_length = body_length
+        await asyncio.sleep(poll_interval)
+    return time.perf_counter() - started_at
+
+
+class DomainPacer:
+    """Spaces out visits to the same domain; different domains never wait on each other."""
+
+    def __init__(self, min_interval: float = 2.0, max_interval: float = 5.0):
+        """
+        Args:
+            min_interval: Minimum seconds between two visits to one domain.
+            max_interval: Maximum seconds (the gap is drawn uniformly in between).
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._next_allowed: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.total_wait = 0.0
+
+    async def wait(self, url: str) -> float:
+        """Sleeps until the URL's domain may be visited again.
+
+        Args:
+            url: The URL about to be visited.
+
+        Returns:
+            Seconds slept.
+        """
+        host = (urlparse(url).hostname or "").lower()
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            delay = self._next_allowed.get(host, 0.0) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                self.total_wait += delay
+            self._next_allowed[host] = time.monotonic() + random.uniform(self.min_interval, self.max_interval)
+            return max(delay, 0.0)
+
+
+class CaptureStats:
+    """Collects per-page load times and savings for the run metadata."""
+
+    def __init__(self) -> None:
+        self.load_times: List[float] = []
+        self.bytes_saved: List[int] = []
+
+    def record(self, load_seconds: float, bytes_saved: int) -> None:
+        """Adds one captured page."""
+        self.load_times.append(load_seconds)
+        self.bytes_saved.append(bytes_saved)
+
+    def summary(self, blocker: Optional[ResourceBlocker], pacer: DomainPacer) -> Dict[str, Any]:
+        """Combines page timings with blocker and pacer counters."""
+        return {
+            "pages": len(self.load_times),
+            "load_p50_s": round(percentile(self.load_times, 50), 2),
+            "load_p95_s": round(percentile(self.load_times, 95), 2),
+            "blocked_requests": blocker.blocked_requests if blocker else 0,
+            "bytes_saved_estimate": blocker.bytes_saved_estimate if blocker else 0,
+            "pacing_wait_s": round(pacer.total_wait, 2),
+        }
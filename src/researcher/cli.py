@@ -0,0 +1,128 @@
+"""
+Command-line interface: the `researcher` console entry point.
+
+Only argparse is imported before the options are parsed; the runner, the
+Gemini SDK and the scouts load afterwards, and the deep scout (Playwright)
+only if a plan needs it. `--help` therefore starts almost instantly.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import sys
+import time
+from typing import List, Optional
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Returns the command-line options of a research run."""
+    parser = argparse.ArgumentParser(description="Run the Researcher Agent.")
+    parser.add_argument("--topic", type=str, default="The Future of Synthetic Biology", help="Research topic to analyze.")
+    parser.add_argument("--batch", type=str, default=None, help="Directory or JSONL file of topics to research in one process (overrides --topic).")
+    parser.add_argument("--topic-concurrency", type=int, default=1, help="Batch mode: topics researched at the same time.")
+    parser.add_argument("--open-limit", type=int, default=3, help="Number of results for Open Web Search.")
+    parser.add_argument("--deep-limit", type=int, default=1, help="Number of results per query for Deep Search.")
+    parser.add_argument("--max-connections", type=int, default=16, help="Global cap on concurrent open-web searches and fetches.")
+    parser.add_argument("--max-page-bytes", type=int, default=2 * 1024 * 1024, help="Stop downloading an HTML/text page after this many bytes.")
+    parser.add_argument("--max-pdf-bytes", type=int, default=10 * 1024 * 1024, help="Stop downloading a PDF after this many bytes.")
+    parser.add_argument("--per-host-limit", type=int, default=4, help="Cap on concurrent fetches against a single host.")
+    parser.add_argument("--extract-workers", type=int, default=None, help="Processes for HTML main-content extraction (default: min(4, CPUs); 0 runs it on a thread).")
+    parser.add_argument("--browser-pages", type=int, default=2, help="Number of browser tabs shared by all deep-scout tasks.")
+    parser.add_argument("--no-fast-capture", action="store_true", help="Load deep-scout pages fully (images, fonts, trackers) with fixed waits.")
+    parser.add_argument("--cache-dir", type=str, default=".cache", help="Directory for the persistent caches and profile snapshot.")
+    parser.add_argument("--history-ttl", type=float, default=7 * 24, help="Hours for which a page recorded in the run history is reused instead of re-fetched.")
+    parser.add_argument("--no-history", action="store_true", help="Do not record this run in the history database.")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the persistent page and search caches for this run.")
+    parser.add_argument("--hedge-percentile", type=float, default=None, help="Fire a backup search when a query runs past this latency percentile (e.g. 95).")
+    parser.add_argument("--time-budget", type=float, default=None, help="Seconds allowed per run; planning gets the first 10%%, scouting runs until 70%%, synthesis gets the rest.")
+    parser.add_argument("--max-bytes", type=int, default=None, help="Bytes of page content a run may download; scouting stops once they are used.")
+    parser.add_argument("--max-llm-tokens", type=int, default=None, help="Gemini tokens (prompt plus output) a run may use; the synthesis context shrinks to fit.")
+    parser.add_argument("--mode", choices=["stream", "batch"], default="stream", help="Score findings as they arrive (stream) or after all scouts finish (batch).")
+    parser.add_argument("--gold-quota", type=int, default=None, help="Stream mode: stop a sub-task once it has this many gold findings.")
+    parser.add_argument("--min-score", type=float, default=0.3, help="Analyst score (0-1) a finding must exceed to be kept.")
+    parser.add_argument("--no-spill-findings", action="store_true", help="Keep finding content in memory instead of a per-run spill file.")
+    parser.add_argument("--compress-findings", action="store_true", help="zlib-compress finding content in the spill file.")
+    parser.add_argument("--context-budget", type=int, default=100_000, help="Estimated tokens of findings text allowed in the synthesis prompt.")
+    parser.add_argument("--synthesis-mode", choices=["single", "map_reduce"], default="single", help="Write the report in one call, or summarise each sub-task concurrently and merge.")
+    parser.add_argument("--map-concurrency", type=int, default=4, help="Map-reduce synthesis: maximum concurrent sub-task summaries.")
+    parser.add_argument("--llm-concurrency", type=int, default=8, help="Maximum concurrent Gemini requests across the whole run.")
+    parser.add_argument("--no-stream-report", action="store_true", help="Wait for the whole report instead of streaming it to disk and the terminal.")
+    parser.add_argument("--llm-rpm", type=float, default=60, help="Gemini requests per minute allowed per model.")
+    parser.add_argument("--llm-tpm", type=float, default=1_000_000, help="Gemini input tokens per minute allowed per model.")
+    parser.add_argument("--no-llm-cache", action="store_true", help="Do not record or reuse Gemini responses.")
+    parser.add_argument("--replay", action="store_true", help="Serve Gemini responses (and pages/searches) only from the caches; fail on an LLM cache miss.")
+    parser.add_argument("--trace-export", action="append", choices=["otlp", "prometheus"], help="Also export each run's trace as OTLP/JSON (trace.otlp.json) or Prometheus textfile metrics; repeatable.")
+    parser.add_argument("--metrics-file", type=str, default=os.path.join("runs", "researcher.prom"), help="Prometheus textfile written by --trace-export prometheus.")
+    parser.add_argument("--hedge-backend", type=str, default=None, help="ddgs backend for hedged searches (defaults to the primary backend).")
+    return parser
+
+
+async def _run(args: argparse.Namespace) -> None:
+    """Runs one topic or a batch, as selected by the options."""
+    from researcher.runner import ResearchSession, load_topics, print_batch_summary, summarize_batch
+
+    if args.batch:
+        topics = load_topics(args.batch)
+        print(f"=== Starting batch of {len(topics)} topics from {args.batch} (concurrency {args.topic_concurrency}) ===\n")
+        # Clients, caches, engines and the browser are built once and shared by every topic
+        session = ResearchSession(args)
+        started_at = time.perf_counter()
+        try:
+            runs = await session.run_batch(topics, concurrency=args.topic_concurrency)
+        finally:
+            await session.close()
+
+        summary = summarize_batch(runs, time.perf_counter() - started_at, args.topic_concurrency)
+        os.makedirs(session.runs_root, exist_ok=True)
+        summary_path = os.path.join(session.runs_root, f"batch_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(summary_path, "w") as f:
+            json.dump(summary, f, indent=2)
+        print_batch_summary(summary)
+        print(f"Batch summary saved to: {summary_path}")
+        return
+
+    topic = args.topic
+    if os.path.exists(topic) and os.path.isfile(topic):
+        print(f"Reading topic from file: {topic}")
+        with open(topic, "r", encoding="utf-8") as f:
+            topic = f.read().strip()
+
+    session = ResearchSession(args)
+    try:
+        await session.run_topic(topic)
+    finally:
+        await session.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point of the `researcher` command.
+
+    Args:
+        argv: Command-line arguments; defaults to sys.argv[1:].
+
+    Returns:
+        The process exit status.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.replay and (args.no_llm_cache or args.no_cache):
+        parser.error("--replay needs the caches; drop --no-llm-cache/--no-cache")
+    if args.replay and (args.gold_quota or args.time_budget or args.max_bytes):
+        # Where these stop scouting depends on arrival order, which a replay cannot reproduce.
+        parser.error("--replay cannot reproduce --gold-quota, --time-budget or --max-bytes cut-offs; drop them")
+
+    from researcher.config import load_config
+    from researcher.llm_cache import ReplayMissError
+
+    load_config()
+    try:
+        asyncio.run(_run(args))
+    except ReplayMissError as e:
+        print(f"\n[Replay Failed]: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""
+Configuration: loads the `.env` file once per process.
+"""
+from typing import Optional
+
+_loaded = False
+
+
+def load_config(path: Optional[str] = None) -> None:
+    """Loads environment variables from `.env` into os.environ, once.
+
+    Variables already set in the environment win over the file. Modules read
+    their settings (GEMINI_API_KEY, GEMINI_MODEL, CHROME_PROFILE_PATH) with
+    os.getenv when their objects are built, so this must run before then;
+    the CLI calls it right after parsing arguments.
+
+    Args:
+        path: An explicit .env file; defaults to searching from the working directory.
+    """
+    global _loaded
+    if _loaded:
+        return
+    from dotenv import find_dotenv, load_dotenv
+
+    load_dotenv(path or find_dotenv(usecwd=True))
+    _loaded = True
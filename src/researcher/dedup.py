@@ -0,0 +1,128 @@
+"""
+Near-duplicate detection: shingled MinHash signatures with an LSH band index.
+"""
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from researcher.findings import Finding
+
+MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+WORD_PATTERN = re.compile(r"\w+")
+
+
+class NearDuplicateIndex:
+    """Finds findings whose content is a near-copy of one already indexed.
+
+    Content is split into overlapping word shingles, hashed, and reduced to a
+    MinHash signature of `num_perm` values. Signatures are cut into `bands`
+    bands; two documents become candidates only if some band matches exactly,
+    so lookups cost one dict probe per band rather than a pass over every
+    indexed document. Candidates are confirmed when the estimated Jaccard
+    similarity reaches `threshold`.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, threshold: float = 0.6, shingle_size: int = 3, seed: int = 1):
+        """
+        Args:
+            num_perm: Number of hash permutations in a signature.
+            bands: Number of LSH bands (must divide num_perm).
+            threshold: Estimated Jaccard similarity at which two texts are duplicates.
+            shingle_size: Words per shingle.
+            seed: Seed for the permutation coefficients (fixed for determinism).
+        """
+        if num_perm % bands:
+            raise ValueError("bands must divide num_perm")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+
+        rng = np.random.default_rng(seed)
+        # Universal hashing (a * x + b) mod p with p = 2^31 - 1; every operand stays
+        # below 2^31, so the products fit in uint64 without overflow.
+        self._a = rng.integers(1, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        self._signatures: List[np.ndarray] = []
+        self._members: List[Finding] = []
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """Computes the MinHash signature of a text.
+
+        Args:
+            text: The content to fingerprint.
+
+        Returns:
+            A uint64 array of length num_perm, or None if the text is shorter than one shingle.
+        """
+        words = WORD_PATTERN.findall(text.lower())
+        if len(words) < self.shingle_size:
+            return None
+        shingles = {
+            zlib.crc32(" ".join(words[i:i + self.shingle_size]).encode("utf-8"))
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+        hashes = np.fromiter(shingles, dtype=np.uint64, count=len(shingles)) % MERSENNE_PRIME
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % MERSENNE_PRIME
+        signature: np.ndarray = permuted.min(axis=1)
+        return signature
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def find(self, signature: Optional[np.ndarray]) -> Optional[Finding]:
+        """Returns the indexed finding most similar to the signature, if it is a near-duplicate."""
+        if signature is None:
+            return None
+        candidates = {
+            member
+            for key in self._band_keys(signature)
+            for member in self._buckets.get(key, ())
+        }
+        best, best_similarity = None, self.threshold
+        for member in candidates:
+            similarity = float(np.mean(self._signatures[member] == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = member, similarity
+        return self._members[best] if best is not None else None
+
+    def add(self, finding: Finding, signature: Optional[np.ndarray]) -> None:
+        """Indexes a finding under a signature (texts too short to sign are skipped).
+
+        A finding may be added several times, once per collapsed copy, so that
+        later copies match whichever version they are closest to.
+        """
+        if signature is None:
+            return
+        member = len(self._members)
+        self._members.append(finding)
+        self._signatures.append(signature)
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, []).append(member)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+
+def merge_duplicate(representative: Finding, duplicate: Finding) -> None:
+    """Folds a duplicate into its representative, keeping its URL as a reference.
+
+    Args:
+        representative: The finding that stays in the results.
+        duplicate: The near-copy being dropped.
+    """
+    for url in [duplicate.source_url, *duplicate.alternate_urls]:
+        if url != representative.source_url and url not in representative.alternate_urls:
+            representative.alternate_urls.append(url)
+    for task_id in duplicate.task_ids:
+        if task_id not in representative.task_ids:
+            representative.task_ids.append(task_id)
+
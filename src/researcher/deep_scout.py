@@ -1,148 +1,312 @@
-import random
 import os
-import shutil
-import tempfile
+import time
 import asyncio
-from typing import List
-from playwright.async_api import async_playwright
-try:
-    from ddgs import DDGS
-except ImportError:
-    DDGS = None
+from typing import Any, AsyncIterator, Dict, List, Optional
 
+from researcher.browser_pool import BrowserPool
+from researcher.budget import clamp_timeout, current_budget
+from researcher.cache import PageCache
+from researcher.capture import CaptureStats, DomainPacer, ResourceBlocker, wait_for_readiness
+from researcher.findings import Finding
+from researcher.frontier import URLFrontier
+from researcher.history import HistoryStore
 from researcher.models import ResearchTask, ResearchFinding
-from researcher.scout import BaseScout
+from researcher.scout import BaseScout, Emit, stream_findings
+from researcher.search import DDGSProvider, Discovery
+from researcher.snapshot import ProfileSnapshotManager
+from researcher.tracing import current_span, span, traced
+
+# Below this much scouting time left, a page visit is skipped rather than started.
+MIN_VISIT_SECONDS = 1.0
 
 class DeepSourceScout(BaseScout):
     """Scout that uses a cloned browser profile to access authenticated content."""
 
-    def __init__(self, source_profile_path: str, max_results: int = 1):
+    def __init__(
+        self,
+        source_profile_path: str,
+        max_results: int = 1,
+        page_cache: Optional[PageCache] = None,
+        discovery: Optional[Discovery] = None,
+        frontier: Optional[URLFrontier] = None,
+        pool_size: int = 2,
+        snapshot_dir: Optional[str] = None,
+        fast_capture: bool = True,
+        history: Optional[HistoryStore] = None,
+        offline: bool = False,
+    ):
         """
         Args:
             source_profile_path: Absolute path to the user's browser profile directory.
             max_results: Number of results to process per query.
+            page_cache: Persistent page cache consulted before launching Chromium.
+            discovery: Shared search layer. Defaults to uncached DDGS.
+            frontier: Run-wide URL frontier used to fetch each page once across tasks.
+            pool_size: Number of browser tabs shared by all deep tasks.
+            snapshot_dir: Persistent profile snapshot reused across runs. A temp dir is used if omitted.
+            fast_capture: Block heavy/tracking requests and return as soon as the text settles,
+                instead of waiting for the full load plus a fixed sleep.
+            history: Run history; pages captured recently by any earlier run are reused from it.
+            offline: Serve pages only from the history and page cache (replay mode); never open the browser.
         """
         self.source_profile_path = source_profile_path
         self.max_results = max_results
-        self.temp_dir = tempfile.mkdtemp(prefix="researcher_agent_profile_")
+        self.page_cache = page_cache
+        self.discovery = discovery or Discovery(DDGSProvider())
+        self.frontier = frontier or URLFrontier()
+        self.snapshots = ProfileSnapshotManager(source_profile_path, snapshot_dir=snapshot_dir)
+        self.temp_dir = self.snapshots.snapshot_dir
         self._snapshot_lock = asyncio.Lock()
-        self._snapshot_created = False
-        # Limit concurrency to 1 active browser session/search at a time to avoid bot detection
-        self._request_semaphore = asyncio.Semaphore(1)
+        self.fast_capture = fast_capture
+        self.history = history
+        self.offline = offline
+        self.blocker = ResourceBlocker() if fast_capture else None
+        self.pacer = DomainPacer()
+        self.capture_stats = CaptureStats()
+        # One persistent context for the whole run; the tab count bounds concurrency
+        self.browser_pool = BrowserPool(
+            user_data_dir=self.temp_dir,
+            size=pool_size,
+            on_launch=self.blocker.install if self.blocker else None,
+        )
 
-    async def _create_snapshot(self):
+    async def _create_snapshot(self) -> None:
         """Creates a safe copy of the browser profile."""
-        if self._snapshot_created:
+        if self.snapshots.ready:
             return
 
         async with self._snapshot_lock:
             # Double-check inside lock
-            if self._snapshot_created:
+            if self.snapshots.ready:
                 return
                 
             if not os.path.exists(self.source_profile_path):
                 print(f"DeepSourceScout [WARNING]: Source profile not found. Deep search may lack cookies.")
-                self._snapshot_created = True
+                self.snapshots.ready = True
                 return
 
-            print(f"DeepSourceScout: Creating profile snapshot from {self.source_profile_path}...")
+            print(f"DeepSourceScout: Refreshing profile snapshot from {self.source_profile_path}...")
             
             try:
-                def ignore_patterns(path, names):
-                    return [n for n in names if n in ['Cache', 'Code Cache', 'GPUCache', 'Service Worker']]
-
-                await asyncio.to_thread(
-                    shutil.copytree,
-                    self.source_profile_path,
-                    self.temp_dir,
-                    ignore=ignore_patterns,
-                    dirs_exist_ok=True
+                with span("snapshot") as snapshot_span:
+                    report = await asyncio.to_thread(self.snapshots.refresh)
+                    snapshot_span.set(files_copied=report.files_copied, snapshot_bytes=report.snapshot_bytes)
+                print(
+                    f"DeepSourceScout: Snapshot ready ({report.files_copied} copied, "
+                    f"{report.files_unchanged} unchanged, {report.snapshot_bytes / 1e6:.1f} MB, "
+                    f"{report.seconds:.2f}s)."
                 )
-                
-                print("DeepSourceScout: Snapshot created successfully.")
-                self._snapshot_created = True
+                self.snapshots.ready = True
                 
             except Exception as e:
                 print(f"DeepSourceScout [ERROR]: Failed to snapshot profile: {e}")
 
-    async def gather(self, task: ResearchTask) -> List[ResearchFinding]:
-        """Launches a browser with the snapshotted profile."""
-        
-        async with self._request_semaphore:
-            print(f"DeepSourceScout: Launching authenticated browser for '{task.description}'...")
-            
-            await self._create_snapshot()
-            
-            findings = []
-            async with async_playwright() as p:
+    async def gather(self, task: ResearchTask) -> List[Finding]:
+        """Visits the task's URLs in the shared authenticated browser."""
+        return [finding async for finding in self.stream(task)]
+
+    async def stream(self, task: ResearchTask) -> AsyncIterator[Finding]:
+        """Yields findings for the task as each page is captured.
+
+        URLs are discovered first; any that are fresh in the page cache are
+        served from it, and the rest are spread over the browser pool's tabs.
+        """
+        print(f"DeepSourceScout: Researching '{task.description}' in authenticated browser...")
+
+        async def produce(emit: Emit) -> None:
+            pending_urls: List[str] = []
+            try:
+                await self._claim_and_visit(task, pending_urls, emit)
+            except asyncio.CancelledError:
+                # Cut short (gold quota or run budget): leave unvisited pages to the next task.
+                for target_url in pending_urls:
+                    self.frontier.release(target_url, source_type="authenticated")
+                raise
+
+        async for finding in stream_findings(produce):
+            yield finding
+
+    async def _claim_and_visit(self, task: ResearchTask, pending_urls: List[str], emit: Emit) -> None:
+        """Claims the task's URLs, serves fresh ones from history or cache and visits the rest.
+
+        Claimed URLs awaiting a visit are collected in `pending_urls`, so the
+        caller can release them if the task is cancelled.
+        """
+        for query in task.queries:
+            for target_url in await self._discover(query):
                 try:
-                    # Launch persistent context
-                    context = await p.chromium.launch_persistent_context(
-                        user_data_dir=self.temp_dir,
-                        headless=True,
-                        user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+                    claimed = self.frontier.claim(target_url, task.id, source_type="authenticated")
+                except ValueError as e:
+                    # A malformed result URL (e.g. an out-of-range port) cannot be keyed, so it is not visited.
+                    print(f"    Skipping malformed URL {target_url!r}: {e}")
+                    continue
+                if not claimed:
+                    print(f"    Already claimed by another task: {target_url}")
+                    continue
+                # Only a copy the authenticated browser captured; never the anonymous open-web one.
+                stored = (
+                    await asyncio.to_thread(self.history.fresh_page, target_url, source_type="authenticated")
+                    if self.history
+                    else None
+                )
+                if stored:
+                    print(f"    History hit: {target_url}")
+                    finding = ResearchFinding(
+                        source_url=stored.final_url,
+                        content=stored.content,
+                        relevance_score=0.9,
+                        key_fact=f"Extracted from {stored.title}"
                     )
-                    
-                    page = context.pages[0] if context.pages else await context.new_page()
-
-                    for query in task.queries:
-                        # Random delay
-                        delay = random.uniform(2.0, 5.0)
-                        print(f"  - Researching: {query} (waiting {delay:.1f}s)...")
-                        await asyncio.sleep(delay)
-
-                        # 1. DISCOVERY
-                        target_urls = []
-                        if query.startswith("http"):
-                             target_urls = [query]
-                        else:
-                            try:
-                                print(f"    Discovery: Searching DDG API for best URL(s)...")
-                                results = await asyncio.to_thread(lambda: list(DDGS().text(query, max_results=self.max_results)))
-                                
-                                if results:
-                                    target_urls = [r['href'] for r in results]
-                                    print(f"    Found {len(target_urls)} URLs: {target_urls}")
-                                else:
-                                    print("    No results found via DDGS.")
-                            except Exception as e:
-                                print(f"    Discovery failed: {e}")
-                        
-                        # 2. ACCESS: Visit the URLs
-                        for target_url in target_urls:
-                            try:
-                                await page.goto(target_url, timeout=20000)
-                                await page.wait_for_load_state("domcontentloaded")
-                                await asyncio.sleep(2)
-                                
-                                title = await page.title()
-                                url = page.url
-                                # Basic content extraction
-                                content = await page.evaluate("() => document.body.innerText")
-                                # Increase limit to capture full articles (Gemini has large context)
-                                content = content[:50000] if content else "No content found."
-        
-                                print(f"    Captured: {title} ({len(content)} chars)")
+                    resolved = self.frontier.resolve(target_url, finding, source_type="authenticated")
+                    if resolved is not None:
+                        emit(resolved)
+                    continue
+                page_cache = self.page_cache
+                # Only a copy the browser captured; an anonymous fetch may be a paywall stub.
+                cached = page_cache.get(target_url, source_type="authenticated") if page_cache else None
+                if page_cache and cached and page_cache.is_fresh(cached):
+                    print(f"    Cache hit: {target_url}")
+                    finding = ResearchFinding(
+                        source_url=cached.final_url,
+                        content=await asyncio.to_thread(page_cache.read_text, cached),
+                        relevance_score=0.9,
+                        key_fact=f"Extracted from {cached.title}"
+                    )
+                    resolved = self.frontier.resolve(target_url, finding, source_type="authenticated")
+                    if resolved is not None:
+                        emit(resolved)
+                elif self.offline:
+                    print(f"    Offline, no recorded copy of {target_url}; skipping.")
+                    self.frontier.resolve(target_url, None, source_type="authenticated")
+                else:
+                    pending_urls.append(target_url)
+
+        if pending_urls:
+            await self._visit_all(pending_urls, emit)
+
+    async def _visit_all(self, target_urls: List[str], emit: Emit) -> None:
+        """Visits URLs concurrently on pooled tabs, emitting each finding."""
+        try:
+            await self._create_snapshot()
+            if not self.browser_pool.started:
+                with span("browser.launch", pages=self.browser_pool.size):
+                    await self.browser_pool.start()
+        except Exception as e:
+            print(f"DeepSourceScout [CRITICAL]: Browser launch failed: {e}")
+            # Every claimed URL must be resolved, even if the browser never started.
+            for target_url in target_urls:
+                self.frontier.resolve(target_url, None, source_type="authenticated")
+            return
+
+        await asyncio.gather(*(self._visit(target_url, emit) for target_url in target_urls))
+
+    @traced("browser.visit")
+    async def _visit(self, target_url: str, emit: Emit) -> None:
+        """Loads one URL on a borrowed tab, extracts its text and resolves its frontier claim."""
+        finding = None
+        try:
+            # Pace per domain before taking a tab, so waiting never idles one.
+            await self.pacer.wait(target_url)
+            async with self.browser_pool.page() as page:
+                # A page may not outlive the scouting deadline of a budgeted run.
+                goto_timeout = clamp_timeout(20.0, "scouting")
+                if goto_timeout < MIN_VISIT_SECONDS:
+                    # Too late to load a page, and Playwright would read a 0 ms timeout as none at all.
+                    print(f"    Skipping {target_url}: the scouting deadline has passed")
+                    budget = current_budget()
+                    if budget:
+                        budget.skip("scouting", target_url, "time_budget")
+                else:
+                    finding = await self._capture(page, target_url, goto_timeout * 1000)
+        except Exception as e:
+            print(f"    Access failed for {target_url}: {e}")
+        # Not reached on cancellation: the task's producer releases the claim instead.
+        resolved = self.frontier.resolve(target_url, finding, source_type="authenticated")
+        if resolved is not None:
+            emit(resolved)
+
+    async def _capture(self, page: Any, target_url: str, goto_timeout_ms: float) -> ResearchFinding:
+        """Loads a URL on a tab, records it in the page cache and history, and builds its finding."""
+        started_at = time.perf_counter()
+        if self.fast_capture:
+            await page.goto(target_url, timeout=goto_timeout_ms, wait_until="domcontentloaded")
+            await wait_for_readiness(page)
+        else:
+            await page.goto(target_url, timeout=goto_timeout_ms)
+            await page.wait_for_load_state("domcontentloaded")
+            await asyncio.sleep(2)
+        load_seconds = time.perf_counter() - started_at
+        bytes_saved = self.blocker.take_page_savings(page) if self.blocker else 0
+        self.capture_stats.record(load_seconds, bytes_saved)
+        current_span().set(url=target_url, load_s=round(load_seconds, 3), bytes_blocked=bytes_saved)
         
-                                findings.append(ResearchFinding(
-                                    source_url=url,
-                                    content=content,
-                                    relevance_score=0.9,
-                                    key_fact=f"Extracted from {title}"
-                                ))
-                            except Exception as e:
-                                print(f"    Access failed for {target_url}: {e}")
-                            
-                        # If discovery failed, we skip instead of falling back to broken scraping
-                    
-                    await context.close()
-                
-                except Exception as e:
-                    print(f"DeepSourceScout [CRITICAL]: Browser launch failed: {e}")
-                
-            return findings
+        title = await page.title()
+        url = page.url
+        # Basic content extraction
+        content = await page.evaluate("() => document.body.innerText")
+        # Increase limit to capture full articles (Gemini has large context)
+        content = content[:50000] if content else "No content found."
+        budget = current_budget()
+        if budget:
+            # The browser's own transfer size is not visible here; the captured text stands in for it.
+            budget.charge_bytes(len(content.encode("utf-8")))
+
+        print(
+            f"    Captured: {title} ({len(content)} chars, {load_seconds:.1f}s, "
+            f"~{bytes_saved / 1e3:.0f} KB blocked)"
+        )
+
+        if self.page_cache:
+            html = await page.content()
+            await asyncio.to_thread(
+                self.page_cache.put,
+                target_url,
+                body=html.encode("utf-8"),
+                text=content,
+                title=title,
+                final_url=url,
+                source_type="authenticated",
+            )
+        if self.history:
+            await asyncio.to_thread(
+                self.history.record_page, target_url, url, title, content, source_type="authenticated"
+            )
+
+        return ResearchFinding(
+            source_url=url,
+            content=content,
+            relevance_score=0.9,
+            key_fact=f"Extracted from {title}"
+        )
+
+    async def _discover(self, query: str) -> List[str]:
+        """Resolves a query to the URL(s) to visit."""
+        print(f"  - Researching: {query}...")
+
+        # 1. DISCOVERY
+        if query.startswith("http"):
+            return [query]
+        try:
+            print(f"    Discovery: Searching DDG API for best URL(s)...")
+            results = await self.discovery.search(query, self.max_results)
+            
+            if results:
+                target_urls = [r['href'] for r in results]
+                print(f"    Found {len(target_urls)} URLs: {target_urls}")
+                return target_urls
+            print("    No results found via DDGS.")
+        except Exception as e:
+            print(f"    Discovery failed: {e}")
+        # If discovery failed, we skip instead of falling back to broken scraping
+        return []
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns per-page capture timings and blocking savings for the run metadata."""
+        return self.capture_stats.summary(self.blocker, self.pacer)
 
-    def cleanup(self):
-        """Removes the temporary profile snapshot."""
-        print(f"DeepSourceScout: Cleaning up snapshot at {self.temp_dir}")
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    async def cleanup(self) -> None:
+        """Shuts down the browser pool and removes a temporary profile snapshot."""
+        await self.browser_pool.close()
+        if not self.snapshots.persistent:
+            print(f"DeepSourceScout: Cleaning up snapshot at {self.temp_dir}")
+        self.snapshots.remove()
@@ -0,0 +1,363 @@
+"""
+Extraction Engine: main-content extraction from HTML, run off the event loop.
+"""
+import asyncio
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+
+import lxml.html
+from lxml import etree
+
+Html = Union[str, bytes]
+
+# Elements that never hold article text.
+BOILERPLATE_TAGS = (
+    "script", "style", "noscript", "template", "iframe", "svg", "canvas", "form",
+    "nav", "header", "footer", "aside", "button", "select", "input",
+)
+NEGATIVE_HINTS = re.compile(
+    r"comment|meta|footer|footnote|sidebar|widget|nav|menu|breadcrumb|share|social|"
+    r"promo|advert|sponsor|cookie|consent|banner|popup|modal|related|recommend|subscribe|newsletter|masthead",
+    re.I,
+)
+POSITIVE_HINTS = re.compile(r"article|body|content|entry|main|post|story|text|blog", re.I)
+BLOCK_TAGS = ("p", "h1", "h2", "h3", "h4", "li", "blockquote", "pre", "td")
+MIN_PARAGRAPH_CHARS = 25
+
+
+@dataclass
+class ExtractedPage:
+    """Title and main text of a page."""
+    title: str
+    text: str
+
+
+class Extractor(ABC):
+    """Turns raw HTML into an ExtractedPage.
+
+    Implementations must be picklable (plain classes with simple attributes),
+    since the ExtractionEngine ships them to worker processes.
+    """
+
+    name: str = "base"
+
+    @abstractmethod
+    def extract(self, html: Html, url: str = "") -> ExtractedPage:
+        """Extracts the title and main text.
+
+        Args:
+            html: The page markup (bytes let the parser honour the meta charset).
+            url: The page URL, for extractors that use it.
+        """
+        pass
+
+
+class FirstParagraphsExtractor(Extractor):
+    """The original heuristic: html.parser, title plus the first few <p> tags."""
+
+    name = "first_paragraphs"
+
+    def __init__(self, num_paragraphs: int = 3):
+        self.num_paragraphs = num_paragraphs
+
+    def extract(self, html: Html, url: str = "") -> ExtractedPage:
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, "html.parser")
+        title = soup.title.string if soup.title and soup.title.string else "No Title"
+        paragraphs = [p.get_text() for p in soup.find_all("p")[:self.num_paragraphs]]
+        return ExtractedPage(title=title.strip(), text="\n".join(paragraphs))
+
+
+def _text(element: Any) -> str:
+    return " ".join(element.text_content().split())
+
+
+def _inside_block(element: Any, container: Any) -> bool:
+    """True if the element sits in another text block below the container (e.g. <p> in <li>)."""
+    for ancestor in element.iterancestors():
+        if ancestor is container:
+            return False
+        if ancestor.tag in BLOCK_TAGS:
+            return True
+    return False
+
+
+class ReadabilityExtractor(Extractor):
+    """Readability-style main-content extraction on lxml's C parser.
+
+    Boilerplate elements and blocks whose class/id look like navigation,
+    sharing or ads are removed. Every paragraph then scores its parent (and,
+    at half weight, its grandparent) by length and comma count; container
+    scores are adjusted by class/id hints and discounted by link density. The
+    text blocks of the best container, in document order, form the content.
+    """
+
+    name = "readability"
+
+    def __init__(self, max_chars: int = 50_000, min_content_chars: int = 200):
+        """
+        Args:
+            max_chars: Cap on the extracted text.
+            min_content_chars: Below this, fall back to every substantial paragraph.
+        """
+        self.max_chars = max_chars
+        self.min_content_chars = min_content_chars
+
+    def extract(self, html: Html, url: str = "") -> ExtractedPage:
+        if not html or not html.strip():
+            return ExtractedPage(title="No Title", text="")
+        try:
+            root = lxml.html.document_fromstring(html)
+        except ValueError:
+            # lxml refuses str input that carries an XML encoding declaration.
+            if not isinstance(html, str):
+                return ExtractedPage(title="No Title", text="")
+            try:
+                root = lxml.html.document_fromstring(html.encode("utf-8"))
+            except (etree.ParserError, ValueError):
+                return ExtractedPage(title="No Title", text="")
+        except etree.ParserError:
+            return ExtractedPage(title="No Title", text="")
+
+        title = self._title(root)
+        self._strip_boilerplate(root)
+        body = root.find("body")
+        if body is None:
+            body = root
+
+        candidate = self._best_candidate(body)
+        blocks: List[str] = []
+        if candidate is not None:
+            blocks = self._blocks(candidate)
+        if sum(len(block) for block in blocks) < self.min_content_chars:
+            blocks = [text for text in (_text(p) for p in body.iter("p")) if len(text) >= MIN_PARAGRAPH_CHARS] or blocks
+        if not blocks:
+            fallback = _text(body)
+            blocks = [fallback] if fallback else []
+
+        return ExtractedPage(title=title, text="\n\n".join(blocks)[:self.max_chars])
+
+    @staticmethod
+    def _title(root: Any) -> str:
+        for xpath in ('//meta[@property="og:title"]/@content', "//title/text()", "//h1//text()"):
+            values = [" ".join(v.split()) for v in root.xpath(xpath)]
+            values = [v for v in values if v]
+            if values:
+                return values[0]
+        return "No Title"
+
+    @staticmethod
+    def _strip_boilerplate(root: Any) -> None:
+        for element in list(root.iter(*BOILERPLATE_TAGS)):
+            element.drop_tree()
+        for element in list(root.iter("div", "section", "ul", "table", "span")):
+            hints = f"{element.get('class', '')} {element.get('id', '')}"
+            if hints.strip() and NEGATIVE_HINTS.search(hints) and not POSITIVE_HINTS.search(hints):
+                element.drop_tree()
+        for comment in root.xpath("//comment()"):
+            comment.drop_tree()
+
+    @staticmethod
+    def _class_weight(element: Any) -> float:
+        hints = f"{element.get('class', '')} {element.get('id', '')}"
+        weight = 0.0
+        if NEGATIVE_HINTS.search(hints):
+            weight -= 25
+        if POSITIVE_HINTS.search(hints):
+            weight += 25
+        if element.tag in ("article", "main"):
+            weight += 25
+        return weight
+
+    def _best_candidate(self, body: Any) -> Optional[Any]:
+        scores: Dict[Any, float] = {}
+        for paragraph in body.iter("p", "pre", "td", "blockquote"):
+            text = _text(paragraph)
+            if len(text) < MIN_PARAGRAPH_CHARS:
+                continue
+            points = 1 + text.count(",") + min(len(text) / 100.0, 3)
+            parent = paragraph.getparent()
+            for ancestor, share in ((parent, 1.0), (parent.getparent() if parent is not None else None, 0.5)):
+                if ancestor is None:
+                    continue
+                if ancestor not in scores:
+                    scores[ancestor] = self._class_weight(ancestor)
+                scores[ancestor] += points * share
+
+        best, best_score = None, 0.0
+        for element, score in scores.items():
+            text_length = len(_text(element)) or 1
+            link_length = sum(len(_text(link)) for link in element.iter("a"))
+            score *= 1 - min(link_length / text_length, 1.0)
+            if score > best_score:
+                best, best_score = element, score
+        return best
+
+    @staticmethod
+    def _blocks(container: Any) -> List[str]:
+        blocks: List[str] = []
+        for element in container.iter(*BLOCK_TAGS):
+            if element is container or _inside_block(element, container):
+                continue
+            text = _text(element)
+            if text and (len(text) >= MIN_PARAGRAPH_CHARS or element.tag in ("h1", "h2", "h3", "h4")):
+                blocks.append(text)
+        if not blocks:
+            # The container is itself the text block, e.g. a <td> holding bare text.
+            text = _text(container)
+            blocks = [text] if text else []
+        return blocks
+
+
+class PdfExtractor:
+    """Text extraction from PDF bytes with pypdf, page by page.
+
+    Pages are read in order and extraction stops as soon as `max_chars` of
+    text (or `max_pages` pages) have been collected, so long papers cost
+    only the pages actually used. Truncated downloads are parsed in pypdf's
+    non-strict mode, which rebuilds a missing cross-reference table.
+    """
+
+    name = "pypdf"
+
+    def __init__(self, max_chars: int = 50_000, max_pages: int = 50):
+        self.max_chars = max_chars
+        self.max_pages = max_pages
+
+    def extract(self, data: bytes, url: str = "") -> ExtractedPage:
+        import io
+
+        from pypdf import PdfReader
+
+        try:
+            reader = PdfReader(io.BytesIO(data), strict=False)
+            pages = reader.pages
+            metadata_title = (reader.metadata.title if reader.metadata else None) or ""
+        except Exception:
+            return ExtractedPage(title="No Title", text="")
+
+        texts: List[str] = []
+        total = 0
+        for index in range(min(len(pages), self.max_pages)):
+            try:
+                text = pages[index].extract_text() or ""
+            except Exception:
+                continue
+            text = "\n".join(line.strip() for line in text.splitlines() if line.strip())
+            texts.append(text)
+            total += len(text)
+            if total >= self.max_chars:
+                break
+
+        text = "\n\n".join(texts)[:self.max_chars]
+        title = " ".join(metadata_title.split()) or next((line for line in text.splitlines() if line), "No Title")
+        return ExtractedPage(title=title[:200], text=text)
+
+
+EXTRACTORS = {
+    ReadabilityExtractor.name: ReadabilityExtractor,
+    FirstParagraphsExtractor.name: FirstParagraphsExtractor,
+}
+
+
+def _run_extractor(extractor: Any, html: Html, url: str) -> ExtractedPage:
+    """Worker-process entry point."""
+    page: ExtractedPage = extractor.extract(html, url)
+    return page
+
+
+class ExtractionEngine:
+    """Runs an Extractor on a bounded process pool.
+
+    Parsing is CPU-bound, so it happens in worker processes: it scales
+    across cores and never stalls the event loop that drives the fetches.
+    With `workers=0` extraction runs in a thread instead (useful where
+    processes cannot be spawned).
+    """
+
+    def __init__(
+        self,
+        extractor: Optional[Extractor] = None,
+        workers: Optional[int] = None,
+        pdf_extractor: Optional[PdfExtractor] = None,
+    ):
+        """
+        Args:
+            extractor: The HTML extractor to run; defaults to ReadabilityExtractor.
+            workers: Worker processes; defaults to min(4, CPU count).
+            pdf_extractor: The PDF extractor; defaults to PdfExtractor.
+        """
+        self.extractor = extractor or ReadabilityExtractor()
+        self.pdf_extractor = pdf_extractor or PdfExtractor()
+        self.workers = min(4, os.cpu_count() or 1) if workers is None else workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.pages = 0
+        self.pdfs = 0
+        self.failures = 0
+        self.seconds = 0.0
+        self.chars_out = 0
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers > 0 and self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def extract(self, html: Html, url: str = "") -> ExtractedPage:
+        """Extracts a page without blocking the event loop.
+
+        Args:
+            html: The page markup.
+            url: The page URL.
+
+        Returns:
+            The extracted title and text.
+        """
+        page = await self._run(self.extractor, html, url)
+        self.pages += 1
+        return page
+
+    async def extract_pdf(self, data: bytes, url: str = "") -> ExtractedPage:
+        """Extracts the text of a PDF without blocking the event loop."""
+        page = await self._run(self.pdf_extractor, data, url)
+        self.pdfs += 1
+        return page
+
+    async def _run(self, extractor: Any, data: Html, url: str) -> ExtractedPage:
+        started_at = time.perf_counter()
+        pool = self._executor()
+        try:
+            if pool is None:
+                page = await asyncio.to_thread(_run_extractor, extractor, data, url)
+            else:
+                page = await asyncio.get_running_loop().run_in_executor(pool, _run_extractor, extractor, data, url)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.seconds += time.perf_counter() - started_at
+        self.chars_out += len(page.text)
+        return page
+
+    def close(self) -> None:
+        """Shuts down the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns extraction counters for the run metadata."""
+        return {
+            "extractor": self.extractor.name,
+            "workers": self.workers,
+            "pages": self.pages,
+            "pdfs": self.pdfs,
+            "failures": self.failures,
+            "chars_out": self.chars_out,
+            "seconds": round(self.seconds, 3),
+        }
@@ -0,0 +1,329 @@
+"""
+Fetch Engine: pooled HTTP access shared by the open-web scouts.
+"""
+import asyncio
+import codecs
+import functools
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from researcher.utils import percentile
+
+CHUNK_SIZE = 64 * 1024
+CHARSET_PATTERN = re.compile(r"charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+META_CHARSET_PATTERN = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+BINARY_PREFIXES = ("image/", "video/", "audio/", "font/", "application/octet-stream", "application/zip",
+                   "application/gzip", "application/x-", "application/vnd.", "application/msword")
+
+
+def sniff_kind(content_type: str, head: bytes) -> str:
+    """Classifies a response from its Content-Type and first bytes.
+
+    Args:
+        content_type: The Content-Type header (may be empty or wrong).
+        head: The first bytes of the body.
+
+    Returns:
+        'pdf', 'html', 'text' or 'binary'.
+    """
+    content_type = content_type.split(";")[0].strip().lower()
+    start = head[:1024].lstrip().lower()
+    if head.startswith(b"%PDF-") or content_type == "application/pdf":
+        return "pdf"
+    if content_type in ("text/html", "application/xhtml+xml"):
+        return "html"
+    if start.startswith((b"<!doctype html", b"<html")) or b"<html" in start:
+        return "html"
+    if content_type.startswith("text/") or content_type in ("application/json", "application/xml"):
+        return "text"
+    if not content_type or not content_type.startswith(BINARY_PREFIXES):
+        # Unknown or missing type: treat it as markup unless the bytes are clearly binary.
+        return "binary" if b"\x00" in head[:1024] else "html"
+    return "binary"
+
+
+def decode_body(body: bytes, content_type: str) -> Tuple[str, str]:
+    """Decodes a text body.
+
+    The charset comes from the Content-Type header, then a BOM, then a
+    <meta> tag in the first 4 KB; only if none is usable is the encoding
+    detected (strict UTF-8 first, then charset_normalizer).
+
+    Returns:
+        (text, encoding used).
+    """
+    candidates = []
+    header_match = CHARSET_PATTERN.search(content_type or "")
+    if header_match:
+        candidates.append(header_match.group(1))
+    if body.startswith(codecs.BOM_UTF8):
+        candidates.append("utf-8-sig")
+    elif body.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        candidates.append("utf-16")
+    meta_match = META_CHARSET_PATTERN.search(body[:4096])
+    if meta_match:
+        candidates.append(meta_match.group(1).decode("ascii", "ignore"))
+
+    for encoding in candidates:
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            continue
+        return body.decode(encoding, errors="replace"), encoding
+
+    try:
+        return body.decode("utf-8"), "utf-8"
+    except UnicodeDecodeError:
+        pass
+    from charset_normalizer import from_bytes
+
+    best = from_bytes(body[:200_000]).best()
+    encoding = best.encoding if best else "latin-1"
+    return body.decode(encoding, errors="replace"), encoding
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+@dataclass
+class FetchResult:
+    """The outcome of a single HTTP GET."""
+    url: str
+    final_url: str
+    status_code: int
+    text: str
+    content: bytes = b""
+    headers: Dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+    kind: str = "html"
+    truncated: bool = False
+    encoding: Optional[str] = None
+    bytes_read: int = 0
+
+
+@dataclass
+class FetchTiming:
+    """Timing record for one fetch, kept for the run statistics."""
+    url: str
+    host: str
+    queued: float
+    elapsed: float
+    status_code: Optional[int]
+    num_bytes: int = 0
+    error: Optional[str] = None
+    kind: Optional[str] = None
+    truncated: bool = False
+    bytes_used: int = 0
+
+
+class FetchEngine:
+    """Runs HTTP fetches concurrently over a shared keep-alive connection pool.
+
+    A single `requests.Session` is shared by every task in the run so that
+    TCP/TLS connections are reused. Blocking calls run on a dedicated thread
+    pool sized to the global limit, and each host gets its own semaphore so
+    one slow site cannot occupy every slot.
+
+    Bodies are streamed: the type is sniffed from the Content-Type and the
+    first chunk, binary responses (images, video, archives) are abandoned
+    after that chunk, and downloads stop at `max_bytes` (`max_pdf_bytes`
+    for PDFs). Text is decoded on the worker thread, never the event loop.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 16,
+        per_host_limit: int = 4,
+        timeout: float = 5.0,
+        user_agent: str = DEFAULT_USER_AGENT,
+        max_bytes: int = 2 * 1024 * 1024,
+        max_pdf_bytes: int = 10 * 1024 * 1024,
+    ):
+        """
+        Args:
+            max_connections: Global cap on concurrent blocking calls (fetches and searches).
+            per_host_limit: Cap on concurrent fetches against a single host.
+            timeout: Per-read timeout in seconds; a whole download may take four times this.
+            user_agent: User-Agent header sent with every request.
+            max_bytes: Download cap for HTML and text bodies.
+            max_pdf_bytes: Download cap for PDFs.
+        """
+        self.max_connections = max_connections
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_pdf_bytes = max_pdf_bytes
+
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": user_agent})
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="fetch")
+        self._global_semaphore = asyncio.Semaphore(max_connections)
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        self.timings: List[FetchTiming] = []
+        self._in_flight = 0
+        self._peak_in_flight = 0
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        """Returns the semaphore guarding the given host, creating it on first use."""
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_semaphores[host]
+
+    async def run_blocking(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Runs a blocking callable on the engine's pool under the global limit.
+
+        Args:
+            func: The blocking callable (e.g. a search call).
+            *args: Positional arguments for `func`.
+            **kwargs: Keyword arguments for `func`.
+
+        Returns:
+            Whatever `func` returns.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._global_semaphore:
+            self._enter()
+            try:
+                return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+            finally:
+                self._in_flight -= 1
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """Fetches a URL through the shared session.
+
+        Args:
+            url: The URL to fetch.
+            headers: Extra request headers.
+
+        Returns:
+            The FetchResult for the response (any status code).
+
+        Raises:
+            requests.RequestException: If the request fails at the transport level.
+        """
+        host = urlparse(url).netloc.lower()
+        loop = asyncio.get_running_loop()
+        queued_at = time.perf_counter()
+
+        # Take the host slot first so that waiting on a busy host never holds a global slot.
+        async with self._host_semaphore(host), self._global_semaphore:
+            started_at = time.perf_counter()
+            self._enter()
+            try:
+                result = await loop.run_in_executor(self._executor, self._download, url, headers)
+            except Exception as e:
+                self.timings.append(FetchTiming(
+                    url=url,
+                    host=host,
+                    queued=started_at - queued_at,
+                    elapsed=time.perf_counter() - started_at,
+                    status_code=None,
+                    error=str(e),
+                ))
+                raise
+            finally:
+                self._in_flight -= 1
+
+        result.elapsed = time.perf_counter() - started_at
+        self.timings.append(FetchTiming(
+            url=url,
+            host=host,
+            queued=started_at - queued_at,
+            elapsed=result.elapsed,
+            status_code=result.status_code,
+            num_bytes=result.bytes_read,
+            bytes_used=len(result.content) if result.status_code == 200 else 0,
+            kind=result.kind,
+            truncated=result.truncated,
+        ))
+        return result
+
+    def _download(self, url: str, headers: Optional[Dict[str, str]]) -> FetchResult:
+        """Streams one response body under the size caps (runs on a worker thread)."""
+        deadline = time.monotonic() + 4 * self.timeout
+        with self.session.get(url, timeout=self.timeout, headers=headers, stream=True) as response:
+            content_type = response.headers.get("Content-Type", "")
+            kind: Optional[str] = None
+            chunks: List[bytes] = []
+            size = 0
+            truncated = False
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                if kind is None:
+                    kind = sniff_kind(content_type, chunk)
+                chunks.append(chunk)
+                size += len(chunk)
+                if kind == "binary":
+                    break
+                cap = self.max_pdf_bytes if kind == "pdf" else self.max_bytes
+                if size >= cap or time.monotonic() > deadline:
+                    truncated = True
+                    break
+            kind = kind or sniff_kind(content_type, b"")
+            body = b"".join(chunks)
+            if truncated:
+                body = body[:self.max_pdf_bytes if kind == "pdf" else self.max_bytes]
+
+            text, encoding = "", None
+            if kind in ("html", "text") and body:
+                text, encoding = decode_body(body, content_type)
+            return FetchResult(
+                url=url,
+                final_url=response.url,
+                status_code=response.status_code,
+                text=text,
+                content=body if kind != "binary" else b"",
+                headers=dict(response.headers),
+                kind=kind,
+                truncated=truncated,
+                encoding=encoding,
+                bytes_read=size,
+            )
+
+    def _enter(self) -> None:
+        """Tracks the number of in-flight blocking calls."""
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarises fetch timings for the run metadata.
+
+        Returns:
+            A JSON-serialisable dict of counts, bytes and latency percentiles.
+        """
+        elapsed = [t.elapsed for t in self.timings]
+        queued = [t.queued for t in self.timings]
+        return {
+            "fetches": len(self.timings),
+            "failures": sum(1 for t in self.timings if t.error or t.status_code not in (200, 304)),
+            "bytes_downloaded": sum(t.num_bytes for t in self.timings),
+            "bytes_used": sum(t.bytes_used for t in self.timings),
+            "truncated": sum(1 for t in self.timings if t.truncated),
+            "by_kind": {kind: sum(1 for t in self.timings if t.kind == kind) for kind in ("html", "text", "pdf", "binary")},
+            "hosts": len({t.host for t in self.timings}),
+            "peak_concurrency": self._peak_in_flight,
+            "max_connections": self.max_connections,
+            "per_host_limit": self.per_host_limit,
+            "latency_p50_s": round(percentile(elapsed, 50), 3),
+            "latency_p95_s": round(percentile(elapsed, 95), 3),
+            "latency_max_s": round(max(elapsed, default=0.0), 3),
+            "queue_wait_p95_s": round(percentile(queued, 95), 3),
+        }
+
+    def close(self) -> None:
+        """Closes pooled connections and shuts down the worker threads."""
+        self.session.close()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,197 @@
+"""
+Findings Store: keeps finding content in an append-only spill file instead of memory.
+"""
+import os
+import tempfile
+import threading
+import zlib
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple, Union, overload
+
+from researcher.models import ResearchFinding
+
+
+class FindingsStore:
+    """Append-only file holding the content of one run's findings.
+
+    Each content string is written once and addressed by (offset, length);
+    StoredFinding handles read it back (seek and read, under a lock) when the
+    Analyst or Synthesizer needs it, so memory per finding no longer grows with the
+    page size. Records can be zlib-compressed. The spill file is temporary
+    unless a path is given, and is removed on `close()`.
+    """
+
+    def __init__(self, path: Optional[str] = None, directory: Optional[str] = None, compress: bool = False, level: int = 1):
+        """
+        Args:
+            path: Spill file to create (truncated if it exists); defaults to a temporary file.
+            directory: Where the temporary file goes when no path is given.
+            compress: zlib-compress each record.
+            level: zlib compression level.
+        """
+        if path is None:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            fd, path = tempfile.mkstemp(prefix="findings_", suffix=".bin", dir=directory)
+            self._temporary = True
+        else:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o600)
+            self._temporary = False
+        self.path = path
+        self.compress = compress
+        self.level = level
+        self._file: Optional[BinaryIO] = os.fdopen(fd, "r+b")
+        self._lock = threading.Lock()
+        self._size = 0
+        self.findings = 0
+        self.chars_in = 0
+        self.reads = 0
+
+    def put(self, text: str) -> Tuple[int, int]:
+        """Appends one content string.
+
+        Returns:
+            The (offset, length) of the stored record.
+        """
+        data = text.encode("utf-8")
+        if self.compress:
+            data = zlib.compress(data, self.level)
+        with self._lock:
+            spill = self._open_file()
+            offset = self._size
+            spill.seek(offset)
+            spill.write(data)
+            self._size += len(data)
+        self.chars_in += len(text)
+        return offset, len(data)
+
+    def get(self, offset: int, length: int) -> str:
+        """Reads back the record at (offset, length)."""
+        with self._lock:
+            spill = self._open_file()
+            spill.seek(offset)
+            data = spill.read(length)
+        self.reads += 1
+        if self.compress:
+            data = zlib.decompress(data)
+        return data.decode("utf-8")
+
+    def _open_file(self) -> BinaryIO:
+        if self._file is None:
+            raise ValueError("FindingsStore is closed")
+        return self._file
+
+    def add(self, finding: ResearchFinding) -> "StoredFinding":
+        """Spills a scout's finding and returns its lightweight handle."""
+        offset, length = self.put(finding.content)
+        self.findings += 1
+        return StoredFinding(
+            store=self,
+            offset=offset,
+            length=length,
+            content_chars=len(finding.content),
+            source_url=finding.source_url,
+            relevance_score=finding.relevance_score,
+            key_fact=finding.key_fact,
+            task_ids=list(finding.task_ids),
+            alternate_urls=list(finding.alternate_urls),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns spill counters for the run metadata."""
+        return {
+            "findings": self.findings,
+            "chars_in": self.chars_in,
+            "bytes_on_disk": self._size,
+            "compressed": self.compress,
+            "reads": self.reads,
+        }
+
+    def close(self) -> None:
+        """Closes the spill file, deleting it if it was temporary."""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        if self._temporary:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+class StoredFinding:
+    """A finding whose content lives in a FindingsStore.
+
+    Mirrors the fields of ResearchFinding, so the Analyst, dedup, packer and
+    history code take either. `content` is read from disk on every access;
+    assigning it appends a new record.
+    """
+
+    __slots__ = (
+        "source_url", "relevance_score", "key_fact", "task_ids", "alternate_urls",
+        "content_chars", "_store", "_offset", "_length",
+    )
+
+    def __init__(
+        self,
+        store: FindingsStore,
+        offset: int,
+        length: int,
+        content_chars: int,
+        source_url: str,
+        relevance_score: float,
+        key_fact: str,
+        task_ids: Optional[List[str]] = None,
+        alternate_urls: Optional[List[str]] = None,
+    ):
+        self._store = store
+        self._offset = offset
+        self._length = length
+        self.content_chars = content_chars
+        self.source_url = source_url
+        self.relevance_score = relevance_score
+        self.key_fact = key_fact
+        self.task_ids = task_ids if task_ids is not None else []
+        self.alternate_urls = alternate_urls if alternate_urls is not None else []
+
+    @property
+    def content(self) -> str:
+        return self._store.get(self._offset, self._length)
+
+    @content.setter
+    def content(self, text: str) -> None:
+        self._offset, self._length = self._store.put(text)
+        self.content_chars = len(text)
+
+    def __repr__(self) -> str:
+        return f"StoredFinding(source_url={self.source_url!r}, relevance_score={self.relevance_score:.2f}, chars={self.content_chars})"
+
+
+Finding = Union[ResearchFinding, StoredFinding]
+
+
+class ContentView(Sequence[str]):
+    """Read-only sequence of the findings' content, loaded one item at a time.
+
+    Lets batch scoring iterate over thousands of spilled findings without
+    holding all of their text at once.
+    """
+
+    __slots__ = ("_findings",)
+
+    def __init__(self, findings: Sequence[Finding]):
+        self._findings = findings
+
+    def __len__(self) -> int:
+        return len(self._findings)
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [finding.content for finding in self._findings[index]]
+        return self._findings[index].content
@@ -0,0 +1,154 @@
+"""
+URL Frontier: run-wide deduplication of the pages the scouts fetch.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from researcher.findings import Finding, FindingsStore
+from researcher.models import ResearchFinding
+from researcher.urls import canonicalize_url
+
+
+@dataclass
+class FrontierEntry:
+    """One canonical URL, fetched one way, and every task that asked for it."""
+    canonical_url: str
+    source_type: str = "open_web"
+    task_ids: List[str] = field(default_factory=list)
+    resolved: bool = False
+    # False once the owning task released the claim without fetching; the next claim takes it over.
+    owned: bool = True
+    finding: Optional[Finding] = None
+
+    @property
+    def label(self) -> str:
+        """The URL, tagged with its source type unless it was fetched from the open web."""
+        return self.canonical_url if self.source_type == "open_web" else f"{self.canonical_url} ({self.source_type})"
+
+
+class URLFrontier:
+    """Ensures each canonical URL is fetched once per run, whichever task asks.
+
+    The first task to `claim` a URL owns the fetch and must `resolve` it, or
+    `release` it if the task is cancelled first; later claims only record
+    the task as a referrer, unless the claim was released. The resolved finding
+    carries every referring task in `task_ids`, so it is analysed and sent to
+    synthesis once while still counting for each task.
+
+    Claims are keyed by canonical URL *and* source type: a page an open-web
+    task fetched anonymously does not stop an authenticated task from
+    loading the logged-in version of it.
+
+    With a FindingsStore, `resolve` spills each finding's content and keeps
+    only the returned handle, which scouts emit in place of the original;
+    later referrers are added to that handle.
+    """
+
+    def __init__(self, store: Optional[FindingsStore] = None) -> None:
+        """
+        Args:
+            store: Spill file for finding content; findings are kept whole without one.
+        """
+        self.store = store
+        self._entries: Dict[Tuple[str, str], FrontierEntry] = {}
+        self.duplicate_claims = 0
+        self.redirects = 0
+        self.released = 0
+
+    def claim(self, url: str, task_id: str, source_type: str = "open_web") -> bool:
+        """Registers a task's interest in a URL.
+
+        Args:
+            url: Any spelling of the URL.
+            task_id: The ResearchTask id asking for it.
+            source_type: How the caller fetches it ('open_web' or 'authenticated').
+
+        Returns:
+            True if the caller should fetch the URL, False if another task already owns it.
+        """
+        key = (canonicalize_url(url), source_type)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = FrontierEntry(canonical_url=key[0], source_type=source_type, task_ids=[task_id])
+            return True
+        if not entry.owned and not entry.resolved:
+            entry.owned = True
+            if task_id not in entry.task_ids:
+                entry.task_ids.append(task_id)
+            return True
+
+        self.duplicate_claims += 1
+        if task_id not in entry.task_ids:
+            entry.task_ids.append(task_id)
+            if entry.finding is not None:
+                entry.finding.task_ids.append(task_id)
+        return False
+
+    def resolve(
+        self,
+        url: str,
+        finding: Optional[ResearchFinding],
+        final_url: Optional[str] = None,
+        source_type: str = "open_web",
+    ) -> Optional[Finding]:
+        """Records the outcome of a claimed fetch.
+
+        Args:
+            url: The URL exactly as claimed.
+            finding: The resulting finding, or None if the fetch failed.
+            final_url: The URL after redirects. Defaults to the finding's source URL.
+            source_type: The source type it was claimed with.
+
+        Returns:
+            The finding to emit: its spilled handle when there is a store,
+            otherwise the finding itself (None if the fetch failed).
+        """
+        entry = self._entries[(canonicalize_url(url), source_type)]
+        entry.resolved = True
+        if finding is None:
+            return None
+        finding.task_ids = list(entry.task_ids)
+        entry.finding = self.store.add(finding) if self.store is not None else finding
+
+        # Alias the post-redirect URL so later claims for it are deduplicated too.
+        final_key = (canonicalize_url(final_url or finding.source_url), source_type)
+        if final_key[0] != entry.canonical_url and final_key not in self._entries:
+            self._entries[final_key] = entry
+            self.redirects += 1
+        return entry.finding
+
+    def release(self, url: str, source_type: str = "open_web") -> None:
+        """Gives up a claim that was never resolved, so the next task to claim the URL fetches it.
+
+        Scouts call this when a task is cancelled (gold quota met, or the run
+        budget ran out) between claiming a URL and resolving it. Resolved
+        claims are left alone.
+
+        Args:
+            url: The URL exactly as claimed.
+            source_type: The source type it was claimed with.
+        """
+        entry = self._entries.get((canonicalize_url(url), source_type))
+        if entry is not None and not entry.resolved and entry.owned:
+            entry.owned = False
+            self.released += 1
+
+    def references(self, url: str, source_type: str = "open_web") -> List[str]:
+        """Returns the ids of every task that asked for a URL."""
+        entry = self._entries.get((canonicalize_url(url), source_type))
+        return list(entry.task_ids) if entry else []
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarises deduplication for the run metadata."""
+        unique = {id(entry): entry for entry in self._entries.values()}.values()
+        return {
+            "unique_urls": len(unique),
+            "duplicate_claims": self.duplicate_claims,
+            "redirect_aliases": self.redirects,
+            "released_claims": self.released,
+            "shared_urls": {
+                entry.label: entry.task_ids
+                for entry in unique
+                if len(entry.task_ids) > 1
+            },
+        }
@@ -0,0 +1,400 @@
+"""
+Run History: a local SQLite index of past runs, their pages and findings.
+
+Usage:
+    PYTHONPATH=src python -m researcher.history runs
+    PYTHONPATH=src python -m researcher.history search "solid state batteries"
+    PYTHONPATH=src python -m researcher.history show <run_id>
+    PYTHONPATH=src python -m researcher.history url https://example.com/article
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from researcher.findings import Finding
+from researcher.models import ResearchPlan
+from researcher.urls import canonicalize_url
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    status TEXT NOT NULL DEFAULT 'running',
+    model TEXT,
+    timings TEXT,
+    stats TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    task_id TEXT NOT NULL,
+    description TEXT NOT NULL,
+    source_type TEXT NOT NULL,
+    queries TEXT NOT NULL,
+    PRIMARY KEY (run_id, task_id)
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    canonical_url TEXT NOT NULL,
+    source_type TEXT NOT NULL,
+    final_url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    UNIQUE (canonical_url, source_type)
+);
+CREATE TABLE IF NOT EXISTS findings (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    canonical_url TEXT NOT NULL,
+    source_url TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    score REAL NOT NULL,
+    gold INTEGER NOT NULL,
+    task_ids TEXT NOT NULL,
+    PRIMARY KEY (run_id, canonical_url)
+);
+CREATE INDEX IF NOT EXISTS findings_by_url ON findings(canonical_url);
+CREATE INDEX IF NOT EXISTS runs_by_start ON runs(started_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+    title, content, content='pages', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS pages_ai AFTER INSERT ON pages BEGIN
+    INSERT INTO pages_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS pages_ad AFTER DELETE ON pages BEGIN
+    INSERT INTO pages_fts(pages_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS pages_au AFTER UPDATE ON pages BEGIN
+    INSERT INTO pages_fts(pages_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    INSERT INTO pages_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+"""
+
+
+def content_hash(text: str) -> str:
+    """Returns the SHA-256 of a page's extracted text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class StoredPage:
+    """The extracted text of a page as recorded by an earlier run."""
+    canonical_url: str
+    final_url: str
+    title: str
+    content: str
+    fetched_at: float
+    source_type: str = "open_web"
+
+
+class HistoryStore:
+    """Indexed record of every run's plan, pages, findings and timings.
+
+    Pages are stored once per canonical URL and source type with their
+    extracted text and indexed with FTS5, so past research can be searched
+    and reused. Scouts call `fresh_page` before fetching: a page recorded
+    within `ttl` is served from the store, which makes an incremental re-run
+    of a topic fetch only URLs that are new or stale. The source type keeps
+    the copies apart: an authenticated task is only served what the
+    authenticated browser captured, never the anonymous open-web version.
+
+    Writes are committed in batches (`commit`) rather than per page. The
+    connection is shared with worker threads (scouts record pages through
+    `asyncio.to_thread`, keeping SQLite and FTS5 work off the event loop),
+    so every use of it during a run holds a lock.
+    """
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600, reuse: bool = True):
+        """
+        Args:
+            path: The SQLite database file (created if missing).
+            ttl: Seconds for which a recorded page is reused instead of re-fetched.
+            reuse: Serve fresh pages to the scouts; if False the store only records.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.reuse = reuse
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self._lock = threading.RLock()
+        self.conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.pages_recorded = 0
+
+    def fresh_page(self, url: str, source_type: str = "open_web") -> Optional[StoredPage]:
+        """Returns the recorded page for a URL if it is within the TTL.
+
+        Args:
+            url: Any spelling of the URL.
+            source_type: How the caller fetches pages ('open_web' or 'authenticated');
+                only a copy captured the same way is served.
+
+        Returns:
+            The stored page, or None if unknown, stale or reuse is off.
+        """
+        if not self.reuse:
+            return None
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT canonical_url, final_url, title, content, fetched_at, source_type FROM pages"
+                " WHERE canonical_url = ? AND source_type = ?",
+                (canonicalize_url(url), source_type),
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        if time.time() - row["fetched_at"] >= self.ttl:
+            self.stale += 1
+            return None
+        self.hits += 1
+        return StoredPage(**dict(row))
+
+    def record_page(self, url: str, final_url: str, title: str, content: str, source_type: str = "open_web") -> None:
+        """Records (or refreshes) the extracted text of a fetched page.
+
+        Blocks on SQLite and the FTS5 index; scouts call it through
+        `asyncio.to_thread`.
+
+        Args:
+            url: The URL as requested.
+            final_url: The URL after redirects.
+            title: The page title.
+            content: The extracted text.
+            source_type: How the page was fetched ('open_web' or 'authenticated').
+        """
+        digest = content_hash(content)
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT INTO pages (canonical_url, source_type, final_url, title, content, content_hash, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(canonical_url, source_type) DO UPDATE SET
+                    final_url = excluded.final_url,
+                    title = excluded.title,
+                    content = excluded.content,
+                    content_hash = excluded.content_hash,
+                    fetched_at = excluded.fetched_at
+                """,
+                (canonicalize_url(url), source_type, final_url, title, content, digest, time.time()),
+            )
+            self.pages_recorded += 1
+
+    def start_run(self, run_id: str, topic: str, model: Optional[str] = None) -> None:
+        """Registers a run as it begins."""
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, topic, started_at, model) VALUES (?, ?, ?, ?)",
+                (run_id, topic, time.time(), model),
+            )
+            self.commit()
+
+    def record_plan(self, run_id: str, plan: ResearchPlan) -> None:
+        """Records the sub-tasks and queries of a run's plan."""
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO tasks (run_id, task_id, description, source_type, queries) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, t.id, t.description, t.source_type, json.dumps(t.queries)) for t in plan.sub_tasks],
+            )
+            self.commit()
+
+    def record_findings(self, run_id: str, findings: Iterable[Finding], gold: Iterable[Finding]) -> None:
+        """Records the scored findings of a run and which were kept."""
+        gold_ids = {id(f) for f in gold}
+        rows = [
+            (
+                run_id,
+                canonicalize_url(f.source_url),
+                f.source_url,
+                content_hash(f.content),
+                f.relevance_score,
+                int(id(f) in gold_ids),
+                json.dumps(f.task_ids),
+            )
+            for f in findings
+        ]
+        with self._lock:
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO findings (run_id, canonical_url, source_url, content_hash, score, gold, task_ids)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            self.commit()
+
+    def finish_run(self, run_id: str, status: str, timings: Dict[str, Any], stats: Optional[Dict[str, Any]] = None) -> None:
+        """Marks a run finished and stores its timings and statistics."""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE runs SET finished_at = ?, status = ?, timings = ?, stats = ? WHERE run_id = ?",
+                (time.time(), status, json.dumps(timings), json.dumps(stats, default=str) if stats else None, run_id),
+            )
+            self.commit()
+
+    def commit(self) -> None:
+        """Commits pending writes."""
+        with self._lock:
+            self.conn.commit()
+
+    def recent_runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Returns the most recent runs with their finding counts."""
+        rows = self.conn.execute(
+            """
+            SELECT r.run_id, r.topic, r.started_at, r.finished_at, r.status,
+                   COUNT(f.canonical_url) AS findings, COALESCE(SUM(f.gold), 0) AS gold
+            FROM runs r LEFT JOIN findings f ON f.run_id = r.run_id
+            GROUP BY r.run_id ORDER BY r.started_at DESC LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def run_detail(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Returns a run with its tasks and its findings, best first."""
+        run = self.conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if run is None:
+            return None
+        detail = dict(run)
+        detail["timings"] = json.loads(detail["timings"]) if detail["timings"] else None
+        detail.pop("stats", None)
+        detail["tasks"] = [
+            {"task_id": row["task_id"], "description": row["description"], "queries": json.loads(row["queries"])}
+            for row in self.conn.execute("SELECT * FROM tasks WHERE run_id = ?", (run_id,))
+        ]
+        detail["findings"] = [
+            dict(row) for row in self.conn.execute(
+                "SELECT source_url, score, gold FROM findings WHERE run_id = ? ORDER BY score DESC", (run_id,)
+            )
+        ]
+        return detail
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Full-text search over every recorded page, best match first.
+
+        Args:
+            query: An FTS5 query (plain words are AND-ed).
+            limit: Maximum results.
+        """
+        rows = self.conn.execute(
+            """
+            SELECT p.final_url, p.title, p.fetched_at,
+                   snippet(pages_fts, 1, '[', ']', ' ... ', 12) AS snippet,
+                   (SELECT GROUP_CONCAT(DISTINCT f.run_id) FROM findings f WHERE f.canonical_url = p.canonical_url) AS runs
+            FROM pages_fts JOIN pages p ON p.id = pages_fts.rowid
+            WHERE pages_fts MATCH ? ORDER BY bm25(pages_fts) LIMIT ?
+            """,
+            (query, limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def url_history(self, url: str) -> List[Dict[str, Any]]:
+        """Returns every run that used a URL, with the score it got."""
+        rows = self.conn.execute(
+            """
+            SELECT f.run_id, r.topic, f.score, f.gold, f.content_hash
+            FROM findings f JOIN runs r ON r.run_id = f.run_id
+            WHERE f.canonical_url = ? ORDER BY r.started_at DESC
+            """,
+            (canonicalize_url(url),),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self) -> None:
+        """Commits and closes the database."""
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns reuse counters for the run metadata."""
+        return {
+            "path": self.path,
+            "reused": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "pages_recorded": self.pages_recorded,
+        }
+
+
+def _when(timestamp: Optional[float]) -> str:
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp)) if timestamp else "-"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line queries over the run history."""
+    parser = argparse.ArgumentParser(description="Query the Researcher Agent run history.")
+    parser.add_argument("--db", default=os.path.join(".cache", "history.sqlite"), help="History database (default: .cache/history.sqlite).")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum rows to show.")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("runs", help="List recent runs.")
+    search_parser = commands.add_parser("search", help="Full-text search over recorded pages.")
+    search_parser.add_argument("query")
+    show_parser = commands.add_parser("show", help="Show one run's plan and findings.")
+    show_parser.add_argument("run_id")
+    url_parser = commands.add_parser("url", help="Show every run that used a URL.")
+    url_parser.add_argument("url")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error(f"no history database at {args.db}")
+    store = HistoryStore(args.db)
+    try:
+        if args.command == "runs":
+            rows: Any = store.recent_runs(args.limit)
+        elif args.command == "search":
+            try:
+                rows = store.search(args.query, args.limit)
+            except sqlite3.OperationalError as e:
+                parser.error(f"bad search query: {e}")
+        elif args.command == "show":
+            rows = store.run_detail(args.run_id)
+            if rows is None:
+                parser.error(f"unknown run: {args.run_id}")
+        else:
+            rows = store.url_history(args.url)
+    finally:
+        store.close()
+
+    if args.json:
+        json.dump(rows, sys.stdout, indent=2)
+        print()
+    elif args.command == "runs":
+        for row in rows:
+            print(f"{_when(row['started_at'])}  {row['status']:<8} {row['gold']:>3}/{row['findings']:<3} {row['run_id']}  {row['topic'][:60]}")
+    elif args.command == "search":
+        for row in rows:
+            print(f"{row['title'][:80]}\n  {row['final_url']}  ({_when(row['fetched_at'])}; runs: {row['runs'] or '-'})\n  {row['snippet']}\n")
+    elif args.command == "show":
+        print(f"{rows['topic']}\n{rows['run_id']}  {rows['status']}  started {_when(rows['started_at'])}  timings {rows['timings']}\n")
+        for task in rows["tasks"]:
+            print(f"- {task['description']}")
+            for query in task["queries"]:
+                print(f"    {query}")
+        print()
+        for finding in rows["findings"][:args.limit]:
+            print(f"  {finding['score']:.2f} {'*' if finding['gold'] else ' '} {finding['source_url']}")
+    else:
+        for row in rows:
+            print(f"{row['score']:.2f} {'gold' if row['gold'] else '    '}  {row['run_id']}  {row['topic'][:60]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+LLM Client: one shared, natively async Gemini client per process.
+"""
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from researcher.budget import current_budget
+from researcher.llm_cache import LLMCache
+from researcher.packer import estimate_tokens
+from researcher.ratelimit import RateController
+from researcher.tracing import current_span, span
+from researcher.utils import percentile
+
+
+class StreamInterruptedError(RuntimeError):
+    """Raised when a stream fails after text was already delivered (not retryable)."""
+
+
+class LLMClient:
+    """Process-wide gateway for Gemini calls.
+
+    Calls go through the SDK's async interface (`client.aio`), so an
+    in-flight request holds no worker thread and never competes with the
+    scouts' blocking fetches for the default executor. One client (and so
+    one HTTP connection pool) is shared by every agent, and every request
+    is admitted, throttled and retried by one RateController. The optional
+    LLMCache is consulted before any network call.
+    """
+
+    _shared: Optional["LLMClient"] = None
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 8,
+        cache: Optional[LLMCache] = None,
+        rate_controller: Optional[RateController] = None,
+        client: Optional[Any] = None,
+    ):
+        """
+        Args:
+            api_key: Gemini API key; defaults to GEMINI_API_KEY.
+            max_concurrency: Maximum concurrent requests across all callers
+                (ignored when a rate_controller is given).
+            cache: Optional record/replay response cache.
+            rate_controller: Admission control and retries; defaults to one
+                with `max_concurrency` as its concurrency ceiling.
+            client: A ready genai.Client, or a stand-in exposing the same
+                `aio.models` interface (used by the offline benchmarks).
+        """
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        # A genai.Client (or a stand-in with the same `aio` surface); None without an API key.
+        self.client: Any = client
+        if self.client is None and self.api_key:
+            # google-genai is slow to import, so mock and offline runs never load it
+            from google import genai
+
+            self.client = genai.Client(api_key=self.api_key)
+        self.cache = cache
+        self.rate_controller = rate_controller or RateController(max_concurrency=max_concurrency)
+
+        self.calls = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self._latencies: List[float] = []
+        self._calls_by_model: Dict[str, int] = {}
+
+    @classmethod
+    def shared(cls) -> "LLMClient":
+        """Returns the process-wide client, creating it on first use."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def set_shared(cls, client: "LLMClient") -> None:
+        """Installs a configured client as the process-wide default."""
+        cls._shared = client
+
+    @property
+    def replaying(self) -> bool:
+        """True if responses come only from the replay cache."""
+        return self.cache is not None and self.cache.replay
+
+    @property
+    def available(self) -> bool:
+        """True if calls can be answered, by the API or by replay."""
+        return self.client is not None or self.replaying
+
+    async def generate(self, model: str, prompt: str, config: Any = None) -> Any:
+        """Generates content, from the cache if recorded.
+
+        Args:
+            model: Gemini model name.
+            prompt: The prompt text.
+            config: A types.GenerateContentConfig.
+
+        Returns:
+            The SDK response (or a CachedResponse); both expose `.text`.
+
+        Raises:
+            ReplayMissError: In replay mode, when the request was never recorded.
+            BudgetExceededError: If the prompt does not fit the run's token budget.
+            ValueError: If no API key is configured.
+        """
+        with span("llm.call", model=model, prompt_tokens_est=estimate_tokens(prompt), streamed=False) as call_span:
+            cache_key = None
+            if self.cache:
+                cache_key = self.cache.key(model, config, prompt)
+                cached = self.cache.get(cache_key)
+                call_span.set(cached=cached is not None)
+                if cached:
+                    return cached
+
+            if not self.client:
+                raise ValueError("Client not initialized")
+            self._check_budget(prompt)
+
+            response = await self.rate_controller.call(
+                model,
+                estimate_tokens(prompt),
+                lambda: self._send(model, prompt, config),
+            )
+
+            if self.cache and cache_key is not None:
+                self.cache.put(cache_key, model, response.text)
+            return response
+
+    async def generate_stream(self, model: str, prompt: str, config: Any, on_text: Callable[[str], None]) -> str:
+        """Generates content with the streaming API, delivering text as it arrives.
+
+        A recorded response is delivered as a single chunk. Failures before
+        the first chunk are retried like any call; a failure mid-stream is
+        not, since the caller has already consumed part of the answer.
+
+        Args:
+            model: Gemini model name.
+            prompt: The prompt text.
+            config: A types.GenerateContentConfig.
+            on_text: Called with each chunk of answer text (thoughts excluded).
+
+        Returns:
+            The complete answer text.
+
+        Raises:
+            ReplayMissError: In replay mode, when the request was never recorded.
+            StreamInterruptedError: If the stream broke after delivering text.
+            BudgetExceededError: If the prompt does not fit the run's token budget.
+            ValueError: If no API key is configured.
+        """
+        with span("llm.call", model=model, prompt_tokens_est=estimate_tokens(prompt), streamed=True) as call_span:
+            cache_key = None
+            if self.cache:
+                cache_key = self.cache.key(model, config, prompt)
+                cached = self.cache.get(cache_key)
+                call_span.set(cached=cached is not None)
+                if cached:
+                    on_text(cached.text)
+                    return cached.text
+
+            if not self.client:
+                raise ValueError("Client not initialized")
+            self._check_budget(prompt)
+
+            text = await self.rate_controller.call(
+                model,
+                estimate_tokens(prompt),
+                lambda: self._send_stream(model, prompt, config, on_text),
+            )
+
+            if self.cache and cache_key is not None:
+                self.cache.put(cache_key, model, text)
+            return text
+
+    async def _send(self, model: str, prompt: str, config: Any) -> Any:
+        """Makes one API request (one attempt)."""
+        started_at = time.perf_counter()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self.calls += 1
+        self._calls_by_model[model] = self._calls_by_model.get(model, 0) + 1
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=model,
+                contents=prompt,
+                config=config,
+            )
+            self._count_tokens(getattr(response, "usage_metadata", None))
+            return response
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._latencies.append(time.perf_counter() - started_at)
+
+    async def _send_stream(self, model: str, prompt: str, config: Any, on_text: Callable[[str], None]) -> str:
+        """Makes one streaming API request (one attempt) and returns the full text."""
+        started_at = time.perf_counter()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self.calls += 1
+        self._calls_by_model[model] = self._calls_by_model.get(model, 0) + 1
+        parts: List[str] = []
+        try:
+            stream = await self.client.aio.models.generate_content_stream(
+                model=model,
+                contents=prompt,
+                config=config,
+            )
+            usage = None
+            async for chunk in stream:
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                text = chunk.text
+                if text:
+                    parts.append(text)
+                    on_text(text)
+            self._count_tokens(usage)
+        except Exception as e:
+            self.failures += 1
+            if parts:
+                raise StreamInterruptedError(f"stream broke after {sum(map(len, parts))} chars: {e}") from e
+            raise
+        finally:
+            self.in_flight -= 1
+            self._latencies.append(time.perf_counter() - started_at)
+        return "".join(parts)
+
+    def _count_tokens(self, usage: Any) -> None:
+        """Adds a response's reported token usage to the totals and the current span."""
+        if usage is None:
+            return
+        prompt_tokens = usage.prompt_token_count or 0
+        output_tokens = (usage.candidates_token_count or 0) + (usage.thoughts_token_count or 0)
+        self.prompt_tokens += prompt_tokens
+        self.output_tokens += output_tokens
+        current_span().set(prompt_tokens=prompt_tokens, output_tokens=output_tokens)
+        budget = current_budget()
+        if budget:
+            budget.charge_llm_tokens(prompt_tokens + output_tokens)
+
+    @staticmethod
+    def _check_budget(prompt: str) -> None:
+        """Refuses a call that would exceed the current run's token budget (cached answers are free)."""
+        budget = current_budget()
+        if budget:
+            budget.check_llm(estimate_tokens(prompt))
+
+    async def aclose(self) -> None:
+        """Closes the async HTTP session."""
+        if self.client:
+            await self.client.aio.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns concurrency and latency counters for the run metadata."""
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "calls_by_model": dict(self._calls_by_model),
+            "peak_in_flight": self.peak_in_flight,
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "latency_p50_s": round(percentile(self._latencies, 50), 2),
+            "latency_p95_s": round(percentile(self._latencies, 95), 2),
+            "rate_control": self.rate_controller.stats(),
+            "cache": self.cache.stats() if self.cache else None,
+        }
@@ -0,0 +1,134 @@
+"""
+LLM Cache: content-addressed record/replay store for Gemini responses.
+"""
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode when no recorded response matches a request."""
+
+
+@dataclass
+class CachedResponse:
+    """A recorded response; exposes `.text` like a genai GenerateContentResponse."""
+    text: str
+
+
+def _config_fingerprint(config: Any) -> Any:
+    """Serialises a GenerateContentConfig (or plain dict) deterministically."""
+    if config is None:
+        return None
+    if hasattr(config, "model_dump"):
+        return config.model_dump(mode="json", exclude_none=True)
+    return config
+
+
+class LLMCache:
+    """On-disk cache of model responses, one JSON file per request.
+
+    The key is the SHA-256 of (model, config, prompt), so any change to the
+    prompt or generation settings is a miss. Reading a file touches its
+    mtime; once the directory exceeds `max_bytes`, the least recently used
+    files are removed.
+
+    In replay mode the cache is the only source of responses: a miss raises
+    ReplayMissError instead of calling the model, which makes end-to-end
+    runs deterministic and offline.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024, replay: bool = False):
+        """
+        Args:
+            cache_dir: Directory for recorded responses.
+            max_bytes: Size cap for the directory before LRU eviction starts.
+            replay: Serve only recorded responses and fail on a miss.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.replay = replay
+        os.makedirs(cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def key(self, model: str, config: Any, prompt: str) -> str:
+        """Returns the content address of a request."""
+        material = json.dumps(
+            {"model": model, "config": _config_fingerprint(config), "prompt": prompt},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Returns the recorded response for a key.
+
+        Raises:
+            ReplayMissError: In replay mode, when nothing is recorded.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            if self.replay:
+                # No key in the message: hex digits could look like a 429 to retry logic.
+                raise ReplayMissError("Replay mode: no recorded LLM response for this request")
+            return None
+        self.hits += 1
+        return CachedResponse(text=record["text"])
+
+    def put(self, key: str, model: str, text: str) -> None:
+        """Records a response (never in replay mode)."""
+        if self.replay or text is None:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model": model, "recorded_at": time.time(), "text": text}, f)
+        os.replace(tmp_path, path)
+        self.writes += 1
+        self._evict()
+
+    def _evict(self) -> None:
+        """Removes least recently used responses until under max_bytes."""
+        files = []
+        total = 0
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters for the run metadata."""
+        return {
+            "replay": self.replay,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
@@ -34,6 +34,13 @@ class ResearchFinding(BaseModel):
     content: str
     relevance_score: float = Field(..., ge=0, le=1.0)
     key_fact: str
+    task_ids: List[str] = Field(default_factory=list, description="IDs of every ResearchTask that referenced this source")
+    alternate_urls: List[str] = Field(default_factory=list, description="URLs of near-duplicate copies collapsed into this finding")
+
+    @property
+    def content_chars(self) -> int:
+        """Length of the content in characters."""
+        return len(self.content)
 
 class ResearchReport(BaseModel):
     """The final synthesized output."""
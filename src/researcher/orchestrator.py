@@ -1,61 +1,46 @@
 """
 Orchestrator Agent: The brain of the operation.
 """
+import asyncio
 import uuid
 import os
 from typing import List, Optional
-import asyncio
-from dotenv import load_dotenv
-from google import genai
-from google.genai import types
 
-from researcher.utils import retry_on_quota_error
+from researcher.budget import BudgetExceededError, current_budget
+from researcher.llm import LLMClient
+from researcher.llm_cache import ReplayMissError
 from researcher.models import ResearchPlan, ResearchTask, ReportType
-
-# Load environment variables
-load_dotenv()
+from researcher.tracing import traced
 
 
 class Orchestrator:
     """Break down complex topics into actionable research plans."""
 
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, llm: Optional[LLMClient] = None):
         """Initialize the Orchestrator.
         
         Args:
             model_name: The LLM model to use. Defaults to env GEMINI_MODEL or 'gemini-3-pro-preview'.
+            llm: Shared Gemini client; defaults to the process-wide LLMClient.
         """
         self.model_name = model_name or os.getenv("GEMINI_MODEL", "gemini-3-pro-preview")
-        self.api_key = os.getenv("GEMINI_API_KEY")
-        self.client: Optional[genai.Client] = None
+        self.llm = llm or LLMClient.shared()
         
-        if not self.api_key:
+        if not self.llm.available:
             print("Orchestrator [WARNING]: GEMINI_API_KEY not found in environment.")
-        else:
-            self.client = genai.Client(api_key=self.api_key)
 
-    @retry_on_quota_error(max_retries=3, initial_delay=10.0)
     async def _generate_content(self, prompt: str, text_schema: bool = False):
-        """Helper to call Gemini API with retries using the new SDK."""
-        if not self.client:
-             raise ValueError("Client not initialized")
-        
+        """Helper to call Gemini through the shared async client (rate-controlled and retried there)."""
         # Configure for structured JSON output if needed
         # Note: The new SDK handles schema differently. For this PoC, ensuring JSON mode via config.
+        from google.genai import types
+
         config = types.GenerateContentConfig(
             response_mime_type="application/json" if not text_schema else "text/plain"
         )
+        return await self.llm.generate(self.model_name, prompt, config)
 
-        # The new SDK's generate_content is synchronous. To keep the orchestrator async,
-        # we run it in a separate thread using asyncio.to_thread.
-        return await asyncio.to_thread(
-            self.client.models.generate_content,
-            model=self.model_name,
-            contents=prompt,
-            config=config
-        )
-        return response
-
+    @traced("generate_plan")
     async def generate_plan(self, topic: str, report_type: ReportType = ReportType.INSTA_EXPERT) -> ResearchPlan:
         """Generates a comprehensive research plan for the given topic.
         
@@ -68,7 +53,7 @@ class Orchestrator:
         """
         print(f"Orchestrator [{self.model_name}]: Analyzing topic '{topic}'...")
 
-        if not self.client:
+        if not self.llm.available:
             print("Orchestrator: No API Key, returning mock plan.")
             return self._generate_mock_plan(topic)
 
@@ -100,22 +85,24 @@ class Orchestrator:
         }}
         """
 
+        # A budgeted run gives planning a deadline; past it, the fallback plan is used.
+        budget = current_budget()
         try:
-            # We call the helper which uses the synchronous generation (wrapped in async retry if needed)
-            # The new SDK generate_content is synchronous network-wise unless using async_client?
-            # The user snippet showed sync usage. We'll wrap it or use it directly. 
-            # For strict asyncio compliance we might want run_in_executor, but for now we'll call it.
-            
-            # Note: The retry decorator expects an async function.
-            # We need to make _generate_content async-compatible or update the decorator.
-            # We'll make _generate_content run the sync call.
-            
-            # Actually, google.genai has an async client? The docs aren't fully clear from the snippet.
-            # Assuming sync for now based on snippet. We will wrap in to_thread to keep it async for the agent.
-            
-            response = await self._generate_content(prompt)
+            # The shared client calls the SDK's native async API; no worker thread is held.
+            response = await asyncio.wait_for(self._generate_content(prompt), budget.stage_remaining("plan") if budget else None)
             return ResearchPlan.model_validate_json(response.text)
 
+        except ReplayMissError:
+            raise
+        except (asyncio.TimeoutError, BudgetExceededError) as e:
+            if budget is None:
+                print(f"Orchestrator Error: {e!r}")
+                return self._generate_mock_plan(topic)
+            limit = "max_llm_tokens" if isinstance(e, BudgetExceededError) else "time_budget"
+            print(f"Orchestrator [WARNING]: Planning stopped by the run budget ({limit}); using the fallback plan.")
+            budget.hit(limit, f"planning stopped by {limit}")
+            budget.skip("plan", "Gemini research plan", limit)
+            return self._generate_mock_plan(topic)
         except Exception as e:
             print(f"Orchestrator Error: {e}")
             return self._generate_mock_plan(topic)
@@ -0,0 +1,252 @@
+"""
+Context Packer: fits the most relevant passages of the findings into a token budget.
+"""
+import math
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+from researcher.dedup import NearDuplicateIndex
+from researcher.findings import Finding
+from researcher.models import ResearchPlan
+from researcher.relevance import RelevanceEngine
+
+# Gemini tokenises English at roughly four characters per token.
+CHARS_PER_TOKEN = 4.0
+PARAGRAPH_PATTERN = re.compile(r"\n\s*\n|\n")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the token count of a text without calling a tokenizer."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def split_passages(text: str, target_chars: int = 800) -> List[str]:
+    """Splits text into passages of about `target_chars`.
+
+    Paragraphs are merged until they reach the target; paragraphs longer
+    than twice the target are cut at sentence boundaries.
+
+    Args:
+        text: The finding content.
+        target_chars: Preferred passage length.
+
+    Returns:
+        The passages in document order.
+    """
+    pieces: List[str] = []
+    for paragraph in PARAGRAPH_PATTERN.split(text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        if len(paragraph) <= 2 * target_chars:
+            pieces.append(paragraph)
+            continue
+        sentence_run = ""
+        for sentence in SENTENCE_PATTERN.split(paragraph):
+            if sentence_run and len(sentence_run) + len(sentence) > target_chars:
+                pieces.append(sentence_run)
+                sentence_run = ""
+            sentence_run = f"{sentence_run} {sentence}".strip()
+            # A single run-on "sentence" is cut hard.
+            while len(sentence_run) > 2 * target_chars:
+                pieces.append(sentence_run[:target_chars])
+                sentence_run = sentence_run[target_chars:]
+        if sentence_run:
+            pieces.append(sentence_run)
+
+    passages: List[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) > target_chars:
+            passages.append(current)
+            current = ""
+        current = f"{current}\n{piece}" if current else piece
+    if current:
+        passages.append(current)
+    return passages
+
+
+def fit_texts(texts: Sequence[str], token_budget: int) -> Tuple[List[str], int]:
+    """Trims texts so that together they fit a token budget, sharing it fairly.
+
+    Texts no longer than an equal share are kept whole and the budget they
+    leave goes to the longer ones, which are all cut to the same length (at
+    a line break where one is near).
+
+    Args:
+        texts: The texts, e.g. the map-reduce sub-task notes.
+        token_budget: Estimated tokens available for all of them.
+
+    Returns:
+        (the texts in input order, how many were trimmed).
+    """
+    sizes = [estimate_tokens(text) for text in texts]
+    if sum(sizes) <= token_budget:
+        return list(texts), 0
+
+    remaining, uncapped = token_budget, len(texts)
+    for size in sorted(sizes):
+        if size > remaining // uncapped:
+            break
+        remaining -= size
+        uncapped -= 1
+    cap_chars = int(max(remaining // max(uncapped, 1), 0) * CHARS_PER_TOKEN)
+
+    fitted: List[str] = []
+    trimmed = 0
+    for text, size in zip(texts, sizes):
+        if len(text) <= cap_chars:
+            fitted.append(text)
+            continue
+        cut = text[:cap_chars]
+        line_break = cut.rfind("\n")
+        if line_break > cap_chars // 2:
+            cut = cut[:line_break]
+        fitted.append(f"{cut}\n[...]")
+        trimmed += 1
+    return fitted, trimmed
+
+
+@dataclass
+class Passage:
+    """One excerpt of a finding, with its score and estimated size."""
+    finding_index: int
+    position: int
+    text: str
+    tokens: int
+    score: float = 0.0
+
+
+@dataclass
+class PackedContext:
+    """The findings text for the prompt and what it took to build it."""
+    text: str
+    tokens: int
+    passages_total: int
+    passages_kept: int
+    passages_duplicate: int
+    sources: int
+
+    @property
+    def passages_dropped(self) -> int:
+        return self.passages_total - self.passages_kept
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns packing counters for the run metadata."""
+        return {
+            "context_tokens_estimate": self.tokens,
+            "passages_total": self.passages_total,
+            "passages_kept": self.passages_kept,
+            "passages_dropped": self.passages_dropped,
+            "passages_duplicate": self.passages_duplicate,
+            "sources": self.sources,
+        }
+
+
+class ContextPacker:
+    """Selects passages for the Synthesizer prompt under a token budget.
+
+    Every finding is split into passages, which are scored with BM25 against
+    the plan's key questions and the sub-tasks that found them, weighted by
+    the finding's Analyst score. Near-duplicate passages (the same paragraph
+    quoted by several sources) are kept once. The best passage of each
+    finding is packed first, so every source can still be cited, then the
+    remaining budget goes to the highest-scoring passages overall.
+    """
+
+    def __init__(self, plan: ResearchPlan, token_budget: int = 100_000, passage_chars: int = 800):
+        """
+        Args:
+            plan: The research plan the passages are scored against.
+            token_budget: Estimated tokens available for the findings text.
+            passage_chars: Preferred passage length in characters.
+        """
+        self.plan = plan
+        self.token_budget = token_budget
+        self.passage_chars = passage_chars
+
+    def _header(self, finding: Finding) -> str:
+        return (
+            f"Source: {finding.source_url}\n"
+            + (f"Also published at: {', '.join(sorted(finding.alternate_urls))}\n" if finding.alternate_urls else "")
+            + f"Reliability: {finding.relevance_score:.2f}\n"
+            + "Content:\n"
+        )
+
+    def pack(self, findings: Sequence[Finding]) -> PackedContext:
+        """Builds the findings text for the prompt.
+
+        Args:
+            findings: The gold findings.
+
+        Returns:
+            The packed text, grouped by source in the findings' order.
+        """
+        passages: List[Passage] = []
+        for index, finding in enumerate(findings):
+            for position, text in enumerate(split_passages(finding.content, self.passage_chars)):
+                passages.append(Passage(index, position, text, estimate_tokens(text) + 1))
+
+        if passages:
+            relevance, _ = RelevanceEngine(self.plan).relevance(
+                [p.text for p in passages],
+                [findings[p.finding_index].task_ids for p in passages],
+            )
+            for passage, passage_relevance in zip(passages, relevance):
+                passage.score = 0.8 * float(passage_relevance) + 0.2 * findings[passage.finding_index].relevance_score
+
+        ranked = sorted(passages, key=lambda p: (-p.score, p.finding_index, p.position))
+        by_finding: Dict[int, List[Passage]] = {}
+        for passage in ranked:
+            by_finding.setdefault(passage.finding_index, []).append(passage)
+
+        dedup = NearDuplicateIndex(threshold=0.5)
+        header_tokens = {index: estimate_tokens(self._header(f)) for index, f in enumerate(findings)}
+        selected: Dict[int, List[Passage]] = {}
+        taken = set()
+        used = 0
+        duplicates = 0
+
+        def take(passage: Passage) -> bool:
+            """Packs a passage if it fits and is not a near-copy of one already packed."""
+            nonlocal used, duplicates
+            cost = passage.tokens + (0 if passage.finding_index in selected else header_tokens[passage.finding_index])
+            if used + cost > self.token_budget:
+                return False
+            signature = dedup.signature(passage.text)
+            if dedup.find(signature) is not None:
+                duplicates += 1
+                taken.add(id(passage))
+                return False
+            dedup.add(findings[passage.finding_index], signature)
+            selected.setdefault(passage.finding_index, []).append(passage)
+            taken.add(id(passage))
+            used += cost
+            return True
+
+        # First, the best original passage of every source, best sources first.
+        for candidates in by_finding.values():
+            for passage in candidates:
+                if take(passage):
+                    break
+        # Then whatever budget is left, best passages first.
+        for passage in ranked:
+            if id(passage) not in taken:
+                take(passage)
+
+        blocks = []
+        for index in sorted(selected):
+            excerpts = "\n[...]\n".join(p.text for p in sorted(selected[index], key=lambda p: p.position))
+            blocks.append(self._header(findings[index]) + excerpts)
+        text = "\n\n".join(blocks)
+
+        return PackedContext(
+            text=text,
+            tokens=estimate_tokens(text),
+            passages_total=len(passages),
+            passages_kept=sum(len(kept) for kept in selected.values()),
+            passages_duplicate=duplicates,
+            sources=len(selected),
+        )
@@ -0,0 +1,204 @@
+"""
+Research Pipeline: drives the Scouts and the Analyst, in batch or streaming mode.
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from researcher.analyst import Analyst
+from researcher.budget import RunBudget
+from researcher.findings import Finding, FindingsStore, StoredFinding
+from researcher.models import ResearchPlan, ResearchTask
+from researcher.scout import BaseScout
+from researcher.tracing import span
+
+
+@dataclass
+class PipelineResult:
+    """Everything the scouting and analysis stages produced."""
+    findings: List[Finding] = field(default_factory=list)
+    gold_findings: List[Finding] = field(default_factory=list)
+    stopped_tasks: List[str] = field(default_factory=list)
+    failed_tasks: List[str] = field(default_factory=list)
+    cut_tasks: List[str] = field(default_factory=list)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the early-stop, budget-cut and failure record for the run metadata."""
+        return {
+            "stopped_early": self.stopped_tasks,
+            "cut_by_budget": self.cut_tasks,
+            "failed": self.failed_tasks,
+        }
+
+
+class ResearchPipeline:
+    """Runs every sub-task of a plan through its scout and the Analyst.
+
+    Modes:
+        batch:  wait for every scout, then analyse the full list.
+        stream: analyse each finding the moment a scout yields it; once a
+                sub-task has `gold_quota` gold findings, its outstanding
+                searches and fetches are cancelled.
+
+    In both modes a RunBudget ends scouting at its deadline or download cap:
+    unfinished sub-tasks are cancelled and the findings gathered so far are
+    kept.
+    """
+
+    def __init__(
+        self,
+        analyst: Analyst,
+        select_scout: Callable[[ResearchTask], BaseScout],
+        gold_quota: Optional[int] = None,
+        store: Optional[FindingsStore] = None,
+        budget: Optional[RunBudget] = None,
+    ):
+        """
+        Args:
+            analyst: The Analyst used to score findings.
+            select_scout: Returns the scout responsible for a task.
+            gold_quota: Gold findings per sub-task after which gathering for it stops (stream mode).
+            store: Spill file for finding content; findings are kept in memory without one.
+            budget: The run's limits; scouting is unbounded without one.
+        """
+        self.analyst = analyst
+        self.select_scout = select_scout
+        self.gold_quota = gold_quota
+        self.store = store
+        self.budget = budget
+
+    def _spill(self, finding: Finding) -> Finding:
+        """Moves a scout's finding into the store, leaving a small handle.
+
+        Findings that came through a frontier sharing the store are already
+        handles and pass through unchanged.
+        """
+        if self.store is None or isinstance(finding, StoredFinding):
+            return finding
+        return self.store.add(finding)
+
+    async def run(self, plan: ResearchPlan, mode: str = "stream") -> PipelineResult:
+        """Gathers and analyses findings for every sub-task of the plan.
+
+        Args:
+            plan: The research plan.
+            mode: 'stream' or 'batch'.
+
+        Returns:
+            The raw and gold findings plus early-stop information.
+        """
+        if mode == "batch":
+            return await self.run_batch(plan)
+        return await self.run_stream(plan)
+
+    async def run_batch(self, plan: ResearchPlan) -> PipelineResult:
+        """Runs all scouts to completion, then analyses everything at once."""
+        result = PipelineResult()
+        # Findings accumulate outside the tasks, so a task cut by the budget keeps what it found.
+        found: Dict[str, List[Finding]] = {task.id: [] for task in plan.sub_tasks}
+        gatherers = {task.id: asyncio.create_task(self._gather(task, found[task.id])) for task in plan.sub_tasks}
+        watchdog = self._enforce_budget(gatherers, result)
+        try:
+            outcomes = await asyncio.gather(*gatherers.values(), return_exceptions=True)
+        finally:
+            if watchdog:
+                watchdog.cancel()
+        for task, outcome in zip(plan.sub_tasks, outcomes):
+            if isinstance(outcome, BaseException) and not isinstance(outcome, asyncio.CancelledError):
+                print(f"Pipeline [ERROR]: Task '{task.description}' failed: {outcome}")
+                result.failed_tasks.append(task.id)
+                continue
+            result.findings.extend(self._spill(finding) for finding in found[task.id])
+
+        print(f"\n[Scouting Complete]: {len(result.findings)} raw findings gathered.\n")
+        result.gold_findings = self.analyst.analyze(result.findings)
+        return result
+
+    async def _gather(self, task: ResearchTask, found: List[Finding]) -> None:
+        with span("scout.task", task_id=task.id, source_type=task.source_type) as task_span:
+            async for finding in self.select_scout(task).stream(task):
+                found.append(finding)
+                task_span.set(findings=len(found))
+
+    def _enforce_budget(self, tasks: Dict[str, asyncio.Task], result: PipelineResult) -> Optional[asyncio.Task]:
+        """Starts a watchdog that cancels unfinished scout tasks when the budget ends scouting."""
+        if self.budget is None or not self.budget.bounds_scouting:
+            return None
+        budget = self.budget
+
+        async def watch() -> None:
+            limit = await budget.wait_scouting_limit()
+            for task_id, task in tasks.items():
+                if not task.done():
+                    print(f"Pipeline: Budget exhausted ({limit}); stopping task {task_id}.")
+                    task.cancel()
+                    result.cut_tasks.append(task_id)
+                    budget.skip("scouting", task_id, limit)
+
+        return asyncio.create_task(watch())
+
+    async def run_stream(self, plan: ResearchPlan) -> PipelineResult:
+        """Scores findings as they arrive and stops sub-tasks that met their quota."""
+        result = PipelineResult()
+        queue: "asyncio.Queue[Any]" = asyncio.Queue()
+        task_done = object()
+        gold_counts: Dict[str, int] = {task.id: 0 for task in plan.sub_tasks}
+
+        async def pump(task: ResearchTask) -> None:
+            with span("scout.task", task_id=task.id, source_type=task.source_type) as task_span:
+                count = 0
+                async for finding in self.select_scout(task).stream(task):
+                    if not finding.task_ids:
+                        finding.task_ids.append(task.id)
+                    queue.put_nowait(self._spill(finding))
+                    count += 1
+                    task_span.set(findings=count)
+
+        producers: Dict[str, asyncio.Task] = {}
+        for task in plan.sub_tasks:
+            producer = asyncio.create_task(pump(task))
+            producer.add_done_callback(lambda _: queue.put_nowait(task_done))
+            producers[task.id] = producer
+
+        watchdog = self._enforce_budget(producers, result)
+        print("Analyst: Scoring findings as they arrive...")
+        remaining = len(producers)
+        try:
+            while remaining:
+                item = await queue.get()
+                if item is task_done:
+                    remaining -= 1
+                    continue
+
+                result.findings.append(item)
+                if not self.analyst.accept(item):
+                    continue
+
+                if self.gold_quota is None:
+                    continue
+                for task_id in item.task_ids:
+                    if task_id not in gold_counts:
+                        continue
+                    gold_counts[task_id] += 1
+                    producer = producers[task_id]
+                    if gold_counts[task_id] >= self.gold_quota and not producer.done():
+                        print(f"Pipeline: Quota of {self.gold_quota} gold findings met for task {task_id}; stopping it.")
+                        producer.cancel()
+                        result.stopped_tasks.append(task_id)
+        finally:
+            if watchdog:
+                watchdog.cancel()
+            for producer in producers.values():
+                producer.cancel()
+            await asyncio.gather(*producers.values(), return_exceptions=True)
+
+        for task_id, producer in producers.items():
+            if not producer.cancelled() and producer.exception() is not None:
+                print(f"Pipeline [ERROR]: Task {task_id} failed: {producer.exception()}")
+                result.failed_tasks.append(task_id)
+
+        # Arrival order decided the early stops only; the gold set is decided on everything that came in.
+        result.gold_findings = self.analyst.settle()
+
+        print(f"\n[Scouting Complete]: {len(result.findings)} raw findings gathered.\n")
+        return result
@@ -0,0 +1,392 @@
+"""
+Rate Controller: proactive, adaptive admission control for Gemini calls.
+"""
+import asyncio
+import random
+import re
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from researcher.tracing import current_span, span
+
+T = TypeVar("T")
+
+RETRYABLE_SERVER_CODES = frozenset({500, 502, 503, 504})
+DURATION_PATTERN = re.compile(r"^\s*([\d.]+)\s*s?\s*$")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when calls are refused because the circuit breaker is open."""
+
+
+def classify_error(error: BaseException) -> Optional[str]:
+    """Classifies an exception from a Gemini call.
+
+    Args:
+        error: The raised exception.
+
+    Returns:
+        'throttled' for a 429 / RESOURCE_EXHAUSTED, 'server' for a transient
+        5xx or network failure, or None if retrying cannot help.
+    """
+    # An APIError can only come from an SDK that is already loaded; importing it here would load all of it.
+    genai_errors = sys.modules.get("google.genai.errors")
+    if genai_errors is not None and isinstance(error, genai_errors.APIError):
+        if error.code == 429 or error.status == "RESOURCE_EXHAUSTED":
+            return "throttled"
+        if error.code in RETRYABLE_SERVER_CODES:
+            return "server"
+        return None
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return "server"
+    try:
+        import httpx
+    except ImportError:
+        return None
+    if isinstance(error, httpx.TransportError):
+        return "server"
+    return None
+
+
+def _parse_seconds(value: Any) -> Optional[float]:
+    match = DURATION_PATTERN.match(str(value))
+    return float(match.group(1)) if match else None
+
+
+def retry_hint(error: BaseException) -> Optional[float]:
+    """Extracts the server's suggested wait, if any.
+
+    Looks at the Retry-After header and at the RetryInfo detail Gemini
+    attaches to 429 responses (e.g. "retryDelay": "17s").
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        try:
+            seconds = _parse_seconds(headers.get("retry-after", ""))
+        except Exception:
+            seconds = None
+        if seconds is not None:
+            return seconds
+
+    details = getattr(error, "details", None)
+    if isinstance(details, dict):
+        items = details.get("error", details).get("details", [])
+        for item in items if isinstance(items, list) else []:
+            if isinstance(item, dict) and str(item.get("@type", "")).endswith("RetryInfo"):
+                seconds = _parse_seconds(item.get("retryDelay", ""))
+                if seconds is not None:
+                    return seconds
+    return None
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` units per second, bursting to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waited = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def take(self, amount: float = 1.0) -> float:
+        """Waits until `amount` units are available and consumes them.
+
+        Requests larger than the capacity are clamped to it, so they wait for
+        a full bucket instead of forever.
+
+        Returns:
+            Seconds waited.
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self._tokens < amount:
+                delay = (amount - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self._tokens -= amount
+        self.waited += waited
+        return waited
+
+
+class AdaptiveConcurrency:
+    """Concurrency limit adjusted by AIMD.
+
+    Each success raises the limit by 1/limit (about +1 per round of calls);
+    a throttle halves it. Throttles that arrive together (the same burst)
+    cause only one decrease.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, decrease_window: float = 1.0):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(max_limit)
+        self.decrease_window = decrease_window
+        self.in_use = 0
+        self.lowest_limit = float(max_limit)
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_use < int(self.limit))
+            self.in_use += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.in_use -= 1
+                self._condition.notify_all()
+
+    def on_success(self) -> None:
+        self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def on_throttle(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_window:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit / 2)
+        self.lowest_limit = min(self.lowest_limit, self.limit)
+
+
+class CircuitBreaker:
+    """Fails fast after repeated failures, then lets one probe through after a cooldown.
+
+    Only server failures (5xx, network) count: a 429 means the service is up
+    and asking for less traffic, which the token buckets and AIMD limit
+    already provide.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.opens = 0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def check(self) -> None:
+        """Admits a call, or raises CircuitOpenError while the breaker is open.
+
+        In the half-open state only a single probe call is admitted.
+        """
+        state = self.state
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return
+        if state != "closed":
+            raise CircuitOpenError(
+                f"LLM circuit open after {self.consecutive_failures} consecutive failures; retry in {self.remaining():.0f}s"
+            )
+
+    def remaining(self) -> float:
+        """Seconds until the breaker lets a probe through (0 when it is not open)."""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+    def on_success(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def on_failure(self) -> None:
+        self.consecutive_failures += 1
+        state = self.state
+        if state == "half_open" or (state == "closed" and self.consecutive_failures >= self.threshold):
+            self.opens += 1
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def release_probe(self) -> None:
+        """Frees the half-open probe slot when a probe ends without a verdict."""
+        self._probing = False
+
+
+class RateController:
+    """Process-wide admission control for model calls.
+
+    Every call waits on the model's request and token buckets (requests and
+    tokens per minute), then for a slot under the AIMD concurrency limit.
+    Throttled and transient failures are retried after a fully jittered
+    exponential backoff - or the server's retry hint, if larger - so
+    concurrent callers never retry in lockstep. A circuit breaker stops
+    sending requests after repeated consecutive server failures; a call that
+    is already retrying waits out its cooldown instead of failing.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 60,
+        tokens_per_minute: float = 1_000_000,
+        max_concurrency: int = 8,
+        max_retries: int = 5,
+        base_delay: float = 2.0,
+        max_delay: float = 60.0,
+        breaker_threshold: int = 5,
+        breaker_cooldown: float = 30.0,
+    ):
+        """
+        Args:
+            requests_per_minute: Request budget per model.
+            tokens_per_minute: Input-token budget per model.
+            max_concurrency: Ceiling for the adaptive concurrency limit.
+            max_retries: Retries per call for throttled/transient failures.
+            base_delay: Backoff base in seconds.
+            max_delay: Backoff ceiling in seconds.
+            breaker_threshold: Consecutive failures that open the circuit.
+            breaker_cooldown: Seconds the circuit stays open before a probe.
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+        self._request_buckets: Dict[str, TokenBucket] = {}
+        self._token_buckets: Dict[str, TokenBucket] = {}
+
+        self.throttled = 0
+        self.server_errors = 0
+        self.retries = 0
+        self.backoff_seconds = 0.0
+
+    def _buckets(self, model: str) -> Tuple[TokenBucket, TokenBucket]:
+        if model not in self._request_buckets:
+            self._request_buckets[model] = TokenBucket(self.requests_per_minute / 60.0, max(1.0, self.requests_per_minute / 60.0 * 5))
+            self._token_buckets[model] = TokenBucket(self.tokens_per_minute / 60.0, self.tokens_per_minute)
+        return self._request_buckets[model], self._token_buckets[model]
+
+    def backoff(self, attempt: int, hint: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's hint."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if hint is not None:
+            delay = max(delay, hint + random.uniform(0, self.base_delay))
+        return delay
+
+    async def call(self, model: str, estimated_tokens: int, func: Callable[[], Awaitable[T]]) -> T:
+        """Runs one model call under the rate controls, retrying as needed.
+
+        Args:
+            model: The model being called (budgets are per model).
+            estimated_tokens: Estimated prompt tokens, charged to the token bucket.
+            func: Creates the call's coroutine; invoked once per attempt.
+
+        Returns:
+            The call's result.
+
+        Raises:
+            CircuitOpenError: If the breaker is open when the call first arrives.
+            Exception: The call's own error once it is non-retryable or retries run out.
+        """
+        request_bucket, token_bucket = self._buckets(model)
+        for attempt in range(self.max_retries + 1):
+            # Recorded on the caller's span, so retries show up on the call itself.
+            current_span().set(attempts=attempt + 1)
+            await self._admit(retrying=attempt > 0)
+            queued_at = time.monotonic()
+            await request_bucket.take(1)
+            await token_bucket.take(estimated_tokens)
+            async with self.concurrency.slot():
+                with span("llm.attempt", model=model, attempt=attempt + 1, queued_s=round(time.monotonic() - queued_at, 3)) as attempt_span:
+                    try:
+                        result = await func()
+                    except asyncio.CancelledError:
+                        self.breaker.release_probe()
+                        raise
+                    except Exception as e:
+                        kind = classify_error(e)
+                        if kind is None:
+                            # The service answered (e.g. a 400): it is up, whatever was wrong with the request.
+                            self.breaker.on_success()
+                            raise
+                        if kind == "throttled":
+                            # The service answered; pacing, not the breaker, deals with throttling.
+                            self.breaker.release_probe()
+                            self.throttled += 1
+                            self.concurrency.on_throttle()
+                        else:
+                            self.breaker.on_failure()
+                            self.server_errors += 1
+                        if attempt == self.max_retries:
+                            print(f"RateController [ERROR]: Giving up on {model} after {attempt + 1} attempts: {e}")
+                            raise
+                        delay = self.backoff(attempt, retry_hint(e))
+                        attempt_span.fail(e)
+                        attempt_span.set(outcome=kind, retry_in_s=round(delay, 2))
+                    else:
+                        self.breaker.on_success()
+                        self.concurrency.on_success()
+                        return result
+
+            # Back off outside the slot so other callers can proceed.
+            print(f"RateController [WARNING]: {model} {kind}; retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries}).")
+            self.retries += 1
+            self.backoff_seconds += delay
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def _admit(self, retrying: bool) -> None:
+        """Passes the circuit breaker.
+
+        A new call fails fast while the breaker is open. A call that has
+        already been retrying sleeps out the cooldown instead, so a burst of
+        failures does not throw away work that was going to be retried.
+
+        Raises:
+            CircuitOpenError: If the breaker is open and the call is new.
+        """
+        while True:
+            try:
+                self.breaker.check()
+                return
+            except CircuitOpenError:
+                if not retrying:
+                    raise
+            delay = self.breaker.remaining() + random.uniform(0, self.base_delay)
+            print(f"RateController [WARNING]: Circuit open; waiting {delay:.1f}s before retrying.")
+            self.backoff_seconds += delay
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns limiter state for the run metadata."""
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "concurrency_lowest": round(self.concurrency.lowest_limit, 2),
+            "throttled": self.throttled,
+            "server_errors": self.server_errors,
+            "retries": self.retries,
+            "backoff_s": round(self.backoff_seconds, 2),
+            "bucket_wait_s": round(
+                sum(b.waited for b in self._request_buckets.values())
+                + sum(b.waited for b in self._token_buckets.values()),
+                2,
+            ),
+            "breaker_state": self.breaker.state,
+            "breaker_opens": self.breaker.opens,
+        }
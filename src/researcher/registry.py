@@ -0,0 +1,56 @@
+"""
+Backend Registry: scouts, search providers and LLM clients, imported on first use.
+"""
+import importlib
+from typing import Any, Dict, List
+
+# kind -> name -> "module:attribute". Modules are only imported when resolved,
+# so a run that never needs the browser never loads Playwright.
+_BACKENDS: Dict[str, Dict[str, str]] = {
+    "scout": {
+        "open_web": "researcher.scout:OpenWebScout",
+        "authenticated": "researcher.deep_scout:DeepSourceScout",
+    },
+    "search": {
+        "ddgs": "researcher.search:DDGSProvider",
+        "static": "researcher.search:StaticSearchProvider",
+    },
+    "llm": {
+        "gemini": "researcher.llm:LLMClient",
+    },
+}
+_resolved: Dict[str, Any] = {}
+
+
+def register(kind: str, name: str, target: str) -> None:
+    """Adds or replaces a backend.
+
+    Args:
+        kind: 'scout', 'search' or 'llm' (or a new kind).
+        name: Backend name, e.g. a task source_type for scouts.
+        target: "module:attribute" of the class or factory.
+    """
+    _BACKENDS.setdefault(kind, {})[name] = target
+    _resolved.pop(f"{kind}:{name}", None)
+
+
+def resolve(kind: str, name: str) -> Any:
+    """Imports a backend on first use and returns its class or factory.
+
+    Raises:
+        KeyError: If no backend of that kind and name is registered.
+    """
+    key = f"{kind}:{name}"
+    if key not in _resolved:
+        try:
+            target = _BACKENDS[kind][name]
+        except KeyError:
+            raise KeyError(f"No {kind} backend named '{name}' (available: {', '.join(available(kind)) or 'none'})") from None
+        module_name, _, attribute = target.partition(":")
+        _resolved[key] = getattr(importlib.import_module(module_name), attribute)
+    return _resolved[key]
+
+
+def available(kind: str) -> List[str]:
+    """Returns the registered backend names of a kind."""
+    return sorted(_BACKENDS.get(kind, {}))
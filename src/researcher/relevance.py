@@ -0,0 +1,152 @@
+"""
+Relevance Engine: vectorised BM25 scoring of findings against the research plan.
+"""
+import re
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from researcher.models import ResearchPlan
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have how in is it its of on or that the
+this to was were what when where which who why will with does do did can
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cases and splits text into content-bearing tokens."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS and len(token) > 1]
+
+
+class RelevanceEngine:
+    """BM25 of findings against queries built from the research plan.
+
+    The plan yields one query per key question and one per sub-task
+    (description plus search queries). The vocabulary is the set of query
+    terms, so the findings' term matrix stays small and sparse, and the
+    batch analysis scores thousands of findings in one sparse matrix product.
+
+    Term weights and length normalisation come from fixed references, not
+    from the findings seen so far: IDF is computed over the plan's queries
+    (a term every query shares, such as the topic itself, counts for little;
+    a term specific to one question counts for a lot), and document length
+    is normalised against a fixed `average_length`. A finding's score is
+    therefore a function of its text and the plan alone - the same whether
+    it streams in first or last, or is scored in a batch.
+
+    Scores are normalised per query by the BM25 upper bound (every query
+    term present with unbounded frequency), so they lie in [0, 1) and are
+    comparable across queries and runs.
+    """
+
+    def __init__(self, plan: ResearchPlan, k1: float = 1.2, b: float = 0.75, average_length: float = 1000.0):
+        """
+        Args:
+            plan: The plan whose key questions and sub-tasks define the queries.
+            k1: BM25 term-frequency saturation.
+            b: BM25 length normalisation.
+            average_length: Reference document length in tokens for length normalisation.
+        """
+        self.k1 = k1
+        self.b = b
+        self.average_length = average_length
+        self.key_questions = list(plan.key_questions)
+        self._task_columns: Dict[str, int] = {}
+
+        queries = list(self.key_questions)
+        for task in plan.sub_tasks:
+            self._task_columns[task.id] = len(queries)
+            queries.append(" ".join([task.description, *task.queries]))
+
+        self._vocabulary: Dict[str, int] = {}
+        rows, cols = [], []
+        for column, query in enumerate(queries):
+            for term in set(tokenize(query)):
+                rows.append(self._vocabulary.setdefault(term, len(self._vocabulary)))
+                cols.append(column)
+        # Query matrix: vocabulary x queries, 1 where the query uses the term.
+        self._queries = sparse.csc_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(self._vocabulary), len(queries)),
+        )
+
+        # IDF over the queries themselves, fixed for the run.
+        query_freq = np.asarray(self._queries.sum(axis=1)).ravel()
+        self._idf = np.log1p((len(queries) - query_freq + 0.5) / (query_freq + 0.5))
+        self._upper_bound = np.asarray(self._queries.T @ self._idf).ravel() * (self.k1 + 1)
+
+    def _term_matrix(self, texts: Sequence[str]) -> Tuple[sparse.csr_matrix, np.ndarray]:
+        """Builds the documents x vocabulary count matrix and document lengths."""
+        indptr: List[int] = [0]
+        indices: List[int] = []
+        lengths: List[int] = []
+        for text in texts:
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            indices.extend(self._vocabulary[token] for token in tokens if token in self._vocabulary)
+            indptr.append(len(indices))
+        counts = sparse.csr_matrix(
+            (np.ones(len(indices)), np.array(indices, dtype=np.int64), np.array(indptr)),
+            shape=(len(texts), len(self._vocabulary)),
+        )
+        counts.sum_duplicates()
+        return counts, np.array(lengths, dtype=float)
+
+    def score(self, texts: Sequence[str]) -> np.ndarray:
+        """Scores documents against every query.
+
+        Args:
+            texts: Finding contents.
+
+        Returns:
+            A (len(texts), num_queries) array of normalised BM25 scores; the
+            first len(key_questions) columns are the key questions, the rest
+            the sub-tasks.
+        """
+        if not texts or not self._vocabulary:
+            return np.zeros((len(texts), self._queries.shape[1]))
+
+        counts, lengths = self._term_matrix(texts)
+
+        # BM25 term weights, computed on the non-zeros only.
+        row_of = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+        norm = self.k1 * (1 - self.b + self.b * lengths[row_of] / self.average_length)
+        tf = counts.data
+        counts.data = self._idf[counts.indices] * tf * (self.k1 + 1) / (tf + norm)
+
+        raw = np.asarray((counts @ self._queries).todense())
+        return raw / np.where(self._upper_bound > 0, self._upper_bound, 1.0)
+
+    def relevance(self, texts: Sequence[str], task_ids: Sequence[Sequence[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Combines question and task scores into one relevance per finding.
+
+        Relevance is the mean of the best key-question score and the best
+        score against the sub-tasks that referenced the finding (or just the
+        question score when no task is known).
+
+        Args:
+            texts: Finding contents.
+            task_ids: For each finding, the ids of the tasks that referenced it.
+
+        Returns:
+            (relevance in [0, 1), index of the best-matching key question or -1).
+        """
+        scores = self.score(texts)
+        num_questions = len(self.key_questions)
+        if num_questions:
+            question_scores = scores[:, :num_questions]
+            best_question = question_scores.argmax(axis=1)
+            question_part = question_scores.max(axis=1)
+        else:
+            best_question = np.full(len(texts), -1)
+            question_part = np.zeros(len(texts))
+
+        relevance = question_part.copy()
+        for row, ids in enumerate(task_ids):
+            columns = [self._task_columns[task_id] for task_id in ids if task_id in self._task_columns]
+            if columns:
+                relevance[row] = (question_part[row] + scores[row, columns].max()) / 2
+        return relevance, best_question
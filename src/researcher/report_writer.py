@@ -0,0 +1,63 @@
+"""
+Report Writer: streams report text to the run directory and the terminal.
+"""
+import os
+import sys
+import time
+from typing import Optional, TextIO
+
+
+class StreamingReportWriter:
+    """Appends report chunks to a file as they arrive, echoing them to a terminal.
+
+    The run's report file grows while the model is still generating, so a
+    long synthesis can be read (or tailed) as it happens. `finalize` replaces
+    the file with the authoritative text and publishes it atomically to the
+    "latest" path, so readers of that path never see a half-written report.
+    """
+
+    def __init__(self, path: str, mirror: Optional[TextIO] = sys.stdout):
+        """
+        Args:
+            path: The run's report file (created or truncated).
+            mirror: Stream that receives a copy of every chunk, or None.
+        """
+        self.path = path
+        self.mirror = mirror
+        self._file = open(path, "w", encoding="utf-8")
+        self.started_at = time.perf_counter()
+        self.first_chunk_at: Optional[float] = None
+        self.chars_written = 0
+
+    def write(self, chunk: str) -> None:
+        """Appends one chunk to the file and the mirror."""
+        if not chunk:
+            return
+        if self.first_chunk_at is None:
+            self.first_chunk_at = time.perf_counter()
+        self._file.write(chunk)
+        self._file.flush()
+        self.chars_written += len(chunk)
+        if self.mirror:
+            self.mirror.write(chunk)
+            self.mirror.flush()
+
+    def finalize(self, report: str, latest_path: Optional[str] = None) -> None:
+        """Writes the final report text and atomically publishes a copy.
+
+        Args:
+            report: The complete report (may differ from the streamed text,
+                e.g. when synthesis failed midway and fell back to a mock).
+            latest_path: Optional path to swap the finished report into.
+        """
+        self._file.close()
+        self._write_atomic(self.path, report)
+        if latest_path:
+            self._write_atomic(latest_path, report)
+
+    @staticmethod
+    def _write_atomic(path: str, text: str) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
@@ -0,0 +1,470 @@
+"""
+Research Runner: runs one or many topics in a process over shared resources.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from researcher.analyst import Analyst
+from researcher.budget import RunBudget
+from researcher.cache import PageCache
+from researcher.extract import ExtractionEngine
+from researcher.fetcher import FetchEngine
+from researcher.findings import FindingsStore
+from researcher.frontier import URLFrontier
+from researcher.history import HistoryStore
+from researcher.llm import LLMClient
+from researcher.llm_cache import LLMCache
+from researcher.models import ReportType, ResearchTask
+from researcher.orchestrator import Orchestrator
+from researcher.pipeline import ResearchPipeline
+from researcher.ratelimit import RateController
+from researcher.report_writer import StreamingReportWriter
+from researcher.registry import resolve
+from researcher.scout import BaseScout
+from researcher.search import Discovery, SearchCache, SearchProvider
+from researcher.synthesizer import Synthesizer
+from researcher.tracing import Tracer, export_otlp_json, export_prometheus, span
+from researcher.utils import percentile
+
+
+@dataclass
+class TopicRun:
+    """The outcome of one topic."""
+    topic: str
+    run_id: str
+    report_path: Optional[str] = None
+    gold_count: int = 0
+    seconds: float = 0.0
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+def load_topics(source: str) -> List[str]:
+    """Reads the topics of a batch.
+
+    Args:
+        source: A directory (one topic per .md/.txt file, in name order), a
+            JSONL file (one JSON string, or object with a "topic" key, per
+            line), or a text file with one topic per line.
+
+    Returns:
+        The topics, in order.
+    """
+    if os.path.isdir(source):
+        topics = []
+        for name in sorted(os.listdir(source)):
+            if name.endswith((".md", ".txt")):
+                with open(os.path.join(source, name), "r", encoding="utf-8") as f:
+                    text = f.read().strip()
+                if text:
+                    topics.append(text)
+        return topics
+
+    with open(source, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    if not source.endswith(".jsonl"):
+        return lines
+    topics = []
+    for line in lines:
+        item = json.loads(line)
+        topics.append(item if isinstance(item, str) else item["topic"])
+    return topics
+
+
+def new_run_dir(topic: str, runs_root: str) -> str:
+    """Creates a unique `runs/<timestamp>_<slug>` directory and returns its run id."""
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe_topic = re.sub(r'[^a-zA-Z0-9]+', '_', topic)[:50].strip('_').lower()
+    run_id = f"{timestamp}_{safe_topic}"
+    suffix = 1
+    while True:
+        try:
+            os.makedirs(os.path.join(runs_root, run_id))
+            return run_id
+        except FileExistsError:
+            # Two topics with the same slug started in the same second.
+            suffix += 1
+            run_id = f"{timestamp}_{safe_topic}_{suffix}"
+
+
+class ResearchSession:
+    """Everything that can be shared between research runs in one process.
+
+    The Gemini client and rate controller, the caches, the fetch and
+    extraction engines, the search layer and the deep scout (with its
+    profile snapshot and browser) are built once; the deep scout only when
+    a plan first includes an authenticated task. Each topic gets its own
+    plan, URL frontier, Analyst, Synthesizer and `runs/<run_id>/` artifacts,
+    so topics can run concurrently without seeing each other's pages.
+    Statistics of the shared components in each topic's metadata are
+    cumulative for the session.
+    """
+
+    def __init__(
+        self,
+        args: argparse.Namespace,
+        runs_root: Optional[str] = None,
+        search_provider: Optional[SearchProvider] = None,
+        genai_client: Optional[Any] = None,
+        latest_path: Optional[str] = "final_report.md",
+    ):
+        """
+        Args:
+            args: Parsed command-line options (see researcher.cli.build_parser).
+            runs_root: Directory that receives the run directories; defaults to ./runs.
+            search_provider: Search backend; defaults to DDGS.
+            genai_client: Gemini client (or stand-in); defaults to one built from GEMINI_API_KEY.
+            latest_path: Where a copy of each finished report goes; None to keep reports in the run directories only.
+        """
+        self.args = args
+        self.runs_root = runs_root or os.path.join(os.getcwd(), "runs")
+        self.latest_path = latest_path
+
+        # Recorded responses are reused across runs; --replay serves nothing else.
+        llm_cache = None if args.no_llm_cache else LLMCache(os.path.join(args.cache_dir, "llm"), replay=args.replay)
+        # In replay mode cached pages and searches never expire, and misses are skipped rather than fetched.
+        cache_ttl: Dict[str, Any] = {"ttl": float("inf")} if args.replay else {}
+
+        # One async Gemini client for every agent in the process
+        # Every Gemini call is paced, throttled and retried by one controller
+        rate_controller = RateController(
+            requests_per_minute=args.llm_rpm,
+            tokens_per_minute=args.llm_tpm,
+            max_concurrency=args.llm_concurrency,
+        )
+        self.llm = resolve("llm", "gemini")(cache=llm_cache, rate_controller=rate_controller, client=genai_client)
+        LLMClient.set_shared(self.llm)
+        self.orchestrator = Orchestrator(llm=self.llm)
+
+        # One pooled fetch engine shared across every open-web task of every topic
+        self.fetch_engine = FetchEngine(
+            max_connections=args.max_connections,
+            per_host_limit=args.per_host_limit,
+            max_bytes=args.max_page_bytes,
+            max_pdf_bytes=args.max_pdf_bytes,
+        )
+        self.page_cache = None if args.no_cache else PageCache(os.path.join(args.cache_dir, "pages"), **cache_ttl)
+        search_backend = resolve("search", "ddgs")
+        self.discovery = Discovery(
+            search_provider or search_backend(),
+            cache=None if args.no_cache else SearchCache(os.path.join(args.cache_dir, "search"), **cache_ttl),
+            hedge_percentile=args.hedge_percentile,
+            backup_provider=search_backend(args.hedge_backend) if args.hedge_backend else None,
+            run_blocking=self.fetch_engine.run_blocking,
+            offline=args.replay,
+        )
+        # Every run's plan, pages and findings are indexed; recent pages are reused instead of re-fetched
+        self.history = None if args.no_history else HistoryStore(
+            os.path.join(args.cache_dir, "history.sqlite"),
+            ttl=float("inf") if args.replay else args.history_ttl * 3600,
+            reuse=not args.no_cache,
+        )
+        # HTML parsing runs on a process pool so it never stalls the event loop
+        self.extraction_engine = ExtractionEngine(workers=args.extract_workers)
+        self.open_scout = resolve("scout", "open_web")(
+            num_results=args.open_limit,
+            fetch_engine=self.fetch_engine,
+            page_cache=self.page_cache,
+            discovery=self.discovery,
+            extraction_engine=self.extraction_engine,
+            history=self.history,
+            offline=args.replay,
+        )
+        # Built (and Playwright imported) only when a plan first has an authenticated task
+        self._deep_scout: Optional[Any] = None
+
+    @property
+    def deep_scout(self) -> Any:
+        """The session's DeepSourceScout, created on first use."""
+        if self._deep_scout is None:
+            # Load profile path from environment
+            profile_path = os.getenv("CHROME_PROFILE_PATH")
+            if not profile_path:
+                print("[Warning] CHROME_PROFILE_PATH not set in .env. Deep Scout will default to dummy/empty.")
+                profile_path = "/tmp/dummy/path"
+
+            # The profile is snapshotted and Chromium launched at most once per session
+            self._deep_scout = resolve("scout", "authenticated")(
+                source_profile_path=profile_path,
+                max_results=self.args.deep_limit,
+                page_cache=self.page_cache,
+                discovery=self.discovery,
+                pool_size=self.args.browser_pages,
+                # --no-cache also means no cookies left behind: a temporary snapshot, removed at close.
+                snapshot_dir=None if self.args.no_cache else os.path.join(self.args.cache_dir, "profile_snapshot"),
+                fast_capture=not self.args.no_fast_capture,
+                history=self.history,
+                offline=self.args.replay,
+            )
+        return self._deep_scout
+
+    async def run_topic(self, topic: str, mirror_report: bool = True, run_id: Optional[str] = None) -> TopicRun:
+        """Plans, scouts, analyses and reports on one topic.
+
+        Args:
+            topic: The research topic or brief.
+            mirror_report: Echo the streamed report to the terminal.
+            run_id: A run directory already created with `new_run_dir`; a new one is created if omitted.
+
+        Returns:
+            The run's id, paths and stage timings.
+        """
+        run = TopicRun(topic=topic, run_id=run_id or new_run_dir(topic, self.runs_root))
+        if self.history:
+            self.history.start_run(run.run_id, topic, model=os.getenv("GEMINI_MODEL"))
+        tracer = Tracer()
+        # Limits apply per topic, so each topic of a batch gets the whole budget
+        budget = RunBudget(
+            time_budget=self.args.time_budget,
+            max_bytes=self.args.max_bytes,
+            max_llm_tokens=self.args.max_llm_tokens,
+        )
+        # Finding content is spilled to disk as it arrives, leaving small handles in memory
+        store = None
+        if not self.args.no_spill_findings:
+            store = FindingsStore(directory=self.args.cache_dir, compress=self.args.compress_findings)
+        try:
+            with tracer.activate(run_id=run.run_id, topic=topic[:200]), budget.activate():
+                await self._research(run, mirror_report, tracer, store, budget)
+        except BaseException:
+            if self.history:
+                self.history.finish_run(run.run_id, "failed", run.stage_seconds)
+            raise
+        finally:
+            if store:
+                store.close()
+            self._write_trace(tracer, run)
+        return run
+
+    def _write_trace(self, tracer: Tracer, run: TopicRun) -> None:
+        """Writes the run's trace.json and any configured exports."""
+        runs_dir = os.path.join(self.runs_root, run.run_id)
+        tracer.write(os.path.join(runs_dir, "trace.json"))
+        exports = self.args.trace_export or []
+        if "otlp" in exports:
+            export_otlp_json(tracer, os.path.join(runs_dir, "trace.otlp.json"))
+        if "prometheus" in exports:
+            export_prometheus(tracer, self.args.metrics_file)
+
+    async def _research(
+        self,
+        run: TopicRun,
+        mirror_report: bool,
+        tracer: Tracer,
+        store: Optional[FindingsStore],
+        budget: RunBudget,
+    ) -> None:
+        """The stages of one topic; fills in `run` as it goes."""
+        args = self.args
+        topic = run.topic
+        started_at = time.perf_counter()
+        print(f"=== Starting Researcher Agent for topic: {topic} ===\n")
+
+        # 1. Orchestration
+        plan = await self.orchestrator.generate_plan(topic)
+        print(f"\n[Plan Generated]: {len(plan.sub_tasks)} sub-tasks defined.\n")
+        run.stage_seconds["plan"] = time.perf_counter() - started_at
+        if self.history:
+            self.history.record_plan(run.run_id, plan)
+
+        # 2. Scouting + Analysis (findings are scored as they arrive in stream mode)
+        # A fresh frontier per topic, so overlapping sub-tasks fetch each page once;
+        # it spills each page as it is resolved, so only the handle outlives the fetch
+        frontier = URLFrontier(store=store)
+        open_scout: BaseScout = self.open_scout.with_frontier(frontier)
+        deep_scout: Optional[BaseScout] = self.deep_scout.with_frontier(frontier) if any(
+            task.source_type == "authenticated" for task in plan.sub_tasks
+        ) else None
+        analyst = Analyst(plan=plan, min_score=args.min_score)
+
+        def select_scout(task: ResearchTask) -> BaseScout:
+            if task.source_type == "authenticated" and deep_scout is not None:
+                return deep_scout
+            return open_scout
+
+        pipeline = ResearchPipeline(
+            analyst,
+            select_scout=select_scout,
+            gold_quota=args.gold_quota,
+            store=store,
+            budget=budget,
+        )
+        stage_started_at = time.perf_counter()
+        print(f"[Scouting]: Dispatching agents ({args.mode} mode)...")
+        with span("scouting", mode=args.mode):
+            result = await pipeline.run(plan, mode=args.mode)
+        if self.page_cache:
+            self.page_cache.flush()
+        if self.history:
+            self.history.record_findings(run.run_id, result.findings, result.gold_findings)
+        run.stage_seconds["scouting"] = time.perf_counter() - stage_started_at
+
+        findings = result.findings
+        gold_findings = result.gold_findings
+        run.gold_count = len(gold_findings)
+        print(f"\n[Analysis Complete]: {len(gold_findings)} high-value findings retained.\n")
+
+        # 3. Run directory (created up front so the report can stream into it)
+        runs_dir = os.path.join(self.runs_root, run.run_id)
+        timestamp = run.run_id[:15]
+
+        # Paths
+        report_path = os.path.join(runs_dir, "final_report.md")
+        metadata_path = os.path.join(runs_dir, "metadata.json")
+        latest_path = self.latest_path
+        run.report_path = report_path
+
+        # 4. Synthesis (streamed chunk by chunk into the run's report and the terminal)
+        synthesizer = Synthesizer(
+            context_budget=args.context_budget,
+            mode=args.synthesis_mode,
+            map_concurrency=args.map_concurrency,
+            llm=self.llm,
+        )
+        stream_report = not args.no_stream_report
+        writer = StreamingReportWriter(report_path, mirror=sys.stdout if mirror_report else None)
+        if stream_report and mirror_report:
+            print("\n[Report]:\n")
+        stage_started_at = time.perf_counter()
+        with span("synthesis", mode=args.synthesis_mode, findings=len(gold_findings)):
+            report = await synthesizer.generate_report(
+                plan,
+                gold_findings,
+                ReportType.INSTA_EXPERT,
+                on_text=writer.write if stream_report else None,
+            )
+        run.stage_seconds["synthesis"] = time.perf_counter() - stage_started_at
+
+        # 5. Artifact Management (Run History)
+        # Rewrite the run's report with the final text and swap it into the latest copy
+        writer.finalize(report, latest_path)
+        run.seconds = time.perf_counter() - started_at
+
+        # Write Metadata
+        metadata = {
+            "topic": topic,
+            "timestamp": timestamp,
+            "run_id": run.run_id,
+            "model": os.getenv("GEMINI_MODEL", "unknown"),
+            "plan_subtasks_count": len(plan.sub_tasks),
+            "scout_findings_count": len(findings),
+            "analyst_gold_count": len(gold_findings),
+            "timings": {"total_s": round(run.seconds, 3), **{f"{k}_s": round(v, 3) for k, v in run.stage_seconds.items()}},
+            "trace": tracer.summary()["by_name"],
+            "analyst": analyst.stats(),
+            "fetch_stats": self.fetch_engine.stats(),
+            "extraction": self.extraction_engine.stats(),
+            "page_cache": self.page_cache.stats() if self.page_cache else None,
+            "history": self.history.stats() if self.history else None,
+            "discovery": self.discovery.stats(),
+            "frontier": frontier.stats(),
+            "findings_store": store.stats() if store else None,
+            "budget": budget.stats(),
+            "pipeline": {"mode": args.mode, "gold_quota": args.gold_quota, **result.stats()},
+            "browser_pool": self._deep_scout.browser_pool.stats() if self._deep_scout else None,
+            "profile_snapshot": self._deep_scout.snapshots.stats() if self._deep_scout else None,
+            "deep_capture": self._deep_scout.stats() if self._deep_scout else None,
+            "synthesis": synthesizer.stats(),
+            "llm": self.llm.stats(),
+            "plan_detail": [t.description for t in plan.sub_tasks]
+        }
+        with open(metadata_path, "w") as f:
+            json.dump(metadata, f, indent=2)
+        if self.history:
+            self.history.finish_run(run.run_id, "complete", metadata["timings"], metadata)
+
+        print(f"\n=== Research Complete ===")
+        print(f"Run ID: {run.run_id}")
+        print(f"Report saved to: {report_path}")
+        print(f"Metadata saved to: {metadata_path}")
+        if latest_path:
+            print(f"Latest copy updated at: {latest_path}")
+        if budget.limits_hit:
+            print(f"Budget limits hit: {', '.join(budget.limits_hit)} ({len(budget.skipped)} item(s) cut or skipped)")
+        if not writer.chars_written:
+            print("\nContent preview:\n")
+            print(report[:500] + "...")
+
+    async def run_batch(self, topics: List[str], concurrency: int = 1) -> List[TopicRun]:
+        """Runs many topics, at most `concurrency` at a time.
+
+        A failed topic is recorded and the batch carries on. Streamed reports
+        are echoed to the terminal only when topics run one at a time.
+
+        Args:
+            topics: The topics, in order.
+            concurrency: Maximum topics in flight.
+
+        Returns:
+            One TopicRun per topic, in input order.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run_one(index: int, topic: str) -> TopicRun:
+            async with semaphore:
+                print(f"\n[Batch]: Topic {index + 1}/{len(topics)}")
+                started_at = time.perf_counter()
+                # Allocated here, so a failed topic still points at the partial artifacts in its run directory.
+                run_id = new_run_dir(topic, self.runs_root)
+                try:
+                    return await self.run_topic(topic, mirror_report=concurrency <= 1, run_id=run_id)
+                except Exception as e:
+                    print(f"Batch [ERROR]: Topic '{topic[:80]}' failed: {e}")
+                    return TopicRun(topic=topic, run_id=run_id, seconds=time.perf_counter() - started_at, error=str(e))
+
+        return list(await asyncio.gather(*(run_one(i, topic) for i, topic in enumerate(topics))))
+
+    async def close(self) -> None:
+        """Releases the shared engines, the browser and the Gemini session."""
+        self.fetch_engine.close()
+        self.extraction_engine.close()
+        if self._deep_scout:
+            await self._deep_scout.cleanup()
+        if self.page_cache:
+            self.page_cache.flush()
+        if self.history:
+            self.history.close()
+        await self.llm.aclose()
+
+
+def summarize_batch(runs: List[TopicRun], wall_seconds: float, concurrency: int) -> Dict[str, Any]:
+    """Builds the end-of-batch throughput and per-topic timing summary."""
+    seconds = [run.seconds for run in runs if not run.error]
+    stages = sorted({stage for run in runs for stage in run.stage_seconds})
+    return {
+        "topics": len(runs),
+        "succeeded": len(seconds),
+        "failed": len(runs) - len(seconds),
+        "topic_concurrency": concurrency,
+        "wall_seconds": round(wall_seconds, 3),
+        "topics_per_hour": round(len(seconds) / wall_seconds * 3600, 2) if wall_seconds else 0.0,
+        "topic_seconds_p50": round(percentile(seconds, 50), 3),
+        "topic_seconds_p95": round(percentile(seconds, 95), 3),
+        "stage_seconds_p50": {
+            stage: round(percentile([r.stage_seconds[stage] for r in runs if stage in r.stage_seconds], 50), 3)
+            for stage in stages
+        },
+        "runs": [asdict(run) for run in runs],
+    }
+
+
+def print_batch_summary(summary: Dict[str, Any]) -> None:
+    """Prints the batch summary as a table of per-topic timings."""
+    print(f"\n=== Batch Complete ===")
+    print(
+        f"{summary['succeeded']}/{summary['topics']} topics in {summary['wall_seconds']:.1f}s "
+        f"({summary['topics_per_hour']:.1f} topics/hour, concurrency {summary['topic_concurrency']})"
+    )
+    print(f"Per-topic time: p50 {summary['topic_seconds_p50']:.1f}s, p95 {summary['topic_seconds_p95']:.1f}s")
+    for run in summary["runs"]:
+        stages = ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in run["stage_seconds"].items())
+        outcome = f"FAILED: {run['error']} | {run['run_id']}" if run["error"] else f"{run['gold_count']} gold | {run['run_id']}"
+        print(f"  {run['seconds']:7.1f}s | {stages or '-'} | {outcome} | {run['topic'][:60]}")
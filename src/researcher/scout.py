@@ -2,63 +2,269 @@
 Scout Agents: The gathering layer.
 """
 from abc import ABC, abstractmethod
-from typing import List
-import requests
-from ddgs import DDGS
-from bs4 import BeautifulSoup
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional
 import asyncio
+import contextlib
+import copy
 
+from researcher.budget import current_budget
+from researcher.cache import PageCache
+from researcher.extract import ExtractedPage, ExtractionEngine
+from researcher.fetcher import FetchEngine
+from researcher.findings import Finding
+from researcher.frontier import URLFrontier
+from researcher.history import HistoryStore
 from researcher.models import ResearchTask, ResearchFinding
+from researcher.search import DDGSProvider, Discovery
+from researcher.tracing import current_span, span
+
+Emit = Callable[[Finding], None]
+
+
+async def stream_findings(produce: Callable[[Emit], Awaitable[Any]]) -> AsyncIterator[Finding]:
+    """Turns a callback-style producer into an async iterator of findings.
+
+    `produce` runs as a background task and calls `emit` for each finding;
+    findings are yielded as soon as they are emitted. If the consumer stops
+    early (or is cancelled), the producer and its outstanding fetches are
+    cancelled.
+
+    Args:
+        produce: Coroutine function taking the `emit` callback.
+
+    Yields:
+        Findings in the order they were produced.
+    """
+    queue: "asyncio.Queue[Any]" = asyncio.Queue()
+    done = object()
+
+    async def run() -> None:
+        try:
+            await produce(queue.put_nowait)
+        finally:
+            queue.put_nowait(done)
+
+    producer = asyncio.create_task(run())
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            yield item
+        await producer
+    finally:
+        if not producer.done():
+            producer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await producer
+
 
 class BaseScout(ABC):
     """Abstract base class for all research scouts."""
 
+    frontier: URLFrontier
+
     @abstractmethod
-    async def gather(self, task: ResearchTask) -> List[ResearchFinding]:
+    async def gather(self, task: ResearchTask) -> List[Finding]:
         """Executes the search task and returns findings."""
         pass
 
+    async def stream(self, task: ResearchTask) -> AsyncIterator[Finding]:
+        """Yields findings as they are produced.
+
+        Scouts that can produce incrementally override this; the default
+        simply yields the result of `gather`.
+        """
+        for finding in await self.gather(task):
+            yield finding
+
+    def with_frontier(self, frontier: URLFrontier) -> "BaseScout":
+        """Returns a view of this scout that claims URLs in another frontier.
+
+        Everything else (fetch engine, caches, browser pool) stays shared, so
+        several research runs in one process can reuse one scout while each
+        deduplicates its own pages.
+        """
+        scout = copy.copy(self)
+        scout.frontier = frontier
+        return scout
+
 class OpenWebScout(BaseScout):
     """Scout that searches the public open web."""
 
-    def __init__(self, num_results: int = 3):
+    def __init__(
+        self,
+        num_results: int = 3,
+        fetch_engine: Optional[FetchEngine] = None,
+        page_cache: Optional[PageCache] = None,
+        discovery: Optional[Discovery] = None,
+        frontier: Optional[URLFrontier] = None,
+        extraction_engine: Optional[ExtractionEngine] = None,
+        history: Optional[HistoryStore] = None,
+        offline: bool = False,
+    ):
+        """
+        Args:
+            num_results: Number of search results to fetch per query.
+            fetch_engine: Shared fetch engine. A private one is created if omitted.
+            page_cache: Persistent page cache consulted before the network.
+            discovery: Shared search layer. Defaults to uncached DDGS on the fetch engine's pool.
+            frontier: Run-wide URL frontier used to fetch each page once across tasks.
+            extraction_engine: Main-content extractor. Defaults to readability
+                extraction on a worker thread.
+            history: Run history; pages fetched recently by any earlier run are reused from it.
+            offline: Serve pages only from the history and page cache (replay mode); never fetch.
+        """
         self.num_results = num_results
+        self.fetch_engine = fetch_engine or FetchEngine()
+        self.page_cache = page_cache
+        self.discovery = discovery or Discovery(DDGSProvider(), run_blocking=self.fetch_engine.run_blocking)
+        self.frontier = frontier or URLFrontier()
+        self.extraction_engine = extraction_engine or ExtractionEngine(workers=0)
+        self.history = history
+        self.offline = offline
 
-    async def gather(self, task: ResearchTask) -> List[ResearchFinding]:
+    async def gather(self, task: ResearchTask) -> List[Finding]:
         """Searches DuckDuckGo and scrapes the resulting pages."""
+        return [finding async for finding in self.stream(task)]
+
+    async def stream(self, task: ResearchTask) -> AsyncIterator[Finding]:
+        """Searches and scrapes, yielding each finding as soon as its page is parsed.
+
+        All queries of the task, and all result pages of each query, run
+        concurrently; the fetch engine enforces the global and per-host limits.
+        """
         print(f"OpenWebScout: Searching for '{task.description}'...")
-        findings = []
-        
-        for query in task.queries:
-            print(f"  - Querying: {query}")
+
+        async def produce(emit: Emit) -> None:
+            await asyncio.gather(*(self._search_and_fetch(query, task.id, emit) for query in task.queries))
+
+        async for finding in stream_findings(produce):
+            yield finding
+
+    async def _search_and_fetch(self, query: str, task_id: str, emit: Emit) -> None:
+        """Runs one query and fetches every result page concurrently."""
+        print(f"  - Querying: {query}")
+        with span("scout.query", query=query) as query_span:
             try:
-                # Use DDGS (DuckDuckGo Search)
-                # It returns a list of dicts: {'title':..., 'href':..., 'body':...}
-                results = await asyncio.to_thread(lambda: list(DDGS().text(query, max_results=self.num_results)))
-                
-                for result in results:
-                    url = result['href']
-                    try:
-                        # Simple scraping logic
-                        # Real implementation would use a robust scraper/headless browser
-                        response = await asyncio.to_thread(requests.get, url, timeout=5)
-                        if response.status_code == 200:
-                            soup = BeautifulSoup(response.text, 'html.parser')
-                            # very basic extraction: get title and first few paragraphs
-                            title = soup.title.string if soup.title else "No Title"
-                            paragraphs = [p.get_text() for p in soup.find_all('p')[:3]]
-                            content = "\n".join(paragraphs)
-                            
-                            findings.append(ResearchFinding(
-                                source_url=url,
-                                content=f"Title: {title}\n\n{content}",
-                                relevance_score=0.8, # Placeholder score
-                                key_fact=f"Retrieved content from {result.get('title', 'Unknown Title')}"
-                            ))
-                    except Exception as e:
-                        print(f"    Failed to fetch {url}: {e}")
-            
+                # Discovery returns DDGS-style dicts: {'title':..., 'href':..., 'body':...}
+                results = await self.discovery.search(query, self.num_results)
             except Exception as e:
                 print(f"  Search failed for query '{query}': {e}")
-                
-        return findings
+                query_span.set(search_failed=True)
+                return
+
+            query_span.set(results=len(results))
+            await asyncio.gather(*(self._fetch_claimed(result, task_id, emit) for result in results))
+
+    async def _fetch_claimed(self, result: dict, task_id: str, emit: Emit) -> None:
+        """Fetches a result only if no other task has already claimed its URL."""
+        url = result['href']
+        try:
+            claimed = self.frontier.claim(url, task_id)
+        except ValueError as e:
+            # A malformed result URL (e.g. an out-of-range port) cannot be keyed, so it is not fetched.
+            print(f"    Skipping malformed URL {url!r}: {e}")
+            return
+        if not claimed:
+            return
+        finding = None
+        try:
+            with span("fetch", url=url):
+                finding = await self._fetch_finding(result)
+        except asyncio.CancelledError:
+            # Cut short (gold quota or run budget): leave the page to the next task that wants it.
+            self.frontier.release(url)
+            raise
+        except BaseException:
+            self.frontier.resolve(url, None)
+            raise
+        # The frontier may hand back a spilled copy; the original's content is then dropped.
+        resolved = self.frontier.resolve(url, finding)
+        if resolved is not None:
+            emit(resolved)
+
+    async def _fetch_finding(self, result: dict) -> Optional[ResearchFinding]:
+        """Fetches and parses a single search result, going through the history and page cache."""
+        url = result['href']
+        # SQLite is queried on a worker thread, not on the event loop.
+        stored = await asyncio.to_thread(self.history.fresh_page, url) if self.history else None
+        if stored:
+            current_span().set(source="history")
+            return self._make_finding(stored.final_url, stored.title, stored.content, result)
+        page_cache = self.page_cache
+        cached = page_cache.get(url) if page_cache else None
+        if page_cache and cached and page_cache.is_fresh(cached):
+            current_span().set(source="cache")
+            text = await asyncio.to_thread(page_cache.read_text, cached)
+            return self._make_finding(cached.final_url, cached.title, text, result)
+        if self.offline:
+            # Replay: a page the recorded run did not keep is not fetched now either.
+            print(f"    Offline, no recorded copy of {url}; skipping.")
+            current_span().set(source="offline_miss")
+            return None
+
+        try:
+            # Simple scraping logic
+            # Real implementation would use a robust scraper/headless browser
+            headers = page_cache.validators(cached) if page_cache else None
+            response = await self.fetch_engine.get(url, headers=headers or None)
+            current_span().set(
+                source="network",
+                status=response.status_code,
+                kind=response.kind,
+                bytes=response.bytes_read,
+                truncated=response.truncated,
+            )
+            budget = current_budget()
+            if budget:
+                budget.charge_bytes(response.bytes_read)
+            if response.status_code == 304 and page_cache and cached:
+                page_cache.mark_revalidated(cached)
+                current_span().set(source="revalidated")
+                text = await asyncio.to_thread(page_cache.read_text, cached)
+                return self._make_finding(cached.final_url, cached.title, text, result)
+            if response.status_code != 200:
+                return None
+            if response.kind == "binary":
+                print(f"    Skipping {url}: binary content, not a document")
+                return None
+            with span("extract", kind=response.kind) as extract_span:
+                if response.kind == "pdf":
+                    page = await self.extraction_engine.extract_pdf(response.content, response.final_url)
+                elif response.kind == "text":
+                    page = ExtractedPage(title=result.get('title') or "No Title", text=response.text[:50000])
+                else:
+                    page = await self.extraction_engine.extract(response.text, response.final_url)
+                extract_span.set(chars=len(page.text))
+            title, content = page.title, page.text
+
+            if page_cache:
+                # Hashing and writing blobs (up to the PDF cap) happens on a worker thread.
+                await asyncio.to_thread(
+                    page_cache.put,
+                    url,
+                    body=response.content,
+                    text=content,
+                    title=title,
+                    final_url=response.final_url,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+            if self.history:
+                # SQLite and the FTS5 index are written on a worker thread, not on the event loop.
+                await asyncio.to_thread(self.history.record_page, url, response.final_url, title, content)
+            return self._make_finding(response.final_url, title, content, result)
+        except Exception as e:
+            print(f"    Failed to fetch {url}: {e}")
+            current_span().set(error=str(e)[:200])
+            return None
+
+    def _make_finding(self, url: str, title: str, content: str, result: dict) -> ResearchFinding:
+        """Builds a finding from extracted page content."""
+        return ResearchFinding(
+            source_url=url,
+            content=f"Title: {title}\n\n{content}",
+            relevance_score=0.8, # Placeholder score
+            key_fact=f"Retrieved content from {result.get('title', 'Unknown Title')}"
+        )
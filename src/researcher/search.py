@@ -0,0 +1,309 @@
+"""
+Discovery layer: cached, coalesced and optionally hedged web search.
+"""
+import asyncio
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from researcher.tracing import span
+from researcher.utils import percentile
+
+SearchResult = Dict[str, str]
+BlockingRunner = Callable[[Callable[[], Any]], Awaitable[Any]]
+
+
+def normalize_query(query: str) -> str:
+    """Returns the form of a query used for cache and coalescing keys.
+
+    Whitespace is collapsed but case is kept: some backends treat quoted
+    phrases and operators case-sensitively, so 'AI' and 'ai' stay distinct.
+    """
+    return " ".join(query.split())
+
+
+class SearchProvider(ABC):
+    """A blocking web search backend returning DDGS-style result dicts."""
+
+    name: str = "provider"
+
+    @abstractmethod
+    def search(self, query: str, max_results: int) -> List[SearchResult]:
+        """Runs a search.
+
+        Args:
+            query: The search query.
+            max_results: Maximum number of results to return.
+
+        Returns:
+            Dicts with at least 'title', 'href' and 'body' keys.
+        """
+        pass
+
+
+class DDGSProvider(SearchProvider):
+    """Search through the `ddgs` metasearch library.
+
+    The package is only looked up when the provider is created and only
+    imported by the first search (on Discovery's worker thread), so a run
+    served entirely from the search cache never loads it.
+    """
+
+    def __init__(self, backend: str = "auto"):
+        """
+        Args:
+            backend: The ddgs backend(s) to query, e.g. 'auto', 'duckduckgo' or 'brave'.
+        """
+        if importlib.util.find_spec("ddgs") is None:
+            raise ImportError("The 'ddgs' package is required for DDGSProvider.")
+        self.backend = backend
+        self.name = f"ddgs:{backend}"
+
+    def search(self, query: str, max_results: int) -> List[SearchResult]:
+        from ddgs import DDGS
+
+        return list(DDGS().text(query, max_results=max_results, backend=self.backend))
+
+
+class StaticSearchProvider(SearchProvider):
+    """Local stand-in backend for offline runs and tests.
+
+    Queries found in `results` return those results; any other query gets
+    deterministic synthetic results under `base_url`. An optional latency
+    (fixed seconds or a callable of the query) simulates a slow backend.
+    """
+
+    name = "static"
+
+    def __init__(
+        self,
+        results: Optional[Dict[str, List[SearchResult]]] = None,
+        base_url: str = "http://127.0.0.1:8000/",
+        latency: Any = 0.0,
+    ):
+        """
+        Args:
+            results: Fixed results per query.
+            base_url: Prefix for synthetic result URLs.
+            latency: Seconds to block per call, or a callable returning them.
+        """
+        self.results = results or {}
+        self.base_url = base_url
+        self.latency = latency
+        self.calls = 0
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs: Any) -> "StaticSearchProvider":
+        """Loads fixed results from a JSON file mapping query -> result list."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(results=json.load(f), **kwargs)
+
+    def search(self, query: str, max_results: int) -> List[SearchResult]:
+        self.calls += 1
+        delay = self.latency(query) if callable(self.latency) else self.latency
+        if delay:
+            time.sleep(delay)
+        if query in self.results:
+            return self.results[query][:max_results]
+        slug = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-")
+        return [
+            {
+                "title": f"{query} ({i + 1})",
+                "href": f"{self.base_url}{slug}/{i + 1}",
+                "body": f"Synthetic result {i + 1} for {query}",
+            }
+            for i in range(max_results)
+        ]
+
+
+class SearchCache:
+    """TTL'd on-disk cache of query -> results, one JSON file per query."""
+
+    def __init__(self, cache_dir: str, ttl: float = 12 * 3600):
+        """
+        Args:
+            cache_dir: Directory for cached result files.
+            ttl: Seconds a cached result list stays valid.
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, provider: str, query: str, max_results: int) -> str:
+        key = f"{provider}\n{normalize_query(query)}\n{max_results}".encode("utf-8")
+        return os.path.join(self.cache_dir, f"{hashlib.sha256(key).hexdigest()}.json")
+
+    def get(self, provider: str, query: str, max_results: int) -> Optional[List[SearchResult]]:
+        """Returns cached results, or None if absent or expired."""
+        try:
+            with open(self._path(provider, query, max_results), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - record.get("fetched_at", 0) >= self.ttl:
+            return None
+        results: List[SearchResult] = record["results"]
+        return results
+
+    def put(self, provider: str, query: str, max_results: int, results: List[SearchResult]) -> None:
+        """Stores results for a query."""
+        path = self._path(provider, query, max_results)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"query": query, "fetched_at": time.time(), "results": results}, f)
+        os.replace(tmp_path, path)
+
+
+class Discovery:
+    """Front door for all search calls made by the scouts.
+
+    Layers, in order:
+        1. The on-disk SearchCache (if configured).
+        2. In-run coalescing: concurrent identical queries share one request.
+           Both this and the cache key on normalize_query(query).
+        3. Hedging: once enough latency samples exist, a backup request is
+           fired if the primary runs past the configured percentile, and the
+           first successful answer wins.
+    """
+
+    def __init__(
+        self,
+        provider: SearchProvider,
+        cache: Optional[SearchCache] = None,
+        hedge_percentile: Optional[float] = None,
+        backup_provider: Optional[SearchProvider] = None,
+        min_samples: int = 5,
+        run_blocking: Optional[BlockingRunner] = None,
+        offline: bool = False,
+    ):
+        """
+        Args:
+            provider: The primary search backend.
+            cache: Optional persistent result cache.
+            hedge_percentile: Latency percentile (0-100) after which to hedge; None disables hedging.
+            backup_provider: Backend for hedged requests. Defaults to the primary.
+            min_samples: Latency samples needed before hedging starts.
+            run_blocking: Coroutine used to run blocking provider calls. Defaults to asyncio.to_thread.
+            offline: Serve only from the cache (replay mode); a miss returns no results.
+        """
+        self.provider = provider
+        self.cache = cache
+        self.hedge_percentile = hedge_percentile
+        self.backup_provider = backup_provider or provider
+        self.min_samples = min_samples
+        self._run_blocking = run_blocking or asyncio.to_thread
+        self.offline = offline
+
+        self._in_flight: Dict[tuple, asyncio.Future] = {}
+        self.latencies: List[float] = []
+        self.requests = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.offline_misses = 0
+
+    async def search(self, query: str, max_results: int) -> List[SearchResult]:
+        """Returns search results for a query.
+
+        Args:
+            query: The search query.
+            max_results: Maximum number of results.
+
+        Returns:
+            DDGS-style result dicts.
+
+        Raises:
+            Exception: Whatever the provider(s) raised if every attempt failed.
+        """
+        with span("search", query=query) as search_span:
+            return await self._search(query, max_results, search_span)
+
+    async def _search(self, query: str, max_results: int, search_span: Any) -> List[SearchResult]:
+        """Serves a query from the cache, an identical in-flight request or the provider."""
+        if self.cache:
+            cached = self.cache.get(self.provider.name, query, max_results)
+            if cached is not None:
+                self.cache_hits += 1
+                search_span.set(source="cache")
+                return cached
+
+        if self.offline:
+            # Replay: a search the recorded run never completed has no results now either.
+            print(f"Discovery: Offline, no recorded results for '{query}'.")
+            self.offline_misses += 1
+            search_span.set(source="offline_miss")
+            return []
+
+        key = (normalize_query(query), max_results)
+        if key in self._in_flight:
+            self.coalesced += 1
+            search_span.set(source="coalesced")
+            return await asyncio.shield(self._in_flight[key])
+
+        search_span.set(source="network")
+
+        future = asyncio.ensure_future(self._search_uncached(query, max_results))
+        self._in_flight[key] = future
+        try:
+            results = await asyncio.shield(future)
+        finally:
+            self._in_flight.pop(key, None)
+
+        if self.cache:
+            self.cache.put(self.provider.name, query, max_results, results)
+        return results
+
+    async def _timed(self, provider: SearchProvider, query: str, max_results: int) -> List[SearchResult]:
+        """Runs one provider call and records its latency on success."""
+        self.requests += 1
+        started_at = time.perf_counter()
+        results: List[SearchResult] = await self._run_blocking(lambda: provider.search(query, max_results))
+        self.latencies.append(time.perf_counter() - started_at)
+        return results
+
+    async def _search_uncached(self, query: str, max_results: int) -> List[SearchResult]:
+        """Runs the primary request, hedging it if it runs long."""
+        if self.hedge_percentile is None or len(self.latencies) < self.min_samples:
+            return await self._timed(self.provider, query, max_results)
+
+        hedge_after = percentile(self.latencies, self.hedge_percentile)
+        primary = asyncio.ensure_future(self._timed(self.provider, query, max_results))
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        self.hedged += 1
+        backup = asyncio.ensure_future(self._timed(self.backup_provider, query, max_results))
+        pending = {primary, backup}
+        last_error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    if task is backup:
+                        self.hedge_wins += 1
+                    return task.result()
+                last_error = task.exception()
+        raise last_error or RuntimeError(f"Search for '{query}' failed without an error")
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns discovery counters and latency percentiles for the run metadata."""
+        return {
+            "provider": self.provider.name,
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "offline_misses": self.offline_misses,
+            "latency_p50_s": round(percentile(self.latencies, 50), 3),
+            "latency_p95_s": round(percentile(self.latencies, 95), 3),
+        }
@@ -0,0 +1,190 @@
+"""
+Profile Snapshots: incremental, allow-listed copies of a Chrome profile.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+# Files and directories (relative to the profile) that carry authentication state.
+# Everything else - caches, IndexedDB, extensions, history - is left behind.
+AUTH_ALLOW_LIST = (
+    "Cookies",
+    "Cookies-journal",
+    "Network/Cookies",
+    "Network/Cookies-journal",
+    "Local State",
+    "Login Data",
+    "Login Data-journal",
+    "Local Storage",
+    "Preferences",
+    "Secure Preferences",
+)
+
+MANIFEST_NAME = ".snapshot_manifest.json"
+
+# The snapshot holds session cookies and saved logins: owner-only, like the mkdtemp default.
+DIR_MODE = 0o700
+FILE_MODE = 0o600
+
+
+@dataclass
+class SnapshotReport:
+    """What a snapshot refresh did and how long it took."""
+    snapshot_dir: str
+    files_copied: int = 0
+    files_unchanged: int = 0
+    files_removed: int = 0
+    bytes_copied: int = 0
+    snapshot_bytes: int = 0
+    seconds: float = 0.0
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ProfileSnapshotManager:
+    """Maintains a reusable copy of the authentication parts of a browser profile.
+
+    Only allow-listed paths are copied. A manifest of source mtime/size (and a
+    hash when the mtime moved but the size did not) lets later refreshes copy
+    only what changed, so warm runs start almost immediately. With no
+    `snapshot_dir`, a throwaway temp directory is used and removed by `remove()`.
+    Directories and copied files are readable by the owner only.
+    """
+
+    def __init__(
+        self,
+        source_profile_path: str,
+        snapshot_dir: Optional[str] = None,
+        allow_list: Sequence[str] = AUTH_ALLOW_LIST,
+    ):
+        """
+        Args:
+            source_profile_path: The user's browser profile directory.
+            snapshot_dir: Persistent snapshot location reused across runs, or None for a temp dir.
+            allow_list: Profile-relative paths to copy.
+        """
+        self.source_profile_path = source_profile_path
+        self.persistent = snapshot_dir is not None
+        self.snapshot_dir = snapshot_dir or tempfile.mkdtemp(prefix="researcher_agent_profile_")
+        self.allow_list = allow_list
+        self.last_report: Optional[SnapshotReport] = None
+        # Set by the owner once the snapshot is usable for this process (refreshed, or no source).
+        self.ready = False
+        os.makedirs(self.snapshot_dir, mode=DIR_MODE, exist_ok=True)
+        # makedirs honours the umask and leaves an existing directory alone.
+        os.chmod(self.snapshot_dir, DIR_MODE)
+
+    def _source_files(self) -> Iterator[Tuple[str, str]]:
+        """Yields (absolute source path, snapshot-relative path) for every allow-listed file."""
+        for entry in self.allow_list:
+            source = os.path.join(self.source_profile_path, entry)
+            if entry == "Local State" and not os.path.exists(source):
+                # Chrome keeps Local State (and its cookie key) one level up from the profile.
+                source = os.path.join(os.path.dirname(self.source_profile_path.rstrip(os.sep)), entry)
+            if os.path.isfile(source):
+                yield source, entry
+            elif os.path.isdir(source):
+                for root, _, names in os.walk(source):
+                    for name in names:
+                        path = os.path.join(root, name)
+                        yield path, os.path.join(entry, os.path.relpath(path, source))
+
+    def _load_manifest(self) -> Dict[str, Dict[str, object]]:
+        try:
+            with open(os.path.join(self.snapshot_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+                manifest: Dict[str, Dict[str, object]] = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest
+
+    def refresh(self) -> SnapshotReport:
+        """Brings the snapshot up to date with the source profile.
+
+        Returns:
+            A SnapshotReport describing the work done.
+        """
+        started_at = time.perf_counter()
+        report = SnapshotReport(snapshot_dir=self.snapshot_dir)
+        old_manifest = self._load_manifest()
+        manifest: Dict[str, Dict[str, object]] = {}
+
+        for source, relative in self._source_files():
+            dest = os.path.join(self.snapshot_dir, relative)
+            try:
+                stat = os.stat(source)
+            except OSError:
+                continue
+            record: Dict[str, object] = {"mtime": stat.st_mtime, "size": stat.st_size}
+            previous = old_manifest.get(relative)
+
+            if previous and os.path.exists(dest) and self._unchanged(previous, record, source, dest):
+                # Snapshots written before permissions were tightened are fixed in place.
+                os.chmod(dest, FILE_MODE)
+                manifest[relative] = {**previous, **record}
+                report.files_unchanged += 1
+                report.snapshot_bytes += stat.st_size
+                continue
+
+            try:
+                os.makedirs(os.path.dirname(dest), mode=DIR_MODE, exist_ok=True)
+                shutil.copy2(source, dest)
+                os.chmod(dest, FILE_MODE)
+            except OSError as e:
+                print(f"ProfileSnapshotManager [WARNING]: Could not copy {relative}: {e}")
+                continue
+            dest_stat = os.stat(dest)
+            record.update({"hash": _sha256(dest), "dest_mtime": dest_stat.st_mtime, "dest_size": dest_stat.st_size})
+            manifest[relative] = record
+            report.files_copied += 1
+            report.bytes_copied += stat.st_size
+            report.snapshot_bytes += stat.st_size
+
+        for relative in set(old_manifest) - set(manifest):
+            try:
+                os.remove(os.path.join(self.snapshot_dir, relative))
+                report.files_removed += 1
+            except OSError:
+                pass
+
+        with open(os.path.join(self.snapshot_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+
+        report.seconds = time.perf_counter() - started_at
+        self.last_report = report
+        return report
+
+    def _unchanged(self, previous: Dict[str, object], current: Dict[str, object], source: str, dest: str) -> bool:
+        """Decides whether a previously copied file can be kept as is."""
+        try:
+            dest_stat = os.stat(dest)
+        except OSError:
+            return False
+        # The browser may have rewritten our copy; recopy so the source profile wins.
+        if (dest_stat.st_mtime, dest_stat.st_size) != (previous.get("dest_mtime"), previous.get("dest_size")):
+            return False
+        if previous.get("size") != current["size"]:
+            return False
+        if previous.get("mtime") == current["mtime"]:
+            return True
+        # Touched but same size: only a content hash can tell.
+        return previous.get("hash") == _sha256(source)
+
+    def stats(self) -> Optional[Dict[str, object]]:
+        """Returns the last refresh report for the run metadata."""
+        return asdict(self.last_report) if self.last_report else None
+
+    def remove(self) -> None:
+        """Deletes a temporary snapshot. Persistent snapshots are kept for the next run."""
+        if not self.persistent:
+            shutil.rmtree(self.snapshot_dir, ignore_errors=True)
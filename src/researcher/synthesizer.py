@@ -1,66 +1,174 @@
 import os
 import datetime
-from typing import List, Optional
-from dotenv import load_dotenv
-from google import genai
-from google.genai import types
+from typing import Any, Callable, Dict, List, Optional
 import asyncio
+import time
 
-from researcher.utils import retry_on_quota_error
-from researcher.models import ResearchPlan, ResearchFinding, ResearchReport, ReportType
-
-# Load environment variables
-load_dotenv()
+from researcher.budget import BudgetExceededError, current_budget
+from researcher.findings import Finding
+from researcher.packer import ContextPacker, estimate_tokens, fit_texts
+from researcher.llm import LLMClient, StreamInterruptedError
+from researcher.llm_cache import ReplayMissError
+from researcher.models import ResearchPlan, ResearchReport, ResearchTask, ReportType
+from researcher.tracing import span
+from researcher.urls import canonicalize_url
 
 
 class Synthesizer:
     """Compiles findings into the final Insta-Expert report."""
 
-    def __init__(self, model_name: str = None):
+    def __init__(
+        self,
+        model_name: str = None,
+        context_budget: int = 100_000,
+        mode: str = "single",
+        map_concurrency: int = 4,
+        llm: Optional[LLMClient] = None,
+    ):
+        """
+        Args:
+            model_name: Gemini model; defaults to GEMINI_MODEL.
+            context_budget: Estimated tokens the findings may take up in one prompt.
+            mode: 'single' (one call over all findings) or 'map_reduce'
+                (one summary per sub-task, merged by a final call).
+            map_concurrency: Map-reduce mode: maximum concurrent summary calls.
+            llm: Shared Gemini client; defaults to the process-wide LLMClient.
+        """
+        self.llm = llm or LLMClient.shared()
+        self.context_budget = context_budget
+        self.mode = mode
+        self.map_concurrency = map_concurrency
+        self.prompt_stats: Dict[str, Any] = {}
+        self.stream_stats: Dict[str, Any] = {"streamed": False}
         self.model_name = model_name or os.getenv("GEMINI_MODEL", "gemini-3-pro-preview")
-        self.api_key = os.getenv("GEMINI_API_KEY")
-        self.client: Optional[genai.Client] = None
-        
-        if self.api_key:
-            self.client = genai.Client(api_key=self.api_key)
 
 
-    @retry_on_quota_error(max_retries=5, initial_delay=15.0)
-    async def _generate_content(self, prompt: str):
-        """Helper to call Gemini API with retries using new SDK."""
-        if not self.client:
-            raise ValueError("Client not initialized")
-            
+    async def _generate_content(self, prompt: str, on_text: Optional[Callable[[str], None]] = None) -> str:
+        """Helper to call Gemini through the shared async client (rate-controlled and retried there)."""
         # Use Thinking Config as requested for high-quality synthesis
         # 1.47.0 supports include_thoughts
+        from google.genai import types
+
         config = types.GenerateContentConfig(
             thinking_config=types.ThinkingConfig(
                 include_thoughts=True,
             ),
         )
         
-        # Wrapping sync call in thread since new SDK might be sync-default
-        return await asyncio.to_thread(
-             self.client.models.generate_content,
-             model=self.model_name,
-             contents=prompt,
-             config=config
-        )
+        if on_text is None:
+            response = await self.llm.generate(self.model_name, prompt, config)
+            return response.text
+
+        started_at = time.perf_counter()
+        first_chunk_at: List[float] = []
+
+        def deliver(chunk: str) -> None:
+            if not first_chunk_at:
+                first_chunk_at.append(time.perf_counter())
+            on_text(chunk)
 
-    async def generate_report(self, plan: ResearchPlan, findings: List[ResearchFinding], report_type: ReportType) -> str:
-        """Generates the final markdown report."""
+        text = await self.llm.generate_stream(self.model_name, prompt, config, deliver)
+        self.stream_stats = {
+            "streamed": True,
+            "ttft_s": round(first_chunk_at[0] - started_at, 2) if first_chunk_at else None,
+            "generation_s": round(time.perf_counter() - started_at, 2),
+        }
+        return text
+
+    async def generate_report(
+        self,
+        plan: ResearchPlan,
+        findings: List[Finding],
+        report_type: ReportType,
+        on_text: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Generates the final markdown report.
+
+        Args:
+            plan: The research plan.
+            findings: The gold findings.
+            report_type: The desired output format.
+            on_text: If given, the report is generated with the streaming API
+                and each chunk is passed here as it arrives.
+
+        Returns:
+            The complete report. If the run's budget stops synthesis or the
+            stream breaks off, the text streamed so far (marked as cut
+            short), or else a list of the sources.
+        """
         print(f"Synthesizer: Compiling report on '{plan.topic}' with {len(findings)} sources...")
         
-        if not self.client:
+        if not self.llm.available:
              return self._generate_mock_report(plan, findings)
 
+        # Arrival order varies from run to run; a stable order keeps the prompt (and its cache key) stable.
+        findings = sorted(findings, key=lambda f: canonicalize_url(f.source_url))
+
+        budget = current_budget()
+        streamed: List[str] = []
+
+        def collect(chunk: str) -> None:
+            streamed.append(chunk)
+            if on_text is not None:
+                on_text(chunk)
+
         try:
-            findings_text = "\n\n".join([
-                f"Source: {f.source_url}\nContent: {f.content}\nReliability: {f.relevance_score}" 
-                for f in findings
-            ])
-            
-            prompt = f"""
+            return await asyncio.wait_for(
+                self._write_report(plan, findings, collect if on_text else None),
+                budget.stage_remaining("synthesis") if budget else None,
+            )
+        except ReplayMissError:
+            raise
+        except (asyncio.TimeoutError, BudgetExceededError) as e:
+            if budget is None:
+                print(f"Synthesizer Error: {e!r}")
+                return self._generate_mock_report(plan, findings)
+            limit = "max_llm_tokens" if isinstance(e, BudgetExceededError) else "time_budget"
+            print(f"Synthesizer [WARNING]: Synthesis stopped by the run budget ({limit}).")
+            budget.hit(limit, f"synthesis stopped by {limit}")
+            budget.skip("synthesis", "partial report" if streamed else "report", limit)
+            if streamed:
+                return "".join(streamed) + f"\n\n---\n*Report cut short: the run's budget ({limit}) ran out during synthesis.*\n"
+            return self._generate_mock_report(plan, findings, note=f"Run budget ({limit}) exhausted before synthesis. Listing sources only.")
+        except StreamInterruptedError as e:
+            # The reader has already seen this text; a source list in its place would discard it.
+            print(f"Synthesizer [WARNING]: The report stream broke off ({e}); keeping the partial report.")
+            return "".join(streamed) + f"\n\n---\n*Report cut short: the model's stream broke off during synthesis ({e}).*\n"
+        except Exception as e:
+            print(f"Synthesizer Error: {e}")
+            return self._generate_mock_report(plan, findings)
+
+    def _context_budget(self, calls: int = 1) -> int:
+        """Tokens of findings text per prompt, shrunk to fit the run's remaining Gemini tokens."""
+        budget = current_budget()
+        left = budget.llm_tokens_left() if budget else None
+        if budget is None or left is None:
+            return self.context_budget
+        # Half of what is left goes to the prompts; the rest is kept for output and thoughts.
+        share = left // (2 * calls)
+        if share < self.context_budget:
+            budget.hit("max_llm_tokens", f"synthesis context cut from {self.context_budget} to {share} tokens per call")
+        return min(self.context_budget, share)
+
+    async def _write_report(
+        self,
+        plan: ResearchPlan,
+        findings: List[Finding],
+        on_text: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Packs the findings and writes the report in the configured mode."""
+        if self.mode == "map_reduce":
+            return await self._map_reduce(plan, findings, on_text)
+
+        context_budget = self._context_budget()
+        packed = ContextPacker(plan, token_budget=context_budget).pack(findings)
+        findings_text = packed.text
+        print(
+            f"Synthesizer: Packed {packed.passages_kept}/{packed.passages_total} passages "
+            f"from {packed.sources} sources (~{packed.tokens} tokens)."
+        )
+        
+        prompt = f"""
             You are an expert Research Synthesizer. 
             Topic: {plan.topic}
             
@@ -79,21 +187,183 @@ class Synthesizer:
             
             Write the report now.
             """
-            
-            response = await self._generate_content(prompt)
-            # The new SDK response structure: response.text should be the content
-            return response.text
+        
+        self.prompt_stats = {
+            "mode": "single",
+            "context_budget": context_budget,
+            "prompt_chars": len(prompt),
+            "prompt_tokens_estimate": estimate_tokens(prompt),
+            **packed.stats(),
+        }
+        return await self._generate_content(prompt, on_text)
+
+    async def _summarize_task(
+        self,
+        plan: ResearchPlan,
+        task: Optional[ResearchTask],
+        findings: List[Finding],
+        context_budget: int,
+    ) -> str:
+        """Map step: condenses one sub-task's findings into cited notes."""
+        packed = ContextPacker(plan, token_budget=context_budget).pack(findings)
+        focus = task.description if task else "Findings not tied to a specific sub-task"
+        prompt = f"""
+        You are a Research Analyst preparing notes for a report on: {plan.topic}
+        Sub-task: {focus}
+
+        Key questions the report must answer:
+        {chr(10).join(f"- {question}" for question in plan.key_questions)}
+
+        Using ONLY the research findings below, write dense Markdown notes:
+        - The facts, figures and arguments relevant to the sub-task and key questions.
+        - Any disagreement between sources.
+        - Cite every point inline as [Page Title](URL) using the Source URLs given.
+
+        Research Findings:
+        {packed.text}
+        """
+        return await self._generate_content(prompt)
+
+    async def _map_reduce(
+        self,
+        plan: ResearchPlan,
+        findings: List[Finding],
+        on_text: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Summarises each sub-task concurrently, then merges the summaries into the report.
 
+        A failed summary is logged and left out; the report is written from
+        whichever summaries succeeded.
+        """
+        tasks_by_id = {task.id: task for task in plan.sub_tasks}
+        groups: Dict[Optional[str], List[Finding]] = {}
+        for finding in findings:
+            # The first referring task in plan order, not in claim order.
+            task_id = next((task.id for task in plan.sub_tasks if task.id in finding.task_ids), None)
+            groups.setdefault(task_id, []).append(finding)
+
+        # Every summary and the final merge share what is left of the token budget.
+        context_budget = self._context_budget(calls=len(groups) + 1)
+        semaphore = asyncio.Semaphore(self.map_concurrency)
+        map_seconds: List[float] = []
+
+        async def run_map(task_id: Optional[str], group: List[Finding]) -> str:
+            async with semaphore:
+                started_at = time.perf_counter()
+                try:
+                    with span("synthesis.map", task_id=task_id or "other", findings=len(group)):
+                        return await self._summarize_task(plan, tasks_by_id.get(task_id) if task_id else None, group, context_budget)
+                finally:
+                    map_seconds.append(time.perf_counter() - started_at)
+
+        print(f"Synthesizer: Summarising {len(groups)} sub-tasks (up to {self.map_concurrency} at a time)...")
+        started_at = time.perf_counter()
+        results = await asyncio.gather(
+            *(run_map(task_id, group) for task_id, group in groups.items()),
+            return_exceptions=True,
+        )
+        map_wall = time.perf_counter() - started_at
+
+        summaries: List[str] = []
+        failed: List[str] = []
+        for task_id, result in zip(groups, results):
+            label = tasks_by_id[task_id].description if task_id in tasks_by_id else "Other findings"
+            if isinstance(result, ReplayMissError):
+                raise result
+            if isinstance(result, BaseException):
+                print(f"Synthesizer [WARNING]: Summary for '{label}' failed: {result}")
+                failed.append(task_id or "other")
+                continue
+            summaries.append(f"## {label}\n\n{result}")
+
+        if not summaries:
+            raise RuntimeError("every sub-task summary failed")
+
+        missing = (
+            f"\n            Note: notes for {len(failed)} sub-task(s) are unavailable; do not speculate about them.\n"
+            if failed else ""
+        )
+        # The merge call gets the same per-call share of the budget as each summary.
+        notes, notes_trimmed = fit_texts(summaries, context_budget)
+        if notes_trimmed:
+            print(f"Synthesizer: Trimmed {notes_trimmed} sub-task notes to fit ~{context_budget} tokens.")
+        prompt = f"""
+            You are an expert Research Synthesizer. 
+            Topic: {plan.topic}
+            
+            Your goal is to write a high-density 'Insta-Expert' report based ONLY on the sub-task notes below.
+            Keep the inline citations from the notes.
+            {missing}
+            Format: Markdown.
+            Structure:
+            1. Executive Summary (The 2-minute download)
+            2. Key Concepts (Definitions/Ontology)
+            3. Deep Dive (Synthesis of the main themes)
+            4. Contrarian Views (If any found)
+            5. References (Format each reference as: [Page Title](URL))
+            
+            Sub-task Notes:
+            {chr(10).join(notes)}
+            
+            Write the report now.
+            """
+        started_at = time.perf_counter()
+        reduce_error = None
+        try:
+            with span("synthesis.reduce", summaries=len(summaries)):
+                report = await self._generate_content(prompt, on_text)
+        except (ReplayMissError, StreamInterruptedError):
+            # A broken stream has already shown part of the merged report; generate_report keeps it.
+            raise
         except Exception as e:
-            print(f"Synthesizer Error: {e}")
-            return self._generate_mock_report(plan, findings)
+            # The summaries are a usable report on their own; don't throw them away.
+            print(f"Synthesizer [WARNING]: Merging the sub-task notes failed ({e}); returning the notes.")
+            reduce_error = str(e)
+            report = self._notes_report(plan, summaries, reduce_error)
+            budget = current_budget()
+            if budget and isinstance(e, BudgetExceededError):
+                budget.skip("synthesis", "reduce", "max_llm_tokens")
+        self.prompt_stats = {
+            "mode": "map_reduce",
+            "context_budget": context_budget,
+            "map_calls": len(groups),
+            "map_failed": failed,
+            "map_concurrency": self.map_concurrency,
+            "map_wall_s": round(map_wall, 2),
+            "map_max_s": round(max(map_seconds, default=0.0), 2),
+            "reduce_s": round(time.perf_counter() - started_at, 2),
+            "reduce_prompt_chars": len(prompt),
+            "reduce_prompt_tokens_estimate": estimate_tokens(prompt),
+            "reduce_notes_trimmed": notes_trimmed,
+            "reduce_error": reduce_error,
+        }
+        return report
+
+    @staticmethod
+    def _notes_report(plan: ResearchPlan, summaries: List[str], error: str) -> str:
+        """Fallback when the merge call fails: the sub-task notes, one section each."""
+        return (
+            f"# Insta-Expert Report: {plan.topic}\n\n"
+            f"> Note: The final merge step failed ({error}). Below are the per-sub-task notes it would have combined.\n\n"
+            + "\n\n".join(summaries)
+            + "\n"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the size of the last prompt, how its context was packed and stream timings."""
+        return {**self.prompt_stats, **self.stream_stats}
 
-    def _generate_mock_report(self, plan: ResearchPlan, findings: List[ResearchFinding]) -> str:
+    def _generate_mock_report(
+        self,
+        plan: ResearchPlan,
+        findings: List[Finding],
+        note: str = "API Call Failed. Using Mock Output.",
+    ) -> str:
         """Fallback mock report."""
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
         report = f"# [MOCK] Insta-Expert Report: {plan.topic}\n"
         report += f"**Date**: {timestamp}\n\n"
-        report += "## Note: API Call Failed. Using Mock Output.\n\n"
+        report += f"## Note: {note}\n\n"
         # ... (rest of mock logic)
         for finding in findings:
              report += f"- {finding.source_url}\n"
@@ -0,0 +1,283 @@
+"""
+Tracing: hierarchical timing spans for a research run, with file exporters.
+"""
+import asyncio
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import secrets
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from researcher.utils import percentile
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class Span:
+    """One timed operation; `parent_id` links it into the run's tree."""
+    name: str
+    span_id: str
+    parent_id: Optional[str]
+    start: float
+    duration: float = 0.0
+    status: str = "ok"
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def set(self, **attributes: Any) -> None:
+        """Adds or overwrites attributes (counts, sizes, outcomes)."""
+        self.attributes.update(attributes)
+
+    def fail(self, error: BaseException) -> None:
+        """Marks the span failed for an error that was handled inside it."""
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"[:300]
+
+
+class _NullSpan:
+    """Stands in for a Span when no tracer is active, so call sites need no checks."""
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def fail(self, error: BaseException) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+_current_tracer: contextvars.ContextVar[Optional["Tracer"]] = contextvars.ContextVar("tracer", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("span", default=None)
+
+
+class Tracer:
+    """Collects the spans of one research run.
+
+    The active tracer and span live in context variables, so asyncio tasks
+    created inside a span (gathered queries, fetches, LLM calls) parent
+    their own spans correctly, and concurrent topics in a batch each record
+    into their own tracer.
+    """
+
+    def __init__(self, name: str = "run"):
+        """
+        Args:
+            name: Name of the root span.
+        """
+        self.name = name
+        self.trace_id = secrets.token_hex(16)
+        self.spans: List[Span] = []
+        self.started_at = time.time()
+
+    @contextlib.contextmanager
+    def activate(self, **attributes: Any) -> Iterator[Span]:
+        """Makes this the current tracer and opens the root span."""
+        token = _current_tracer.set(self)
+        try:
+            with span(self.name, **attributes) as root:
+                yield root
+        finally:
+            _current_tracer.reset(token)
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregates spans by name: count, total, percentiles and errors.
+
+        Returns:
+            {"total_s": ..., "by_name": {name: {...}}}, ordered by total time.
+        """
+        durations: Dict[str, List[float]] = {}
+        errors: Dict[str, int] = {}
+        for s in self.spans:
+            durations.setdefault(s.name, []).append(s.duration)
+            if s.status != "ok":
+                errors[s.name] = errors.get(s.name, 0) + 1
+        by_name = {
+            name: {
+                "count": len(values),
+                "total_s": round(sum(values), 3),
+                "p50_s": round(percentile(values, 50), 3),
+                "p95_s": round(percentile(values, 95), 3),
+                "max_s": round(max(values), 3),
+                "errors": errors.get(name, 0),
+            }
+            for name, values in sorted(durations.items(), key=lambda item: -sum(item[1]))
+        }
+        root = next((s for s in self.spans if s.parent_id is None), None)
+        # While the run is still open its root span has not been recorded yet.
+        total = root.duration if root else time.time() - self.started_at
+        return {"total_s": round(total, 3), "by_name": by_name}
+
+    def write(self, path: str) -> None:
+        """Writes every span, in start order, plus the summary as JSON."""
+        spans = sorted(self.spans, key=lambda s: s.start)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"trace_id": self.trace_id, "summary": self.summary(), "spans": [asdict(s) for s in spans]},
+                f,
+                indent=2,
+                default=str,
+            )
+
+
+def current_span() -> Any:
+    """Returns the innermost open span, or a no-op stand-in."""
+    return _current_span.get() or NULL_SPAN
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Times the enclosed block as a child of the current span.
+
+    Does nothing (and costs almost nothing) when no tracer is active.
+    Works in async code as long as the block does not span a `yield` of an
+    async generator.
+
+    Args:
+        name: Span name; spans are aggregated by name.
+        **attributes: Initial attributes.
+    """
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield NULL_SPAN
+        return
+    parent = _current_span.get()
+    current = Span(
+        name=name,
+        span_id=secrets.token_hex(8),
+        parent_id=parent.span_id if parent else None,
+        start=time.time(),
+        attributes=attributes,
+    )
+    token = _current_span.set(current)
+    started_at = time.perf_counter()
+    try:
+        yield current
+    except asyncio.CancelledError:
+        current.status = "cancelled"
+        raise
+    except BaseException as e:
+        current.fail(e)
+        raise
+    finally:
+        current.duration = time.perf_counter() - started_at
+        _current_span.reset(token)
+        tracer.spans.append(current)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator form of `span` for plain and async functions."""
+    def decorate(func: F) -> F:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorate
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def export_otlp_json(tracer: Tracer, path: str, service_name: str = "researcher-agent") -> None:
+    """Writes the trace in the OTLP/JSON encoding (one ExportTraceServiceRequest).
+
+    The file can be loaded by an OpenTelemetry Collector's `otlpjsonfile`
+    receiver or posted as-is to an OTLP/HTTP endpoint.
+    """
+    status_codes = {"ok": 1, "error": 2, "cancelled": 2}
+    spans = []
+    for s in tracer.spans:
+        start_ns = int(s.start * 1e9)
+        record = {
+            "traceId": tracer.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 1,
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(start_ns + int(s.duration * 1e9)),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in s.attributes.items()],
+            "status": {"code": status_codes[s.status], **({"message": s.error} if s.error else {})},
+        }
+        if s.parent_id:
+            record["parentSpanId"] = s.parent_id
+        spans.append(record)
+    request = {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{"scope": {"name": "researcher.tracing"}, "spans": spans}],
+        }]
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(request, f)
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def export_prometheus(tracer: Tracer, path: str, labels: Optional[Dict[str, str]] = None) -> None:
+    """Writes the last run's span totals in the Prometheus text format.
+
+    Meant for node_exporter's textfile collector: the file is replaced
+    atomically, so a scrape never sees a partial write.
+
+    Args:
+        tracer: The finished run's tracer.
+        path: Target `.prom` file.
+        labels: Extra labels added to every sample.
+    """
+    def fmt(extra: Dict[str, str]) -> str:
+        merged = {**(labels or {}), **extra}
+        if not merged:
+            return ""
+        return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in merged.items()) + "}"
+
+    summary = tracer.summary()
+    lines = [
+        "# HELP researcher_last_run_duration_seconds Wall time of the last research run.",
+        "# TYPE researcher_last_run_duration_seconds gauge",
+        f"researcher_last_run_duration_seconds{fmt({})} {summary['total_s']}",
+        "# HELP researcher_last_run_timestamp_seconds Start time of the last research run.",
+        "# TYPE researcher_last_run_timestamp_seconds gauge",
+        f"researcher_last_run_timestamp_seconds{fmt({})} {tracer.started_at:.3f}",
+        "# HELP researcher_last_run_span_seconds Total time spent in each span type during the last run.",
+        "# TYPE researcher_last_run_span_seconds gauge",
+    ]
+    lines += [f"researcher_last_run_span_seconds{fmt({'span': name})} {row['total_s']}" for name, row in summary["by_name"].items()]
+    lines += [
+        "# HELP researcher_last_run_span_count Number of spans of each type in the last run.",
+        "# TYPE researcher_last_run_span_count gauge",
+    ]
+    lines += [f"researcher_last_run_span_count{fmt({'span': name})} {row['count']}" for name, row in summary["by_name"].items()]
+    lines += [
+        "# HELP researcher_last_run_span_errors Failed or cancelled spans of each type in the last run.",
+        "# TYPE researcher_last_run_span_errors gauge",
+    ]
+    lines += [f"researcher_last_run_span_errors{fmt({'span': name})} {row['errors']}" for name, row in summary["by_name"].items()]
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
@@ -0,0 +1,77 @@
+"""
+URL helpers shared by the scouts and caches.
+"""
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Query parameters that identify a click or campaign rather than a document.
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "ref_url", "_ga", "_gl", "spm", "cmpid", "ncid", "ocid",
+    "amp", "outputtype",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_")
+
+# Host prefixes used for mobile/AMP mirrors of the same article.
+MIRROR_HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+
+AMP_CACHE_PATTERN = re.compile(r"^/[cv]/(?:s/)?([^/]+)(/.*)?$")
+
+
+def _strip_amp_path(path: str) -> str:
+    """Removes a trailing AMP marker ('/amp', '/amp/' or '.amp.html') from a path.
+
+    An 'amp' segment in the middle of a path is left alone: there it is as
+    likely to be content (e.g. '/amp/fender-deluxe') as an AMP marker.
+    """
+    path = re.sub(r"/amp/?$", "/", path)
+    path = re.sub(r"\.amp(\.html?)$", r"\1", path)
+    return path
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalises a URL so that different spellings of one document share a key.
+
+    Lower-cases the scheme and host, drops default ports, the fragment and
+    tracking parameters, sorts the remaining query, folds www/mobile/AMP host
+    and path variants (including Google AMP cache URLs) onto the plain
+    article, and removes trailing slashes from non-root paths.
+
+    Args:
+        url: The URL as returned by search or a redirect.
+
+    Returns:
+        The canonical form of the URL.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    path = parts.path or "/"
+
+    if host.endswith(".cdn.ampproject.org"):
+        match = AMP_CACHE_PATTERN.match(path)
+        if match:
+            host, path = match.group(1).lower(), match.group(2) or "/"
+            scheme = "https"
+
+    for prefix in MIRROR_HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+
+    netloc = host
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+
+    path = _strip_amp_path(path)
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+
+    query = urlencode(sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ))
+    return urlunsplit((scheme, netloc, path, query, ""))
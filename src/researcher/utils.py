@@ -1,44 +1,22 @@
 """
 Utility functions for the Researcher Agent.
 """
-import asyncio
-import functools
-from typing import Callable, Any
+from typing import Sequence
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Returns the given percentile of a sequence using linear interpolation.
 
-def retry_on_quota_error(max_retries: int = 5, initial_delay: float = 5.0):
-    """Decorator to retry async functions on Quota Exceeded exceptions with exponential backoff.
-    
     Args:
-        max_retries: Maximum number of times to retry.
-        initial_delay: Initial wait time in seconds.
+        values: Sample values (need not be sorted).
+        pct: Percentile to compute, in the range 0-100.
+
+    Returns:
+        The interpolated percentile, or 0.0 for an empty sequence.
     """
-    def decorator(func: Callable) -> Callable:
-        @functools.wraps(func)
-        async def wrapper(*args, **kwargs) -> Any:
-            delay = initial_delay
-            for attempt in range(max_retries + 1):
-                try:
-                    return await func(*args, **kwargs)
-                except Exception as e:
-                    # Check for 429 code or common 'resource exhausted' messages
-                    error_str = str(e).lower()
-                    is_quota_error = (
-                        "429" in error_str or 
-                        "quota" in error_str or 
-                        "resource exhausted" in error_str or
-                        "code: 8" in error_str # gRPC code for Resource Exhausted
-                    )
-                    
-                    if is_quota_error:
-                        if attempt == max_retries:
-                            print(f"\n[Error] Max retries ({max_retries}) reached for {func.__name__}. Last error: {e}")
-                            raise e
-                        
-                        print(f"\n[Warning] API Quota exceeded in {func.__name__}. Retrying in {delay}s (Attempt {attempt + 1}/{max_retries})...")
-                        await asyncio.sleep(delay)
-                        delay *= 2 # Exponential backoff
-                    else:
-                        # Re-raise non-quota errors immediately
-                        raise e
-        return wrapper
-    return decorator
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * (pct / 100.0)
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
@@ -34,7 +34,7 @@ async def main():
     
     # Clean up is manual in the class currently? No, it has a cleanup method but it's not called automatically in gather.
     # We should call clean up.
-    scout.cleanup()
+    await scout.cleanup()
     print("Cleanup complete.")
 
 if __name__ == "__main__":
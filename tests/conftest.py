@@ -0,0 +1,44 @@
+"""
+Shared test helpers: a scripted stand-in for the Gemini async client.
+"""
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, List, Optional
+
+
+class ScriptedModels:
+    """Stand-in for `genai.Client().aio.models` that answers with a function of the prompt.
+
+    `respond` returns the response text or raises. Streamed responses are
+    delivered in 20-character chunks; with `fail_stream_after`, the stream
+    drops after that many chunks.
+    """
+
+    def __init__(self, respond: Callable[[str], str], fail_stream_after: Optional[int] = None):
+        self.respond = respond
+        self.fail_stream_after = fail_stream_after
+        self.prompts: List[str] = []
+
+    async def generate_content(self, model: str, contents: str, config: Any = None) -> Any:
+        self.prompts.append(contents)
+        return SimpleNamespace(text=self.respond(contents), usage_metadata=None)
+
+    async def generate_content_stream(self, model: str, contents: str, config: Any = None) -> AsyncIterator[Any]:
+        self.prompts.append(contents)
+        text = self.respond(contents)
+        chunks = [text[i:i + 20] for i in range(0, len(text), 20)]
+
+        async def stream() -> AsyncIterator[Any]:
+            for index, chunk in enumerate(chunks):
+                if self.fail_stream_after is not None and index >= self.fail_stream_after:
+                    raise ValueError("stream dropped")
+                yield SimpleNamespace(text=chunk, usage_metadata=None)
+
+        return stream()
+
+
+def scripted_client(models: ScriptedModels) -> Any:
+    """Wraps ScriptedModels in the `client.aio` shape LLMClient expects."""
+    async def aclose() -> None:
+        pass
+
+    return SimpleNamespace(aio=SimpleNamespace(models=models, aclose=aclose))
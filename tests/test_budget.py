@@ -0,0 +1,152 @@
+"""
+Tests for the run budget: timeout clamping, the scouting cut-off and Gemini token refusals.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from conftest import ScriptedModels, scripted_client
+from researcher.analyst import Analyst
+from researcher.budget import RunBudget, clamp_timeout
+from researcher.deep_scout import DeepSourceScout
+from researcher.frontier import URLFrontier
+from researcher.llm import LLMClient
+from researcher.models import ReportType, ResearchFinding, ResearchPlan, ResearchTask
+from researcher.orchestrator import Orchestrator
+from researcher.pipeline import ResearchPipeline
+from researcher.scout import OpenWebScout
+from researcher.search import Discovery, StaticSearchProvider
+from researcher.synthesizer import Synthesizer
+
+PLAN = ResearchPlan(
+    topic="Tidal power",
+    key_questions=["Where is tidal power generated?"],
+    sub_tasks=[ResearchTask(id="sites", description="Tidal sites", queries=["tidal power station sites"])],
+)
+
+
+class HangingScout(OpenWebScout):
+    """OpenWebScout whose page fetches never finish."""
+
+    def __init__(self) -> None:
+        super().__init__(num_results=2, discovery=Discovery(StaticSearchProvider()))
+
+    async def _fetch_finding(self, result: Dict[str, str]) -> Optional[ResearchFinding]:
+        await asyncio.sleep(60)
+        return None
+
+
+class RecordingPage:
+    """Stand-in for a Playwright page that records navigations."""
+
+    def __init__(self) -> None:
+        self.gotos: List[Any] = []
+
+    async def goto(self, url: str, **kwargs: Any) -> None:
+        self.gotos.append((url, kwargs))
+
+
+class RecordingPool:
+    """Stand-in for BrowserPool that lends a single RecordingPage."""
+
+    def __init__(self) -> None:
+        self.tab = RecordingPage()
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[RecordingPage]:
+        yield self.tab
+
+
+def test_clamp_timeout_never_outlasts_the_stage() -> None:
+    assert clamp_timeout(20.0, "scouting") == 20.0
+
+    with RunBudget(time_budget=100).activate():
+        assert clamp_timeout(20.0, "scouting") == 20.0
+        assert 9.0 < clamp_timeout(20.0, "plan") <= 10.0
+
+    budget = RunBudget(time_budget=0.01)
+    with budget.activate():
+        time.sleep(0.02)
+        assert clamp_timeout(20.0, "scouting") == 0.0
+        assert budget.stage_remaining("synthesis") == 0.0
+
+
+def test_scouting_deadline_cancels_unfinished_tasks() -> None:
+    budget = RunBudget(time_budget=0.5)
+    pipeline = ResearchPipeline(Analyst(dedup=False), lambda task: HangingScout(), budget=budget)
+
+    started_at = time.monotonic()
+    with budget.activate():
+        result = asyncio.run(pipeline.run(PLAN, mode="batch"))
+
+    assert time.monotonic() - started_at < 5
+    assert result.cut_tasks == ["sites"]
+    assert "time_budget" in budget.limits_hit
+    assert {"stage": "scouting", "item": "sites", "limit": "time_budget"} in budget.skipped
+
+
+def test_download_cap_ends_scouting() -> None:
+    budget = RunBudget(max_bytes=100)
+
+    async def run() -> str:
+        waiting = asyncio.create_task(budget.wait_scouting_limit())
+        budget.charge_bytes(60)
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        budget.charge_bytes(60)
+        return await waiting
+
+    assert asyncio.run(run()) == "max_bytes"
+    assert budget.bytes_used == 120
+
+
+def test_deep_scout_skips_a_visit_past_the_scouting_deadline(tmp_path) -> None:
+    frontier = URLFrontier()
+    scout = DeepSourceScout(str(tmp_path / "no-profile"), frontier=frontier, snapshot_dir=str(tmp_path / "snapshot"))
+    pool = RecordingPool()
+    scout.browser_pool = pool  # type: ignore[assignment]
+    emitted: List[Any] = []
+    budget = RunBudget(time_budget=0.01)
+
+    assert frontier.claim("https://example.com/paper", "t1", source_type="authenticated")
+    with budget.activate():
+        time.sleep(0.02)
+        asyncio.run(scout._visit("https://example.com/paper", emitted.append))
+
+    assert pool.tab.gotos == []
+    assert emitted == []
+    assert {"stage": "scouting", "item": "https://example.com/paper", "limit": "time_budget"} in budget.skipped
+    # The claim was resolved, so another task is not left waiting on it.
+    assert not frontier.claim("https://example.com/paper", "t2", source_type="authenticated")
+
+
+def test_refused_planning_call_falls_back_to_the_default_plan() -> None:
+    models = ScriptedModels(lambda prompt: PLAN.model_dump_json())
+    orchestrator = Orchestrator(model_name="test-model", llm=LLMClient(client=scripted_client(models)))  # type: ignore[arg-type]
+    budget = RunBudget(max_llm_tokens=10)
+
+    with budget.activate():
+        plan = asyncio.run(orchestrator.generate_plan("Tidal power"))
+
+    assert models.prompts == []
+    assert len(plan.sub_tasks) == 2
+    assert "max_llm_tokens" in budget.limits_hit
+    assert {"stage": "plan", "item": "Gemini research plan", "limit": "max_llm_tokens"} in budget.skipped
+
+
+def test_refused_synthesis_call_lists_the_sources() -> None:
+    models = ScriptedModels(lambda prompt: "A report.")
+    synth = Synthesizer(model_name="test-model", llm=LLMClient(client=scripted_client(models)))  # type: ignore[arg-type]
+    finding = ResearchFinding(
+        source_url="https://example.com/tidal", content="Tidal power. " * 200, relevance_score=0.8, key_fact=""
+    )
+    budget = RunBudget(max_llm_tokens=10)
+
+    with budget.activate():
+        report = asyncio.run(synth.generate_report(PLAN, [finding], ReportType.INSTA_EXPERT))
+
+    assert models.prompts == []
+    assert "https://example.com/tidal" in report
+    assert "max_llm_tokens" in report
+    assert {"stage": "synthesis", "item": "report", "limit": "max_llm_tokens"} in budget.skipped
@@ -0,0 +1,144 @@
+"""
+Tests for PageCache: source-type keying, TTL and revalidation, and LRU eviction.
+"""
+import asyncio
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List, Tuple
+
+import pytest
+
+from researcher.cache import PageCache
+from researcher.fetcher import FetchEngine
+from researcher.scout import OpenWebScout
+from researcher.search import Discovery, StaticSearchProvider
+
+
+def blob_count(cache: PageCache) -> int:
+    return len([name for name in os.listdir(os.path.join(cache.cache_dir, "blobs")) if not name.endswith(".tmp")])
+
+
+def test_open_web_entry_is_a_miss_for_an_authenticated_lookup(tmp_path) -> None:
+    cache = PageCache(str(tmp_path))
+    cache.put("https://example.com/a", body=b"<p>stub</p>", text="Subscribe to read", etag='"w1"')
+
+    assert cache.get("https://example.com/a", source_type="authenticated") is None
+    assert cache.get("https://example.com/a/") is not None
+
+    cache.put("https://example.com/a", body=b"<p>full</p>", text="Full article", source_type="authenticated")
+    open_web = cache.get("https://example.com/a")
+    authenticated = cache.get("https://example.com/a", source_type="authenticated")
+    assert cache.read_text(open_web) == "Subscribe to read"
+    assert cache.read_text(authenticated) == "Full article"
+    assert cache.validators(open_web) == {"If-None-Match": '"w1"'}
+    assert cache.validators(authenticated) == {}
+
+
+def test_index_round_trip_keeps_source_types_apart(tmp_path) -> None:
+    cache = PageCache(str(tmp_path))
+    cache.put("https://example.com/a", body=b"stub", text="stub")
+    cache.put("https://example.com/a", body=b"full", text="full", source_type="authenticated")
+    cache.flush()
+
+    reloaded = PageCache(str(tmp_path))
+    assert reloaded.stats()["entries"] == 2
+    assert reloaded.read_text(reloaded.get("https://example.com/a", source_type="authenticated")) == "full"
+    assert reloaded.stats()["bytes"] == cache.stats()["bytes"]
+
+
+def test_stale_entry_is_returned_until_revalidated(tmp_path) -> None:
+    cache = PageCache(str(tmp_path), ttl=60)
+    entry = cache.put("https://example.com/a", body=b"body", text="text", last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    assert cache.is_fresh(entry)
+
+    entry.fetched_at = time.time() - 120
+    stale = cache.get("https://example.com/a")
+    assert stale is not None and not cache.is_fresh(stale)
+    assert cache.validators(stale) == {"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+
+    cache.mark_revalidated(stale)
+    assert cache.is_fresh(stale)
+    assert cache.stats()["stale"] == 1
+    assert cache.stats()["revalidated"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path) -> None:
+    cache = PageCache(str(tmp_path), max_bytes=250)
+    for name in ("a", "b", "c"):
+        cache.put(f"https://example.com/{name}", body=name.encode() * 60, text=name * 20)
+        time.sleep(0.01)
+    cache.get("https://example.com/a")
+    cache.put("https://example.com/d", body=b"d" * 60, text="d" * 20)
+
+    assert cache.get("https://example.com/b") is None
+    assert cache.get("https://example.com/a") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 240
+    assert blob_count(cache) == 6
+
+
+def test_shared_blobs_count_once_and_go_with_their_last_entry(tmp_path) -> None:
+    cache = PageCache(str(tmp_path))
+    cache.put("https://example.com/a", body=b"same page", text="same text")
+    cache.put("https://mirror.example.org/a", body=b"same page", text="same text")
+    assert cache.stats()["bytes"] == len(b"same page") + len(b"same text")
+    assert blob_count(cache) == 2
+
+    # Replacing one copy keeps the blobs the other still uses.
+    cache.put("https://example.com/a", body=b"new page", text="new text")
+    assert blob_count(cache) == 4
+    cache.put("https://mirror.example.org/a", body=b"new page", text="new text")
+    assert blob_count(cache) == 2
+    assert cache.stats()["bytes"] == len(b"new page") + len(b"new text")
+
+
+class RevalidatingHandler(BaseHTTPRequestHandler):
+    """Serves one page with an ETag and answers 304 to a matching If-None-Match."""
+
+    requests: List[Tuple[str, str]] = []
+
+    def do_GET(self) -> None:
+        validator = self.headers.get("If-None-Match") or ""
+        type(self).requests.append((self.path, validator))
+        if validator == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = b"<html><head><title>Page</title></head><body><p>Cached article text.</p></body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[str]:
+    RevalidatingHandler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RevalidatingHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_scout_revalidates_a_stale_page_with_its_etag(tmp_path, server: str) -> None:
+    cache = PageCache(str(tmp_path), ttl=60)
+    scout = OpenWebScout(fetch_engine=FetchEngine(), page_cache=cache, discovery=Discovery(StaticSearchProvider()))
+    result = {"href": f"{server}/article", "title": "Page", "body": ""}
+
+    first = asyncio.run(scout._fetch_finding(result))
+    cache.get(result["href"]).fetched_at = time.time() - 120
+    second = asyncio.run(scout._fetch_finding(result))
+
+    assert first is not None and second is not None
+    assert second.content == first.content
+    assert RevalidatingHandler.requests == [("/article", ""), ("/article", '"v1"')]
+    assert cache.stats()["revalidated"] == 1
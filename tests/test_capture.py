@@ -0,0 +1,50 @@
+"""
+Tests for readiness detection against a scripted stand-in for a Playwright page.
+"""
+import asyncio
+from typing import Any, List, Tuple, Union
+
+from playwright.async_api import Error as PlaywrightError
+
+from researcher.capture import wait_for_readiness
+
+Probe = Union[Tuple[int, int], Exception]
+
+
+class ScriptedPage:
+    """Answers each readiness probe with the next scripted result, repeating the last one."""
+
+    def __init__(self, probes: List[Probe]):
+        self.probes = probes
+        self.calls = 0
+
+    async def evaluate(self, script: str, arg: Any = None) -> Tuple[int, int]:
+        probe = self.probes[min(self.calls, len(self.probes) - 1)]
+        self.calls += 1
+        if isinstance(probe, Exception):
+            raise probe
+        return probe
+
+
+def test_settles_once_body_text_stops_changing() -> None:
+    page = ScriptedPage([(100, 0), (200, 0), (200, 0)])
+    waited = asyncio.run(wait_for_readiness(page, poll_interval=0.01))  # type: ignore[arg-type]
+
+    assert page.calls == 4
+    assert waited < 1
+
+
+def test_keeps_polling_after_a_client_side_redirect() -> None:
+    destroyed = PlaywrightError("Execution context was destroyed, most likely because of a navigation")
+    page = ScriptedPage([(50, 0), destroyed, destroyed, (900, 600)])
+    asyncio.run(wait_for_readiness(page, poll_interval=0.01))  # type: ignore[arg-type]
+
+    assert page.calls == 4
+
+
+def test_gives_up_at_max_wait_if_the_page_keeps_navigating() -> None:
+    page = ScriptedPage([PlaywrightError("Execution context was destroyed")])
+    waited = asyncio.run(wait_for_readiness(page, max_wait=0.1, poll_interval=0.01))  # type: ignore[arg-type]
+
+    assert 0.1 <= waited < 1
+    assert page.calls > 1
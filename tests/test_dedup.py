@@ -0,0 +1,82 @@
+"""
+Tests for MinHash/LSH near-duplicate detection and the Analyst's collapse of syndicated copies.
+"""
+import random
+from typing import List
+
+from researcher.analyst import Analyst
+from researcher.dedup import NearDuplicateIndex, merge_duplicate
+from researcher.models import ResearchFinding
+
+VOCABULARY = (
+    "tidal barrage lagoon turbine estuary grid storage output cost capacity rance severn swansea "
+    "energy power station megawatt annual generation ebb flood sluice basin kilowatt hour"
+).split()
+
+
+def article(seed: int, words: int = 300) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def syndicated(text: str) -> str:
+    """The same story under another outlet's header and footer."""
+    return f"Reprinted by Harbour News. {text} Follow Harbour News for more."
+
+
+def finding(url: str, content: str, score: float, task_id: str) -> ResearchFinding:
+    return ResearchFinding(source_url=url, content=content, relevance_score=score, key_fact="", task_ids=[task_id])
+
+
+def findings() -> List[ResearchFinding]:
+    story = article(1)
+    return [
+        finding("https://wire.example.com/tidal-story", story, 0.7, "sites"),
+        finding("https://harbour.example.org/tidal-story", syndicated(story), 0.6, "cost"),
+        finding("https://other.example.net/lagoon", article(2), 0.6, "sites"),
+    ]
+
+
+def test_near_copies_are_found_and_unrelated_texts_are_not() -> None:
+    index = NearDuplicateIndex()
+    story = article(1)
+    original = finding("https://wire.example.com/a", story, 0.5, "t")
+    index.add(original, index.signature(story))
+
+    assert index.find(index.signature(syndicated(story))) is original
+    assert index.find(index.signature(article(2))) is None
+    assert index.signature("too short") is None
+    assert index.find(None) is None
+
+
+def test_batch_analysis_keeps_the_best_copy_with_the_others_as_alternates() -> None:
+    analyst = Analyst(min_score=0.3)
+    gold = analyst.analyze(findings())
+
+    assert [f.source_url for f in gold] == ["https://wire.example.com/tidal-story", "https://other.example.net/lagoon"]
+    assert gold[0].alternate_urls == ["https://harbour.example.org/tidal-story"]
+    assert gold[0].task_ids == ["sites", "cost"]
+    assert analyst.stats()["duplicates_collapsed"] == 1
+
+
+def test_stream_collapse_does_not_depend_on_arrival_order() -> None:
+    results = []
+    for ordered in (findings(), list(reversed(findings()))):
+        analyst = Analyst(min_score=0.3)
+        new = [f.source_url for f in ordered if analyst.accept(f)]
+        assert len(new) == 2
+        results.append([(f.source_url, f.alternate_urls) for f in analyst.settle()])
+
+    assert results[0] == results[1]
+    assert results[0][0] == ("https://wire.example.com/tidal-story", ["https://harbour.example.org/tidal-story"])
+
+
+def test_merge_carries_over_the_duplicates_own_alternates() -> None:
+    representative = finding("https://a.example.com/x", "text", 0.9, "t1")
+    duplicate = finding("https://b.example.com/x", "text", 0.5, "t2")
+    duplicate.alternate_urls = ["https://c.example.com/x", "https://a.example.com/x"]
+
+    merge_duplicate(representative, duplicate)
+
+    assert representative.alternate_urls == ["https://b.example.com/x", "https://c.example.com/x"]
+    assert representative.task_ids == ["t1", "t2"]
@@ -0,0 +1,140 @@
+"""
+Tests for readability extraction, PDF extraction and the scout's routing of PDFs.
+"""
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pytest
+
+from researcher.extract import ExtractedPage, ExtractionEngine, PdfExtractor, ReadabilityExtractor
+from researcher.fetcher import FetchEngine
+from researcher.scout import OpenWebScout
+from researcher.search import Discovery, StaticSearchProvider
+
+ARTICLE = " ".join(
+    f"Paragraph {i} of the story explains, with figures, how the tidal barrage changed output in the estuary."
+    for i in range(3)
+)
+
+PAGE = f"""<html><head>
+<title>Fallback title</title><meta property="og:title" content="Tidal Barrage Output">
+</head><body>
+<nav><a href="/">Home</a> <a href="/news">News</a> <a href="/sport">Sport</a></nav>
+<div class="share-bar">Share this story on social media, with friends, family and colleagues today.</div>
+<div class="article-body">
+  <h2>How the barrage performs</h2>
+  <p>{ARTICLE}</p>
+  <p>The operator reported that annual generation rose, while maintenance costs fell by a third.</p>
+</div>
+<div id="comments"><p>Great article, thanks, I learned a lot about tides, turbines and estuaries here.</p></div>
+<footer><p>Copyright notice and company registration details for the publisher of this site.</p></footer>
+<script>var tracking = "Paragraph of script text that must never appear in the output, ever.";</script>
+</body></html>"""
+
+
+def make_pdf(lines: List[str], title: Optional[str] = None) -> bytes:
+    """Builds a one-page PDF showing `lines` in Helvetica."""
+    stream = "BT /F1 12 Tf 72 720 Td 14 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    if title:
+        objects.append(f"<< /Title ({title}) >>")
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref_at = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    data += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    info = f" /Info {len(objects)} 0 R" if title else ""
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R{info} >>\nstartxref\n{xref_at}\n%%EOF\n".encode()
+    return data
+
+
+def test_readability_keeps_the_article_and_drops_the_chrome() -> None:
+    page = ReadabilityExtractor().extract(PAGE)
+
+    assert page.title == "Tidal Barrage Output"
+    assert page.text.startswith("How the barrage performs\n\nParagraph 0 of the story")
+    assert "annual generation rose" in page.text
+    for chrome in ("Home", "Share this story", "Great article", "Copyright", "script text"):
+        assert chrome not in page.text
+
+
+def test_readability_honours_the_meta_charset_of_bytes() -> None:
+    html = (
+        '<html><head><meta charset="windows-1252"><title>Caf\xe9</title></head>'
+        f"<body><article><p>Caf\xe9 owners near the barrage, {ARTICLE}</p></article></body></html>"
+    ).encode("windows-1252")
+    page = ReadabilityExtractor().extract(html)
+
+    assert page.title == "Café"
+    assert page.text.startswith("Café owners")
+
+
+def test_pdf_text_and_title_are_extracted() -> None:
+    page = PdfExtractor().extract(make_pdf(["Tidal barrage output", "rose by a third"], title="Tidal Report"))
+    assert page == ExtractedPage(title="Tidal Report", text="Tidal barrage output\nrose by a third")
+
+    untitled = PdfExtractor().extract(make_pdf(["First line is the title", "Body"]))
+    assert untitled.title == "First line is the title"
+
+    assert PdfExtractor().extract(b"%PDF-1.4 truncated").text == ""
+
+
+class DocumentHandler(BaseHTTPRequestHandler):
+    """Serves an HTML page, a PDF, and a PDF mislabelled as a generic download."""
+
+    documents: Dict[str, Tuple[str, bytes]] = {
+        "/page": ("text/html; charset=utf-8", PAGE.encode("utf-8")),
+        "/paper": ("application/pdf", make_pdf(["Barrage paper"], title="Barrage Paper")),
+        "/download": ("application/octet-stream", make_pdf(["Lagoon study"], title="Lagoon Study")),
+    }
+
+    def do_GET(self) -> None:
+        content_type, body = self.documents[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[str]:
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), DocumentHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_scout_routes_pdfs_to_the_pdf_extractor(server: str) -> None:
+    engine = ExtractionEngine(workers=0)
+    fetch_engine = FetchEngine()
+    scout = OpenWebScout(fetch_engine=fetch_engine, extraction_engine=engine, discovery=Discovery(StaticSearchProvider()))
+
+    async def fetch(path: str) -> str:
+        finding = await scout._fetch_finding({"href": f"{server}{path}", "title": "Result", "body": ""})
+        assert finding is not None
+        return finding.content
+
+    try:
+        assert asyncio.run(fetch("/paper")) == "Title: Barrage Paper\n\nBarrage paper"
+        assert asyncio.run(fetch("/download")) == "Title: Lagoon Study\n\nLagoon study"
+        assert asyncio.run(fetch("/page")).startswith("Title: Tidal Barrage Output\n\nHow the barrage performs")
+    finally:
+        fetch_engine.close()
+    assert engine.stats()["pdfs"] == 2
+    assert engine.stats()["pages"] == 1
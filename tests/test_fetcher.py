@@ -0,0 +1,199 @@
+"""
+Tests for FetchEngine against local HTTP servers: concurrency limits, byte caps,
+content sniffing and charset decoding.
+"""
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List
+
+import pytest
+
+from researcher.fetcher import FetchEngine, decode_body, sniff_kind
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Answers after a short delay, counting concurrent requests per server port (key 0: all servers)."""
+
+    lock = threading.Lock()
+    active: Dict[int, int] = defaultdict(int)
+    peak: Dict[int, int] = defaultdict(int)
+
+    def do_GET(self) -> None:
+        port = self.server.server_address[1]
+        with self.lock:
+            for key in (port, 0):
+                self.active[key] += 1
+                self.peak[key] = max(self.peak[key], self.active[key])
+        time.sleep(0.1)
+        with self.lock:
+            for key in (port, 0):
+                self.active[key] -= 1
+        body = b"<html><body><p>ok</p></body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def hosts() -> Iterator[List[str]]:
+    SlowHandler.active.clear()
+    SlowHandler.peak.clear()
+    servers = [ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler) for _ in range(2)]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield [f"http://127.0.0.1:{server.server_address[1]}" for server in servers]
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def fetch_all(engine: FetchEngine, urls: List[str]) -> None:
+    async def run() -> None:
+        results = await asyncio.gather(*(engine.get(url) for url in urls))
+        assert all(result.status_code == 200 for result in results)
+
+    try:
+        asyncio.run(run())
+    finally:
+        engine.close()
+
+
+def test_per_host_limit_caps_each_host_separately(hosts: List[str]) -> None:
+    engine = FetchEngine(max_connections=8, per_host_limit=2)
+    fetch_all(engine, [f"{host}/page/{i}" for host in hosts for i in range(6)])
+
+    assert [SlowHandler.peak[int(host.rsplit(":", 1)[1])] for host in hosts] == [2, 2]
+    # A busy host does not hold global slots it cannot use: both hosts ran side by side.
+    assert SlowHandler.peak[0] == 4
+    assert engine.stats()["peak_concurrency"] == 4
+    assert engine.stats()["hosts"] == 2
+
+
+def test_global_limit_caps_all_hosts_together(hosts: List[str]) -> None:
+    engine = FetchEngine(max_connections=3, per_host_limit=4)
+    fetch_all(engine, [f"{host}/page/{i}" for host in hosts for i in range(4)])
+
+    stats = engine.stats()
+    assert stats["peak_concurrency"] == 3
+    assert SlowHandler.peak[0] == 3
+    assert stats["fetches"] == 8 and stats["failures"] == 0
+
+
+def test_blocking_calls_share_the_global_limit() -> None:
+    engine = FetchEngine(max_connections=2)
+    lock = threading.Lock()
+    active = [0, 0]
+
+    def work() -> None:
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    async def run() -> None:
+        await asyncio.gather(*(engine.run_blocking(work) for _ in range(6)))
+
+    try:
+        asyncio.run(run())
+    finally:
+        engine.close()
+    assert active[1] == 2
+
+
+class BodyHandler(BaseHTTPRequestHandler):
+    """Serves canned bodies with the given (possibly wrong or missing) Content-Type."""
+
+    bodies: Dict[str, Any] = {
+        "/big.html": ("text/html", b"<html><body>" + b"<p>tide</p>" * 20_000 + b"</body></html>"),
+        "/big.pdf": ("application/pdf", b"%PDF-1.4\n" + b"0" * 200_000),
+        "/video": ("video/mp4", b"\x00\x00\x00\x18ftypmp42" + b"\x00" * 500_000),
+        "/untyped": ("", b"<!DOCTYPE html><html><body><p>No type</p></body></html>"),
+        "/latin1": ("text/html; charset=iso-8859-1", "<p>Caf\xe9 cr\xe8me</p>".encode("iso-8859-1")),
+    }
+
+    def do_GET(self) -> None:
+        content_type, body = self.bodies[self.path]
+        self.send_response(200)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def body_server() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BodyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_downloads_stop_at_the_byte_caps(body_server: str) -> None:
+    engine = FetchEngine(max_bytes=100_000, max_pdf_bytes=150_000)
+
+    async def run() -> List[Any]:
+        return list(await asyncio.gather(*(engine.get(f"{body_server}{path}") for path in ("/big.html", "/big.pdf", "/video"))))
+
+    try:
+        html, pdf, video = asyncio.run(run())
+    finally:
+        engine.close()
+
+    assert html.kind == "html" and html.truncated and len(html.content) == 100_000
+    assert pdf.kind == "pdf" and pdf.truncated and len(pdf.content) == 150_000
+    # Binary bodies are abandoned after the first chunk and never kept.
+    assert video.kind == "binary" and video.content == b"" and video.bytes_read < 100_000
+    assert engine.stats()["truncated"] == 2
+
+
+def test_untyped_and_labelled_bodies_are_sniffed_and_decoded(body_server: str) -> None:
+    engine = FetchEngine()
+
+    async def run() -> List[Any]:
+        return list(await asyncio.gather(*(engine.get(f"{body_server}{path}") for path in ("/untyped", "/latin1"))))
+
+    try:
+        untyped, latin1 = asyncio.run(run())
+    finally:
+        engine.close()
+
+    assert untyped.kind == "html" and "No type" in untyped.text
+    assert latin1.text == "<p>Café crème</p>" and latin1.encoding == "iso-8859-1"
+
+
+def test_sniff_kind_trusts_the_bytes_over_the_header() -> None:
+    assert sniff_kind("application/octet-stream", b"%PDF-1.7\n") == "pdf"
+    assert sniff_kind("text/plain", b"  <!doctype html><html>") == "html"
+    assert sniff_kind("text/plain", b"plain notes") == "text"
+    assert sniff_kind("application/json", b'{"a": 1}') == "text"
+    assert sniff_kind("", b"\x89PNG\r\n\x1a\n\x00\x00") == "binary"
+    assert sniff_kind("", b"<p>fragment</p>") == "html"
+    assert sniff_kind("image/png", b"\x89PNG") == "binary"
+
+
+def test_decode_body_picks_the_charset_from_header_bom_or_meta() -> None:
+    text = "Café crème"
+    assert decode_body(text.encode("cp1252"), "text/html; charset=windows-1252") == (text, "windows-1252")
+    assert decode_body(b"\xef\xbb\xbf" + text.encode("utf-8"), "text/html") == (text, "utf-8-sig")
+    meta = f'<meta charset="iso-8859-1"><p>{text}</p>'
+    assert decode_body(meta.encode("iso-8859-1"), "text/html") == (meta, "iso-8859-1")
+    # An unknown declared charset is skipped rather than trusted.
+    assert decode_body(text.encode("utf-8"), "text/html; charset=x-bogus") == (text, "utf-8")
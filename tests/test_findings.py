@@ -0,0 +1,78 @@
+"""
+Tests for the findings spill file and its StoredFinding handles.
+"""
+import os
+
+import pytest
+
+from researcher.findings import ContentView, FindingsStore
+from researcher.models import ResearchFinding
+
+TEXTS = [
+    "Tidal barrage output rose by a third. " * 200,
+    "Café owners near the lagoon, ünïcödé and emoji 🌊 included.",
+    "",
+]
+
+
+def finding(i: int, content: str) -> ResearchFinding:
+    return ResearchFinding(
+        source_url=f"https://example.com/{i}",
+        content=content,
+        relevance_score=0.5 + i / 10,
+        key_fact=f"fact {i}",
+        task_ids=["sites"],
+        alternate_urls=[f"https://mirror.example.com/{i}"],
+    )
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_findings_round_trip_through_the_spill_file(tmp_path, compress: bool) -> None:
+    store = FindingsStore(directory=str(tmp_path), compress=compress)
+    try:
+        handles = [store.add(finding(i, text)) for i, text in enumerate(TEXTS)]
+
+        for i, (handle, text) in enumerate(zip(handles, TEXTS)):
+            assert handle.content == text
+            assert handle.content_chars == len(text)
+            assert handle.source_url == f"https://example.com/{i}"
+            assert handle.key_fact == f"fact {i}"
+            assert handle.alternate_urls == [f"https://mirror.example.com/{i}"]
+        assert list(ContentView(handles)) == TEXTS
+        assert ContentView(handles)[1:] == TEXTS[1:]
+
+        stats = store.stats()
+        assert stats["findings"] == 3 and stats["compressed"] is compress
+        if compress:
+            # The repetitive first text shrinks well below its size.
+            assert stats["bytes_on_disk"] < len(TEXTS[0]) // 4
+        else:
+            assert stats["bytes_on_disk"] == sum(len(text.encode("utf-8")) for text in TEXTS)
+    finally:
+        store.close()
+
+
+def test_assigning_content_appends_a_new_record(tmp_path) -> None:
+    store = FindingsStore(path=str(tmp_path / "findings.bin"), compress=True)
+    try:
+        handle = store.add(finding(0, TEXTS[0]))
+        other = store.add(finding(1, TEXTS[1]))
+        handle.content = "Rewritten summary."
+
+        assert handle.content == "Rewritten summary."
+        assert handle.content_chars == len("Rewritten summary.")
+        assert other.content == TEXTS[1]
+    finally:
+        store.close()
+    # A named spill file is kept; only a temporary one is removed.
+    assert os.path.exists(tmp_path / "findings.bin")
+
+
+def test_temporary_spill_file_is_removed_on_close(tmp_path) -> None:
+    store = FindingsStore(directory=str(tmp_path))
+    handle = store.add(finding(0, "text"))
+    store.close()
+
+    assert not os.path.exists(store.path)
+    with pytest.raises(ValueError):
+        handle.content
@@ -0,0 +1,81 @@
+"""
+Tests for the run-wide URL frontier.
+"""
+from researcher.findings import FindingsStore, StoredFinding
+from researcher.frontier import URLFrontier
+from researcher.models import ResearchFinding
+
+
+def make_finding(url: str) -> ResearchFinding:
+    return ResearchFinding(source_url=url, content="text", relevance_score=0.8, key_fact="fact")
+
+
+def test_first_claim_fetches_and_later_claims_are_referrers() -> None:
+    frontier = URLFrontier()
+    assert frontier.claim("https://example.com/a", "t1")
+    assert not frontier.claim("https://www.example.com/a/", "t2")
+
+    finding = make_finding("https://example.com/a")
+    frontier.resolve("https://example.com/a", finding)
+    assert not frontier.claim("https://example.com/a?utm_source=x", "t3")
+
+    assert finding.task_ids == ["t1", "t2", "t3"]
+    assert frontier.stats()["duplicate_claims"] == 2
+
+
+def test_redirect_target_is_deduplicated() -> None:
+    frontier = URLFrontier()
+    frontier.claim("https://example.com/short", "t1")
+    frontier.resolve("https://example.com/short", make_finding("https://example.com/long-article"))
+
+    assert not frontier.claim("https://example.com/long-article", "t2")
+    assert frontier.references("https://example.com/short") == ["t1", "t2"]
+
+
+def test_authenticated_claim_is_independent_of_open_web_claim() -> None:
+    frontier = URLFrontier()
+    assert frontier.claim("https://paper.example.com/story", "open")
+    frontier.resolve("https://paper.example.com/story", make_finding("https://paper.example.com/story"))
+
+    assert frontier.claim("https://paper.example.com/story", "deep", source_type="authenticated")
+    assert not frontier.claim("https://paper.example.com/story", "deep2", source_type="authenticated")
+    assert frontier.references("https://paper.example.com/story") == ["open"]
+    assert frontier.references("https://paper.example.com/story", source_type="authenticated") == ["deep", "deep2"]
+
+
+def test_release_hands_an_unfetched_url_to_the_next_claim() -> None:
+    frontier = URLFrontier()
+    frontier.claim("https://example.com/a", "t1")
+    assert not frontier.claim("https://example.com/a", "t2")
+
+    frontier.release("https://example.com/a")
+    assert frontier.claim("https://example.com/a", "t3")
+    assert not frontier.claim("https://example.com/a", "t4")
+    assert frontier.references("https://example.com/a") == ["t1", "t2", "t3", "t4"]
+
+
+def test_release_after_resolve_is_ignored() -> None:
+    frontier = URLFrontier()
+    frontier.claim("https://example.com/a", "t1")
+    frontier.resolve("https://example.com/a", None)
+    frontier.release("https://example.com/a")
+
+    assert not frontier.claim("https://example.com/a", "t2")
+    assert frontier.stats()["released_claims"] == 0
+
+
+def test_spilled_finding_receives_later_referrers(tmp_path) -> None:
+    store = FindingsStore(directory=str(tmp_path))
+    try:
+        frontier = URLFrontier(store=store)
+        frontier.claim("https://example.com/a", "t1")
+        handle = frontier.resolve("https://example.com/a", make_finding("https://example.com/a"))
+        assert not frontier.claim("https://example.com/a", "t2")
+
+        assert isinstance(handle, StoredFinding)
+        assert handle.task_ids == ["t1", "t2"]
+        assert handle.content == "text"
+        # The frontier keeps the small handle, not the finding with its content.
+        assert all(not isinstance(entry.finding, ResearchFinding) for entry in frontier._entries.values())
+    finally:
+        store.close()
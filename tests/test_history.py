@@ -0,0 +1,37 @@
+"""
+Tests for the run history's page store.
+"""
+import asyncio
+
+from researcher.history import HistoryStore
+
+
+def test_pages_are_served_only_to_the_same_source_type(tmp_path) -> None:
+    store = HistoryStore(str(tmp_path / "history.sqlite"))
+    try:
+        store.record_page("https://paper.example.com/story", "https://paper.example.com/story", "Teaser", "Subscribe to read")
+        assert store.fresh_page("https://paper.example.com/story", source_type="authenticated") is None
+
+        store.record_page("https://paper.example.com/story", "https://paper.example.com/story", "Story", "Full text", source_type="authenticated")
+        assert store.fresh_page("https://paper.example.com/story", source_type="authenticated").content == "Full text"
+        assert store.fresh_page("https://paper.example.com/story").content == "Subscribe to read"
+    finally:
+        store.close()
+
+
+def test_pages_can_be_recorded_from_a_worker_thread(tmp_path) -> None:
+    store = HistoryStore(str(tmp_path / "history.sqlite"))
+
+    async def record() -> None:
+        await asyncio.gather(*(
+            asyncio.to_thread(store.record_page, f"https://example.com/{i}", f"https://example.com/{i}", "Page", f"text {i}")
+            for i in range(8)
+        ))
+
+    try:
+        asyncio.run(record())
+        assert store.fresh_page("https://example.com/7").content == "text 7"
+        assert store.stats()["pages_recorded"] == 8
+    finally:
+        store.close()
+
@@ -0,0 +1,90 @@
+"""
+Tests for the context packer: the token budget, the per-source guarantee and passage dedup.
+"""
+import random
+from typing import List
+
+from researcher.models import ResearchFinding, ResearchPlan, ResearchTask
+from researcher.packer import ContextPacker, estimate_tokens, fit_texts, split_passages
+
+PLAN = ResearchPlan(
+    topic="Tidal power",
+    key_questions=["What does tidal power cost?", "Where are tidal barrages built?"],
+    sub_tasks=[ResearchTask(id="cost", description="Tidal power cost", queries=["tidal power cost per megawatt hour"])],
+)
+
+QUOTE = "The minister said the barrage would be built within a decade and would power half a million homes in the region."
+
+
+VOCABULARY = (
+    "tidal power cost megawatt hour barrage lagoon estuary turbine capacity grid price built "
+    "severn rance swansea sluice basin generation annual output storage subsidy contract"
+).split()
+
+
+def paragraph(seed: int, words: int = 30) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words)) + "."
+
+
+def findings() -> List[ResearchFinding]:
+    # One long, very relevant source and several short, weaker ones.
+    long_source = ResearchFinding(
+        source_url="https://long.example.com/report",
+        content="\n\n".join(paragraph(i, words=120) for i in range(40)),
+        relevance_score=0.9,
+        key_fact="",
+        task_ids=["cost"],
+    )
+    short_sources = [
+        ResearchFinding(
+            source_url=f"https://short{i}.example.com/news",
+            content=f"{paragraph(100 + i)}\n\n{QUOTE}",
+            relevance_score=0.4,
+            key_fact="",
+            task_ids=["cost"],
+        )
+        for i in range(5)
+    ]
+    return [long_source, *short_sources]
+
+
+def test_packed_context_fits_the_budget() -> None:
+    packed = ContextPacker(PLAN, token_budget=1500, passage_chars=200).pack(findings())
+
+    assert packed.tokens <= 1500
+    assert packed.passages_kept < packed.passages_total
+    assert packed.passages_dropped == packed.passages_total - packed.passages_kept
+
+
+def test_every_source_keeps_a_passage_under_a_tight_budget() -> None:
+    packed = ContextPacker(PLAN, token_budget=1500, passage_chars=200).pack(findings())
+
+    assert packed.sources == 6
+    for finding in findings():
+        assert f"Source: {finding.source_url}" in packed.text
+
+
+def test_a_passage_quoted_by_several_sources_is_kept_once() -> None:
+    packed = ContextPacker(PLAN, token_budget=100_000, passage_chars=200).pack(findings())
+
+    assert packed.text.count("The minister said") == 1
+    assert packed.passages_duplicate == 4
+
+
+def test_passages_are_split_near_the_target_length() -> None:
+    text = "\n\n".join(f"Paragraph {i}. " + "word " * 60 for i in range(10))
+    passages = split_passages(text, target_chars=400)
+
+    assert len(passages) > 1
+    assert all(len(passage) <= 800 for passage in passages)
+    assert " ".join(passages).split() == text.split()
+
+
+def test_fit_texts_shares_the_budget_and_keeps_short_texts_whole() -> None:
+    short, long_a, long_b = "short note", "a" * 4000, "b\n" * 2000
+    fitted, trimmed = fit_texts([short, long_a, long_b], token_budget=500)
+
+    assert fitted[0] == short
+    assert trimmed == 2
+    assert sum(estimate_tokens(text) for text in fitted) <= 500 + 2 * estimate_tokens("\n[...]")
@@ -0,0 +1,51 @@
+import asyncio
+
+from google.genai import errors
+
+from researcher.ratelimit import RateController
+
+
+def throttled_error() -> errors.ClientError:
+    return errors.ClientError(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "message": "quota"}})
+
+
+def fast_controller(**kwargs) -> RateController:
+    return RateController(requests_per_minute=60_000, base_delay=0.01, max_delay=0.05, **kwargs)
+
+
+def test_throttled_calls_are_retried_without_opening_the_breaker():
+    controller = fast_controller(breaker_threshold=5)
+    attempts = {}
+
+    async def call(index: int) -> int:
+        async def once() -> int:
+            attempts[index] = attempts.get(index, 0) + 1
+            if attempts[index] == 1:
+                raise throttled_error()
+            return index
+
+        return await controller.call("model", 10, once)
+
+    async def main():
+        return await asyncio.gather(*(call(i) for i in range(8)))
+
+    assert asyncio.run(main()) == list(range(8))
+    assert controller.breaker.opens == 0
+    assert controller.throttled == 8
+
+
+def test_retrying_call_waits_out_an_open_breaker():
+    controller = fast_controller(breaker_threshold=1, breaker_cooldown=0.2)
+    attempts = 0
+
+    async def flaky() -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise ConnectionError("reset")
+        return "ok"
+
+    assert asyncio.run(controller.call("model", 10, flaky)) == "ok"
+    assert attempts == 2
+    assert controller.breaker.opens == 1
+    assert controller.breaker.state == "closed"
@@ -0,0 +1,70 @@
+"""
+Tests for BM25 relevance scoring.
+"""
+import random
+from typing import List
+
+import numpy as np
+
+from researcher.analyst import Analyst
+from researcher.models import ResearchFinding, ResearchPlan, ResearchTask
+from researcher.relevance import RelevanceEngine
+
+PLAN = ResearchPlan(
+    topic="Home batteries in Australia",
+    key_questions=[
+        "What do home batteries cost in Australia?",
+        "How do rebates change battery payback periods?",
+    ],
+    sub_tasks=[
+        ResearchTask(id="cost", description="Battery prices", queries=["home battery price Australia"]),
+        ResearchTask(id="rebates", description="State rebates", queries=["battery rebate payback Australia"]),
+    ],
+)
+
+
+def corpus() -> List[str]:
+    texts = [
+        "Home batteries in Australia cost between 8000 and 15000 dollars installed.",
+        "Rebates cut the payback period of a home battery to under eight years.",
+        "A recipe for lemon tart with a crisp pastry base.",
+    ]
+    # Many similar pages, which would have shifted corpus-based IDF.
+    texts += [f"Battery price report {i}: home battery costs in Australia keep falling." for i in range(20)]
+    return texts
+
+
+def test_scores_do_not_depend_on_arrival_order() -> None:
+    texts = corpus()
+    expected = RelevanceEngine(PLAN).score(texts)
+
+    order = list(range(len(texts)))
+    random.Random(7).shuffle(order)
+    shuffled = RelevanceEngine(PLAN).score([texts[i] for i in order])
+    np.testing.assert_allclose(shuffled, expected[order])
+
+    # One at a time, as the streaming pipeline scores them.
+    engine = RelevanceEngine(PLAN)
+    streamed = np.vstack([engine.score([text]) for text in reversed(texts)])
+    np.testing.assert_allclose(streamed, expected[::-1])
+
+
+def test_relevant_pages_outscore_unrelated_ones() -> None:
+    relevance, best_question = RelevanceEngine(PLAN).relevance(corpus()[:3], [["cost"], ["rebates"], ["cost"]])
+
+    assert relevance[0] > relevance[2] and relevance[1] > relevance[2]
+    assert list(best_question[:2]) == [0, 1]
+    assert np.all((relevance >= 0) & (relevance < 1))
+
+
+def test_analyst_accepts_the_same_findings_in_any_order() -> None:
+    def findings() -> List[ResearchFinding]:
+        return [
+            ResearchFinding(source_url=f"https://example.com/{i}/page", content=text, relevance_score=0.5, key_fact="", task_ids=["cost"])
+            for i, text in enumerate(corpus())
+        ]
+
+    forward_analyst, backward_analyst = Analyst(PLAN, dedup=False), Analyst(PLAN, dedup=False)
+    forward = [forward_analyst.score(f) for f in findings()]
+    backward = [backward_analyst.score(f) for f in reversed(findings())]
+    assert forward == backward[::-1]
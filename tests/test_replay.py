@@ -0,0 +1,140 @@
+"""
+Record -> replay round trip of a whole research run, offline.
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator, List, Optional
+
+import pytest
+
+from conftest import ScriptedModels, scripted_client
+from researcher.cli import build_parser
+from researcher.runner import ResearchSession, TopicRun
+from researcher.search import StaticSearchProvider
+
+PLAN = {
+    "topic": "grid batteries",
+    "key_questions": ["How long do grid batteries last?", "What do grid batteries cost?"],
+    "estimated_tokens": 0,
+    "sub_tasks": [
+        {"id": "task_1", "description": "Battery lifetime", "queries": ["grid battery lifetime"], "source_type": "open_web"},
+        {"id": "task_2", "description": "Battery cost", "queries": ["grid battery cost"], "source_type": "open_web"},
+    ],
+}
+
+
+class CorpusHandler(BaseHTTPRequestHandler):
+    """Serves a small deterministic article per path, after a random delay; '/3' pages are missing."""
+
+    requests: List[str] = []
+
+    def do_GET(self) -> None:
+        CorpusHandler.requests.append(self.path)
+        time.sleep(random.uniform(0, 0.05))
+        if self.path.endswith("/3"):
+            self.send_error(404)
+            return
+        words = self.path.strip("/").replace("-", " ").replace("/", " ")
+        paragraphs = "".join(f"<p>Grid batteries: {words} paragraph {i}, lifetime and cost figures.</p>" for i in range(8))
+        body = f"<html><head><title>{words}</title></head><body><article>{paragraphs}</article></body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def corpus_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CorpusHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    CorpusHandler.requests = []
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def respond(prompt: str) -> str:
+    if "Research Orchestrator" in prompt:
+        return json.dumps(PLAN)
+    # The report echoes how much context it was given, so a changed prompt changes the report.
+    return f"# Grid batteries\n\nWritten from a {len(prompt)}-character prompt."
+
+
+def run_once(tmp_path: Any, corpus_url: str, extra: List[str], client: Optional[Any]) -> str:
+    args = build_parser().parse_args([
+        "--cache-dir", str(tmp_path / "cache"),
+        "--extract-workers", "0",
+        "--min-score", "0",
+        "--open-limit", "3",
+        *extra,
+    ])
+    search = StaticSearchProvider(base_url=corpus_url)
+
+    async def run() -> TopicRun:
+        session = ResearchSession(
+            args,
+            runs_root=str(tmp_path / "runs"),
+            search_provider=search,
+            genai_client=client,
+            latest_path=str(tmp_path / "final_report.md"),
+        )
+        try:
+            return await session.run_topic("grid batteries", mirror_report=False)
+        finally:
+            await session.close()
+
+    topic_run = asyncio.run(run())
+    with open(tmp_path / "runs" / topic_run.run_id / "final_report.md", encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("mode", ["stream", "batch"])
+def test_recorded_run_replays_offline_with_the_same_report(tmp_path: Any, corpus_url: str, mode: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+
+    recorded = run_once(tmp_path, corpus_url, ["--mode", mode], scripted_client(ScriptedModels(respond)))
+    fetched = len(CorpusHandler.requests)
+    assert fetched == 6 and "Written from a" in recorded
+
+    # No client at all: every response must come from the recording, and no page from the server.
+    replayed = run_once(tmp_path, corpus_url, ["--mode", mode, "--replay"], client=None)
+    assert replayed == recorded
+    assert len(CorpusHandler.requests) == fetched
+
+
+def test_failed_batch_topic_keeps_its_run_directory(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    args = build_parser().parse_args(["--cache-dir", str(tmp_path / "cache"), "--extract-workers", "0", "--replay"])
+
+    async def run() -> List[TopicRun]:
+        session = ResearchSession(
+            args,
+            runs_root=str(tmp_path / "runs"),
+            search_provider=StaticSearchProvider(),
+            genai_client=None,
+            latest_path=str(tmp_path / "final_report.md"),
+        )
+        try:
+            # Nothing was recorded, so planning misses the replay cache and the topic fails.
+            return await session.run_batch(["never recorded"])
+        finally:
+            await session.close()
+
+    [failed] = asyncio.run(run())
+
+    assert failed.error
+    assert failed.run_id.endswith("never_recorded")
+    assert (tmp_path / "runs" / failed.run_id / "trace.json").is_file()
@@ -0,0 +1,70 @@
+"""
+Tests for OpenWebScout's use of the URL frontier, with page fetches stubbed out.
+"""
+import asyncio
+from typing import Dict, List, Optional
+
+from researcher.frontier import URLFrontier
+from researcher.models import ResearchFinding, ResearchTask
+from researcher.scout import OpenWebScout
+from researcher.search import Discovery, StaticSearchProvider
+
+
+class SlowPageScout(OpenWebScout):
+    """OpenWebScout whose page fetches just wait, then succeed."""
+
+    def __init__(self, delay: float, frontier: URLFrontier):
+        super().__init__(num_results=2, discovery=Discovery(StaticSearchProvider()), frontier=frontier)
+        self.delay = delay
+        self.fetched: List[str] = []
+
+    async def _fetch_finding(self, result: Dict[str, str]) -> Optional[ResearchFinding]:
+        await asyncio.sleep(self.delay)
+        self.fetched.append(result["href"])
+        return self._make_finding(result["href"], result["title"], "body text", result)
+
+
+def test_cancelled_task_releases_its_claims_to_the_next_task() -> None:
+    frontier = URLFrontier()
+    task = ResearchTask(id="t1", description="first", queries=["shared query"])
+    retry = ResearchTask(id="t2", description="second", queries=["shared query"])
+
+    async def run() -> List[ResearchFinding]:
+        slow = SlowPageScout(delay=10, frontier=frontier)
+        gathering = asyncio.create_task(slow.gather(task))
+        await asyncio.sleep(0.05)
+        gathering.cancel()
+        await asyncio.gather(gathering, return_exceptions=True)
+        return await SlowPageScout(delay=0, frontier=frontier).gather(retry)
+
+    findings = asyncio.run(run())
+
+    assert len(findings) == 2
+    assert all(finding.task_ids == ["t1", "t2"] for finding in findings)
+    assert frontier.stats()["released_claims"] == 2
+
+
+def test_finished_claims_are_not_refetched() -> None:
+    frontier = URLFrontier()
+    first = SlowPageScout(delay=0, frontier=frontier)
+    second = SlowPageScout(delay=0, frontier=frontier)
+
+    asyncio.run(first.gather(ResearchTask(id="t1", description="a", queries=["q"])))
+    asyncio.run(second.gather(ResearchTask(id="t2", description="b", queries=["q"])))
+
+    assert len(first.fetched) == 2
+    assert second.fetched == []
+
+
+def test_malformed_result_url_is_skipped() -> None:
+    provider = StaticSearchProvider(results={"q": [
+        {"title": "Bad port", "href": "http://example.com:99999/a", "body": ""},
+        {"title": "Good", "href": "http://example.com/b", "body": ""},
+    ]})
+    scout = SlowPageScout(delay=0, frontier=URLFrontier())
+    scout.discovery = Discovery(provider)
+
+    findings = asyncio.run(scout.gather(ResearchTask(id="t1", description="a", queries=["q"])))
+
+    assert scout.fetched == ["http://example.com/b"]
+    assert [finding.source_url for finding in findings] == ["http://example.com/b"]
@@ -0,0 +1,125 @@
+"""
+Tests for the discovery layer, run offline against StaticSearchProvider.
+"""
+import asyncio
+import time
+from typing import Any, List
+
+import pytest
+
+from researcher import search
+from researcher.search import Discovery, SearchCache, SearchProvider, SearchResult, StaticSearchProvider, normalize_query
+
+
+class FailingProvider(SearchProvider):
+    """A backend whose every call fails after an optional delay."""
+
+    name = "failing"
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    def search(self, query: str, max_results: int) -> List[SearchResult]:
+        time.sleep(self.delay)
+        raise ConnectionError(f"backend down for {query}")
+
+
+def test_cache_serves_results_until_ttl_expires(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = SearchCache(str(tmp_path), ttl=60)
+    results = [{"title": "t", "href": "http://example.com/", "body": "b"}]
+    cache.put("static", "solar sails", 3, results)
+
+    assert cache.get("static", "solar sails", 3) == results
+    assert cache.get("static", "solar sails", 5) is None
+    assert cache.get("other", "solar sails", 3) is None
+
+    now = time.time()
+    monkeypatch.setattr(search.time, "time", lambda: now + 61)
+    assert cache.get("static", "solar sails", 3) is None
+
+
+def test_discovery_uses_cache_before_provider(tmp_path: Any) -> None:
+    provider = StaticSearchProvider()
+    discovery = Discovery(provider, cache=SearchCache(str(tmp_path)))
+
+    first = asyncio.run(discovery.search("fusion power", 2))
+    second = asyncio.run(discovery.search("fusion power", 2))
+
+    assert first == second
+    assert provider.calls == 1
+    assert discovery.cache_hits == 1
+
+
+def test_concurrent_identical_queries_are_coalesced() -> None:
+    provider = StaticSearchProvider(latency=0.1)
+    discovery = Discovery(provider)
+
+    async def run() -> List[List[SearchResult]]:
+        return await asyncio.gather(*(discovery.search("fusion power", 2) for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert all(result == results[0] for result in results)
+    assert provider.calls == 1
+    assert discovery.coalesced == 4
+
+
+def test_cache_and_coalescing_share_one_normalisation(tmp_path: Any) -> None:
+    provider = StaticSearchProvider(latency=0.1)
+    discovery = Discovery(provider, cache=SearchCache(str(tmp_path)))
+
+    async def run() -> None:
+        await asyncio.gather(discovery.search("fusion  power ", 2), discovery.search("fusion power", 2))
+
+    asyncio.run(run())
+    assert provider.calls == 1
+    assert discovery.coalesced == 1
+
+    # Whitespace variants hit the cache; a case variant is a different query.
+    asyncio.run(discovery.search(" fusion power", 2))
+    assert discovery.cache_hits == 1
+    asyncio.run(discovery.search("Fusion Power", 2))
+    assert provider.calls == 2
+    assert normalize_query("  a \t b ") == "a b"
+
+
+def test_slow_primary_is_hedged_and_backup_wins() -> None:
+    primary = StaticSearchProvider(latency=lambda query: 0.5 if query == "slow" else 0.01)
+    backup = StaticSearchProvider(base_url="http://backup.test/")
+    discovery = Discovery(primary, hedge_percentile=95, backup_provider=backup, min_samples=3)
+
+    async def run() -> List[SearchResult]:
+        for i in range(3):
+            await discovery.search(f"warm {i}", 1)
+        return await discovery.search("slow", 1)
+
+    results = asyncio.run(run())
+
+    assert results[0]["href"].startswith("http://backup.test/")
+    assert discovery.hedged == 1
+    assert discovery.hedge_wins == 1
+
+
+def test_hedging_waits_for_minimum_samples() -> None:
+    primary = StaticSearchProvider(latency=0.05)
+    backup = StaticSearchProvider(base_url="http://backup.test/")
+    discovery = Discovery(primary, hedge_percentile=50, backup_provider=backup, min_samples=5)
+
+    results = asyncio.run(discovery.search("anything", 1))
+
+    assert results[0]["href"].startswith(primary.base_url)
+    assert discovery.hedged == 0
+
+
+def test_hedged_search_raises_when_every_attempt_fails() -> None:
+    primary = StaticSearchProvider(latency=0.01)
+    discovery = Discovery(primary, hedge_percentile=50, backup_provider=FailingProvider(), min_samples=2)
+
+    async def run() -> None:
+        for i in range(2):
+            await discovery.search(f"warm {i}", 1)
+        discovery.provider = FailingProvider(delay=0.2)
+        await discovery.search("down", 1)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(run())
@@ -0,0 +1,58 @@
+"""
+Tests for incremental profile snapshots.
+"""
+import os
+import stat
+import sys
+from typing import Any
+
+import pytest
+
+from researcher.snapshot import ProfileSnapshotManager
+
+
+def make_profile(root: Any) -> str:
+    profile = root / "Default"
+    (profile / "Network").mkdir(parents=True)
+    (profile / "Network" / "Cookies").write_bytes(b"session-cookie")
+    (profile / "Login Data").write_bytes(b"saved-login")
+    (profile / "History").write_bytes(b"not copied")
+    (root / "Local State").write_text("{}")
+    return str(profile)
+
+
+def test_only_allow_listed_files_are_copied_and_unchanged_files_are_reused(tmp_path: Any) -> None:
+    profile = make_profile(tmp_path)
+    snapshots = ProfileSnapshotManager(profile, snapshot_dir=str(tmp_path / "snapshot"))
+
+    first = snapshots.refresh()
+    assert first.files_copied == 3
+    assert not os.path.exists(tmp_path / "snapshot" / "History")
+    assert (tmp_path / "snapshot" / "Local State").exists()
+
+    second = snapshots.refresh()
+    assert (second.files_copied, second.files_unchanged) == (0, 3)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX permission bits")
+def test_snapshot_is_private_to_the_owner(tmp_path: Any) -> None:
+    previous_umask = os.umask(0o022)
+    try:
+        snapshots = ProfileSnapshotManager(make_profile(tmp_path), snapshot_dir=str(tmp_path / "snapshot"))
+        snapshots.refresh()
+    finally:
+        os.umask(previous_umask)
+
+    assert stat.S_IMODE(os.stat(tmp_path / "snapshot").st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(tmp_path / "snapshot" / "Network").st_mode) == 0o700
+    for name in ("Network/Cookies", "Login Data", "Local State"):
+        assert stat.S_IMODE(os.stat(tmp_path / "snapshot" / name).st_mode) == 0o600
+
+
+def test_temporary_snapshot_is_removed(tmp_path: Any) -> None:
+    snapshots = ProfileSnapshotManager(make_profile(tmp_path))
+    snapshots.refresh()
+    assert not snapshots.persistent
+
+    snapshots.remove()
+    assert not os.path.exists(snapshots.snapshot_dir)
@@ -0,0 +1,89 @@
+"""
+Tests for report synthesis against a scripted Gemini client.
+"""
+import asyncio
+from typing import List
+
+from conftest import ScriptedModels, scripted_client
+from researcher.llm import LLMClient
+from researcher.models import ReportType, ResearchFinding, ResearchPlan, ResearchTask
+from researcher.synthesizer import Synthesizer
+
+PLAN = ResearchPlan(
+    topic="Tidal power",
+    key_questions=["Where is tidal power generated?"],
+    sub_tasks=[
+        ResearchTask(id="sites", description="Tidal sites", queries=["tidal power station sites"]),
+        ResearchTask(id="cost", description="Tidal costs", queries=["tidal power cost"]),
+    ],
+)
+
+
+def findings() -> List[ResearchFinding]:
+    return [
+        ResearchFinding(
+            source_url=f"https://example.com/{task_id}/{i}",
+            content=f"Tidal power station {i} for {task_id}. " * 40,
+            relevance_score=0.8,
+            key_fact="",
+            task_ids=[task_id],
+        )
+        for task_id in ("sites", "cost")
+        for i in range(3)
+    ]
+
+
+def synthesizer(models: ScriptedModels, **kwargs: object) -> Synthesizer:
+    return Synthesizer(model_name="test-model", llm=LLMClient(client=scripted_client(models)), **kwargs)  # type: ignore[arg-type]
+
+
+def test_failed_merge_returns_the_sub_task_notes() -> None:
+    def respond(prompt: str) -> str:
+        if "Sub-task Notes" in prompt:
+            raise ValueError("merge refused")
+        return "Notes citing [Example](https://example.com/)."
+
+    synth = synthesizer(ScriptedModels(respond), mode="map_reduce")
+    report = asyncio.run(synth.generate_report(PLAN, findings(), ReportType.INSTA_EXPERT))
+
+    assert "[MOCK]" not in report
+    assert "merge refused" in report
+    assert report.count("Notes citing") == 2
+    assert "## Tidal sites" in report and "## Tidal costs" in report
+    assert synth.stats()["reduce_error"] == "merge refused"
+
+
+def test_merge_prompt_is_capped_by_the_context_budget() -> None:
+    models = ScriptedModels(lambda prompt: "Report." if "Sub-task Notes" in prompt else "long note line\n" * 2000)
+    synth = synthesizer(models, mode="map_reduce", context_budget=2000)
+    asyncio.run(synth.generate_report(PLAN, findings(), ReportType.INSTA_EXPERT))
+
+    merge_prompt = next(prompt for prompt in models.prompts if "Sub-task Notes" in prompt)
+    assert synth.stats()["reduce_notes_trimmed"] == 2
+    assert synth.stats()["reduce_prompt_tokens_estimate"] < 2000 + 500
+    assert "[...]" in merge_prompt
+
+
+def test_broken_stream_keeps_the_streamed_text() -> None:
+    text = "# Tidal Power\n\nTidal power is generated at coastal barrages and in strong tidal streams."
+    synth = synthesizer(ScriptedModels(lambda prompt: text, fail_stream_after=2))
+    shown: List[str] = []
+    report = asyncio.run(synth.generate_report(PLAN, findings(), ReportType.INSTA_EXPERT, on_text=shown.append))
+
+    assert "[MOCK]" not in report
+    assert report.startswith("".join(shown))
+    assert "".join(shown) == text[:40]
+    assert "Report cut short" in report
+
+
+def test_broken_merge_stream_keeps_the_streamed_text() -> None:
+    def respond(prompt: str) -> str:
+        return "# Merged report on tidal power sites and costs." if "Sub-task Notes" in prompt else "Notes."
+
+    synth = synthesizer(ScriptedModels(respond, fail_stream_after=1), mode="map_reduce")
+    shown: List[str] = []
+    report = asyncio.run(synth.generate_report(PLAN, findings(), ReportType.INSTA_EXPERT, on_text=shown.append))
+
+    assert report.startswith("# Merged report on t")
+    assert "Report cut short" in report
+    assert "sub-task notes it would have combined" not in report
@@ -0,0 +1,37 @@
+"""
+Tests for URL canonicalisation.
+"""
+import pytest
+
+from researcher.urls import canonicalize_url
+
+
+@pytest.mark.parametrize("variant", [
+    "https://example.com/news/story",
+    "https://www.example.com/news/story/",
+    "HTTPS://Example.com:443/news/story#comments",
+    "https://m.example.com/news/story?utm_source=feed&fbclid=abc",
+    "https://amp.example.com/news/story",
+    "https://example.com/news/story/amp",
+    "https://example.com/news/story/amp/",
+    "https://example-com.cdn.ampproject.org/c/s/example.com/news/story",
+])
+def test_spellings_of_one_article_share_a_key(variant: str) -> None:
+    assert canonicalize_url(variant) == "https://example.com/news/story"
+
+
+def test_amp_html_suffix_is_folded() -> None:
+    assert canonicalize_url("https://example.com/story.amp.html") == "https://example.com/story.html"
+
+
+@pytest.mark.parametrize("url", [
+    "https://shop.example.com/amp/fender-deluxe",
+    "https://example.com/reviews/amp/tube-vs-solid-state",
+    "https://example.com/champions/ampere",
+])
+def test_amp_segment_inside_a_path_is_kept(url: str) -> None:
+    assert canonicalize_url(url) == url
+
+
+def test_meaningful_query_is_kept_and_sorted() -> None:
+    assert canonicalize_url("https://example.com/search?q=x&page=2&utm_medium=email") == "https://example.com/search?page=2&q=x"